@@ -0,0 +1,54 @@
+"""course_cache.py - process wide cache of course views.
+
+Courses almost never change, so a course view is built once and shared by
+every round played on that course. Saving, updating or deleting a course
+invalidates its entry, removing or restoring a database clears the cache.
+"""
+import threading
+from collections import OrderedDict
+
+class CourseCache(object):
+  """LRU cache of course views keyed by course id."""
+  def __init__(self, maxsize=32):
+    self.maxsize = maxsize
+    self.hits = 0
+    self.misses = 0
+    self._courses = OrderedDict()
+    self._lock = threading.Lock()
+
+  def get(self, course_id, build):
+    """Return course view for course_id.
+
+    Args:
+      course_id: id of the Course document.
+      build: called on a miss, returns the course view to cache.
+    """
+    with self._lock:
+      view = self._courses.get(course_id)
+      if view is not None:
+        self.hits += 1
+        self._courses.move_to_end(course_id)
+        return view
+    view = build()
+    with self._lock:
+      self.misses += 1
+      self._courses[course_id] = view
+      while len(self._courses) > self.maxsize:
+        self._courses.popitem(last=False)
+    return view
+
+  def invalidate(self, course_id=None):
+    """Remove a course, or all courses if course_id is None."""
+    with self._lock:
+      if course_id is None:
+        self._courses.clear()
+      else:
+        self._courses.pop(course_id, None)
+
+  def __len__(self):
+    return len(self._courses)
+
+  def __str__(self):
+    return 'courses:{}/{} hits:{} misses:{}'.format(len(self._courses), self.maxsize, self.hits, self.misses)
+
+course_cache = CourseCache()
@@ -1,7 +1,29 @@
 """db_mongo_engine.py"""
 from mongoengine import *
 from mongoengine.fields import EmailField, StringField, FloatField, IntField, ReferenceField, ListField, EmbeddedDocumentField
-from mongoengine.fields import DictField, DateTimeField
+from mongoengine.fields import DictField, DateTimeField, ObjectIdField, BinaryField
+from mongoengine.connection import DEFAULT_CONNECTION_NAME
+from mongoengine import signals
+from mongoengine.queryset import QuerySet
+import gzip
+from array import array
+import bson
+from bson import DBRef
+from .course_cache import course_cache
+from .exceptions import GolfDBException, GolfConflictException
+
+# Times a score write is merged and tried again when another scorer saved first.
+SCORE_RETRIES = 5
+
+# Snapshot files, a header document with this key starts each collection.
+SNAPSHOT_KEY = '_snapshot'
+# Documents inserted per insert_many() by DBAdmin.restore().
+RESTORE_BATCH_SIZE = 1000
+# Name added to a collection for its staging collection while restoring.
+RESTORE_SUFFIX = '_restore'
+
+# Putts value in packed scores for putts not entered.
+NO_PUTTS = 255
 
 class Player(Document):
   email = EmailField(required=True, unique=True)
@@ -10,6 +32,10 @@ class Player(Document):
   nick_name = StringField(max_length=20)
   handicap = FloatField()
   gender = StringField(required=True, choices=('man', 'woman'))
+  meta = {
+    'indexes': [{'fields': ['email'], 'unique': True}],
+    'auto_create_index': False,
+  }
 
 
 class Hole(EmbeddedDocument):
@@ -37,10 +63,45 @@ class Tee(EmbeddedDocument):
   slope = IntField(required=True)
 
 
+class CourseQuerySet(QuerySet):
+  """Drops the cached course views on writes that do not go through Course.save()."""
+  def update(self, *args, **kwargs):
+    result = super().update(*args, **kwargs)
+    course_cache.invalidate()
+    return result
+
+  def modify(self, *args, **kwargs):
+    result = super().modify(*args, **kwargs)
+    course_cache.invalidate()
+    return result
+
+  def delete(self, *args, **kwargs):
+    result = super().delete(*args, **kwargs)
+    course_cache.invalidate()
+    return result
+
 class Course(Document):
   name = StringField(max_length=132, unique=True, required=True)  
   holes = ListField(EmbeddedDocumentField(Hole), required=True)
   tees = ListField(EmbeddedDocumentField(Tee), required=True)
+  meta = {
+    'indexes': [{'fields': ['name'], 'unique': True}],
+    'auto_create_index': False,
+    'queryset_class': CourseQuerySet,
+  }
+
+  def save(self, *args, **kwargs):
+    """Save and drop the cached course view."""
+    doc = super().save(*args, **kwargs)
+    course_cache.invalidate(self.id)
+    return doc
+
+def _course_deleted(sender, document, **kwargs):
+  course_cache.invalidate(document.id)
+
+# signals need blinker, deletes are also caught by CourseQuerySet
+if signals.signals_available:
+  signals.post_delete.connect(_course_deleted, sender=Course)
 
 class Score(EmbeddedDocument):
   """Player score for a single hole."""
@@ -48,22 +109,54 @@ class Score(EmbeddedDocument):
   gross = IntField(required=True)
   putts = IntField()
 
+def pack_scores(scores):
+  """Return scores as bytes, hole number, gross and putts for each score in order."""
+  data = array('B')
+  for sc in scores:
+    data.extend((sc.num, sc.gross, NO_PUTTS if sc.putts is None else sc.putts))
+  return data.tobytes()
+
+def unpack_scores(data):
+  """Return list of Score from pack_scores() bytes."""
+  values = array('B', data)
+  return [Score(num=values[i], gross=values[i+1], putts=None if values[i+2] == NO_PUTTS else values[i+2])
+          for i in range(0, len(values), 3)]
+
 class Result(EmbeddedDocument):
-  """Player score for a round. References Score records."""
+  """Player score for a round. References Score records.
+
+  An archived result stores its scores in packed instead of scores, the
+  scores are unpacked when the result is read.
+  """
   player = ReferenceField(Player, required=True)
   tee = StringField(required=True)
   handicap = FloatField(required=True)
   course_handicap = IntField(required=True)
   scores = ListField(EmbeddedDocumentField(Score))
+  packed = BinaryField()
+
+  @classmethod
+  def _from_son(cls, son, *args, **kwargs):
+    doc = super()._from_son(son, *args, **kwargs)
+    if doc.packed:
+      doc._data['scores'] = unpack_scores(doc.packed)
+    return doc
+
+  def to_mongo(self, *args, **kwargs):
+    son = super().to_mongo(*args, **kwargs)
+    if self.packed:
+      son.pop('scores', None)
+    return son
 
 class Game(EmbeddedDocument):
   """Games played in a round."""
   game_type = StringField(max_length=16, required=True)
   options = DictField(default=dict)
   hole_data = DictField(default=dict)
-  leaderboard = DictField(default=dict)
-  scorecard = DictField(default=dict)
-  status = DictField(default=dict)
+  meta = {
+    # rounds saved before GameState still have leaderboard, scorecard and status here.
+    'strict': False,
+  }
 
 class Round(Document):
   course = ReferenceField(Course, required=True)
@@ -71,24 +164,385 @@ class Round(Document):
   dict_options = DictField(default=dict)
   results = ListField(EmbeddedDocumentField(Result))
   games = ListField(EmbeddedDocumentField(Game))
+  # incremented each time scores are set, score writes compare and swap on it
+  # and GameState records the version it was built from.
+  hole_version = IntField(default=0)
+  meta = {
+    # date_played,_id is the sort and keyset order for paging through rounds.
+    # results.player is a multikey index, one entry for each player in the round.
+    'indexes': [('date_played', 'id'), 'results.player'],
+    'auto_create_index': False,
+  }
+
+  def set_scores(self, hole, lst_gross, lst_putts=None):
+    """Set scores for one hole of all players in this document only.
+
+    Args:
+      hole: hole number.
+      lst_gross: gross score for each result, None leaves the player unchanged.
+      lst_putts: putts for each result, optional.
+    Returns:
+      list of (result index, score index, score, added) for each result set,
+      added is True when this hole is new for the result.
+    """
+    if self.is_archived():
+      raise GolfDBException('round {} is archived, scores cannot be set'.format(self.id))
+    changes = []
+    self.hole_version += 1
+    for n,result in enumerate(self.results):
+      if lst_gross[n] is None:
+        continue
+      score = Score(num=hole, gross=lst_gross[n])
+      if lst_putts:
+        score.putts = lst_putts[n]
+      for m,sc in enumerate(result.scores):
+        if sc.num == hole:
+          result.scores[m] = score
+          changes.append((n, m, score, False))
+          break
+      else:
+        result.scores.append(score)
+        changes.append((n, len(result.scores)-1, score, True))
+    self.clear_changed('results')
+    self._changed_fields = [name for name in self._changed_fields if name != 'hole_version']
+    return changes
+
+  def is_complete(self, num_holes):
+    """True when every player has a score for all num_holes holes."""
+    return bool(self.results) and all(len(result.scores) == num_holes for result in self.results)
+
+  def is_archived(self):
+    return any(result.packed for result in self.results)
+
+  def archive(self):
+    """Pack the scores of all results, the scores are kept in this document."""
+    for result in self.results:
+      result.packed = pack_scores(result.scores)
+    self.clear_changed('results')
+
+  def score_cells(self, hole):
+    """Return (gross, putts) of hole for each result, None when not entered."""
+    cells = []
+    for result in self.results:
+      for sc in result.scores:
+        if sc.num == hole:
+          cells.append((sc.gross, sc.putts))
+          break
+      else:
+        cells.append(None)
+    return cells
+
+  def version_query(self):
+    """Query matching this round only if it is still at this hole_version."""
+    # rounds saved before hole_version do not have the field
+    return {'_id': self.id, 'hole_version': {'$in': [0, None]} if not self.hole_version else self.hole_version}
+
+  def merge_scores(self, fresh, hole, before, lst_gross, lst_putts=None):
+    """Take the scores another scorer saved, before writing a hole again.
+
+    This round takes the saved scores of all holes. Only a different score
+    saved for a player and hole that is also being set here is a conflict.
+
+    Args:
+      fresh: Round as saved now.
+      hole: hole number being set.
+      before: score_cells(hole) when this round was read.
+      lst_gross, lst_putts: scores being set.
+    Returns:
+      fresh score_cells(hole), the before for the next try.
+    Raises:
+      GolfConflictException
+    """
+    if fresh is None:
+      raise GolfDBException('round {} not found'.format(self.id))
+    if len(fresh.results) != len(self.results):
+      raise GolfConflictException('round {} players changed by another scorer'.format(self.id))
+    now = fresh.score_cells(hole)
+    conflicts = []
+    for n,gross in enumerate(lst_gross):
+      mine = None if gross is None else (gross, lst_putts[n] if lst_putts else None)
+      if mine is not None and now[n] != before[n] and now[n] != mine:
+        conflicts.append('player {} saved as {}'.format(n+1, now[n][0] if now[n] else None))
+    # this round has the saved scores either way
+    for result, fresh_result in zip(self.results, fresh.results):
+      result.scores = [Score(num=sc.num, gross=sc.gross, putts=sc.putts) for sc in fresh_result.scores]
+    self.hole_version = fresh.hole_version
+    self.clear_changed('results')
+    self._changed_fields = [name for name in self._changed_fields if name not in ('results', 'hole_version')]
+    if conflicts:
+      raise GolfConflictException('round {} hole {} {} by another scorer'.format(self.id, hole, ','.join(conflicts)))
+    return now
+
+  def pop_changed_games(self):
+    """Return and clear the (game index, field) pairs changed since the last call."""
+    changed = set()
+    for name in self._get_changed_fields():
+      lst = name.split('.')
+      if lst[0] == 'games' and len(lst) > 2:
+        changed.add((int(lst[1]), lst[2]))
+    self.clear_changed('games')
+    return sorted(changed)
+
+  def clear_changed(self, field):
+    for doc in getattr(self, field):
+      doc._clear_changed_fields()
+    self._changed_fields = [name for name in self._changed_fields if not name.startswith(field+'.')]
+
+  def score_update(self, hole, lst_gross, lst_putts=None):
+    """Set scores for one hole and return the MongoDB update that writes them.
+
+    A new hole is added with a positional $push on results.N.scores, a hole
+    entered again is replaced with $set on results.N.scores.M. Only the
+    scores for this hole are in the update.
+    """
+    update = {'$inc': {'hole_version': 1}}
+    for n, m, score, added in self.set_scores(hole, lst_gross, lst_putts):
+      if added:
+        update.setdefault('$push', {})['results.{}.scores'.format(n)] = score.to_mongo()
+      else:
+        update.setdefault('$set', {})['results.{}.scores.{}'.format(n, m)] = score.to_mongo()
+    return update
+
+  def save_scores(self, hole, lst_gross, lst_putts=None, retries=SCORE_RETRIES):
+    """Atomic compare and swap write of one hole of scores.
+
+    The update only matches the round at the hole_version it was read with.
+    When another scorer saved first, their scores are merged in with
+    merge_scores() and the write is tried again.
+    """
+    before = self.score_cells(hole)
+    for _ in range(retries+1):
+      query = self.version_query()
+      if Round._get_collection().update_one(query, self.score_update(hole, lst_gross, lst_putts)).matched_count:
+        return
+      fresh = Round.objects(id=self.id).only('results.scores', 'hole_version').first()
+      before = self.merge_scores(fresh, hole, before, lst_gross, lst_putts)
+    raise GolfConflictException('round {} hole {} not saved after {} tries'.format(self.id, hole, retries+1))
+
+  def save_games(self):
+    """Atomic $set of only the game fields changed since the last save.
+
+    Returns:
+      number of game fields written.
+    """
+    updates = {}
+    for n, field in self.pop_changed_games():
+      updates['set__games__{}__{}'.format(n, field)] = getattr(self.games[n], field)
+    if updates:
+      Round.objects(id=self.id).update_one(**updates)
+    return len(updates)
+
+class GameState(Document):
+  """Leaderboard, scorecard and status of a game, derived from the round scores.
+
+  Kept out of Round so reading scores does not read the game output. There is
+  one document for each (round, game index), hole_version is the
+  Round.hole_version the output was built from and inputs the digest of each
+  game input, see GolfGame.inputs. A later version that does not change the
+  game inputs or the output leaves the state as is.
+  """
+  round_id = ObjectIdField(required=True)
+  game_index = IntField(required=True)
+  hole_version = IntField(required=True)
+  leaderboard = DictField(default=dict)
+  scorecard = DictField(default=dict)
+  status = DictField(default=dict)
+  inputs = DictField(default=dict)
+  meta = {
+    'indexes': [{'fields': ['round_id', 'game_index'], 'unique': True}],
+    'auto_create_index': False,
+  }
+
+  def upsert(self):
+    """Return (filter, update) that inserts or replaces this state."""
+    son = self.to_mongo()
+    son.pop('_id', None)
+    return {'round_id': self.round_id, 'game_index': self.game_index}, {'$set': son}
+
+  def set_output(self, leaderboard, scorecard, status):
+    """Set game output. Assigned after construction, the constructor converts players to references."""
+    self.leaderboard = leaderboard
+    self.scorecard = scorecard
+    self.status = status
+    return self
+
+def player_references(rounds):
+  """Return {player id: [Result,...]} of results with a player reference not read yet."""
+  dct_results = {}
+  for doc in rounds:
+    for result in doc._data.get('results') or []:
+      ref = result._data.get('player')
+      if isinstance(ref, DBRef):
+        dct_results.setdefault(ref.id, []).append(result)
+  return dct_results
+
+def attach_players(dct_results, players):
+  """Set the players read for player_references() in their results."""
+  for player in players:
+    for result in dct_results.get(player.id, []):
+      result._data['player'] = player
+
+def dereference_players(rounds):
+  """Load the players of all results in rounds with one $in query.
+
+  Result.player is a reference, read one at a time when it is first used.
+  This resolves the references of a set of rounds together instead.
+
+  Args:
+    rounds: list of Round documents.
+  Returns:
+    rounds argument.
+  """
+  dct_results = player_references(rounds)
+  if dct_results:
+    attach_players(dct_results, Player.objects(id__in=list(dct_results.keys())))
+  return rounds
 
 class Database(object):
-  def __init__(self, url, database):
+  """MongoDB connection.
+
+  Args:
+    url: host url mongodb://host:port/?options, None for localhost.
+    database: database name.
+    alias: mongoengine connection name, documents use the default alias.
+    options: MongoClient options, maxPoolSize, connectTimeoutMS, readPreference,
+      compressors, ... None values are left at the pymongo default.
+  """
+  def __init__(self, url, database, alias=DEFAULT_CONNECTION_NAME, **options):
     self.url = url
     self.database = database
+    self.alias = alias
+    self.options = {key: value for key,value in options.items() if value is not None}
     self.db = None
     if self.database:
       self.connect()
 
+  def _client_args(self, options):
+    kwargs = dict(options)
+    if self.url:
+      kwargs['host'] = self.url
+    return kwargs
+
   def connect(self, database=None):
     if database:
       self.database = database
-    self.db = connect(self.database)
+    disconnect(self.alias)
+    self.db = connect(self.database, alias=self.alias, **self._client_args(self.options))
+
+  def add_alias(self, alias, **options):
+    """Connect a separate pool to the same database.
+
+    Queries use it with QuerySet.using(alias), so long reads do not wait for
+    connections used by score updates. options override the connection options.
+    """
+    disconnect(alias)
+    options = dict(self.options, **{key: value for key,value in options.items() if value is not None})
+    connect(self.database, alias=alias, **self._client_args(options))
+    return alias
 
 class DBAdmin(Database):
   """Database wrapper for golf admin objects."""
+  documents = (Player, Course, Round, GameState)
+
+  def connect(self, database=None):
+    super().connect(database)
+    self.ensure_indexes()
+
+  def ensure_indexes(self):
+    """Create the indexes declared in each document meta."""
+    for document in self.documents:
+      document.ensure_indexes()
 
   def remove(self, database=None):
     """Delete a database."""
     database = database if database else self.database
     self.db.drop_database(database)
+    if database == self.database:
+      course_cache.invalidate()
+      self.ensure_indexes()
+
+  def snapshot(self, filename):
+    """Write all documents to a gzip compressed file of BSON documents.
+
+    Returns:
+      {collection name: number of documents}.
+    """
+    counts = {}
+    with gzip.open(filename, 'wb') as fp:
+      for document in self.documents:
+        collection = document._get_collection()
+        fp.write(bson.encode({SNAPSHOT_KEY: collection.name}))
+        counts[collection.name] = 0
+        for son in collection.find(sort=[('_id', 1)]):
+          fp.write(bson.encode(son))
+          counts[collection.name] += 1
+    return counts
+
+  def restore(self, filename, batch_size=RESTORE_BATCH_SIZE):
+    """Replace the database with a snapshot() file.
+
+    Documents are written to staging collections with unordered insert_many()
+    calls of batch_size. The collections are replaced only when the whole
+    file is loaded, a bad file leaves the database as it was.
+
+    Returns:
+      {collection name: number of documents}.
+    Raises:
+      GolfDBException - not a snapshot file.
+    """
+    collections = {document._get_collection_name(): document._get_collection() for document in self.documents}
+    staged = {}
+    counts = {}
+    try:
+      self._load_snapshot(filename, collections, staged, counts, batch_size)
+    except (OSError, EOFError, bson.errors.InvalidBSON) as ex:
+      self._drop_collections(staged)
+      raise GolfDBException('{} is not a snapshot file - {}'.format(filename, ex))
+    except Exception:
+      self._drop_collections(staged)
+      raise
+    for name, collection in collections.items():
+      if counts.get(name):
+        staged[name].rename(name, dropTarget=True)
+      else:
+        collection.drop()
+        if name in staged:
+          staged[name].drop()
+    course_cache.invalidate()
+    self.ensure_indexes()
+    return counts
+
+  def _load_snapshot(self, filename, collections, staged, counts, batch_size):
+    """Write documents of a snapshot file to staging collections, staged is set to {name: staging collection}."""
+    collection = None
+    batch = []
+    def insert():
+      if batch:
+        collection.insert_many(batch, ordered=False)
+        counts[name] += len(batch)
+        del batch[:]
+    with gzip.open(filename, 'rb') as fp:
+      for son in bson.decode_file_iter(fp):
+        if SNAPSHOT_KEY in son:
+          insert()
+          name = son[SNAPSHOT_KEY]
+          if name not in collections:
+            raise GolfDBException('{} has unknown collection {}'.format(filename, name))
+          collection = collections[name].database[name + RESTORE_SUFFIX]
+          collection.drop()
+          staged[name] = collection
+          counts[name] = 0
+        elif collection is None:
+          raise GolfDBException('{} is not a snapshot file'.format(filename))
+        else:
+          batch.append(son)
+          if len(batch) >= batch_size:
+            insert()
+      insert()
+    if not staged:
+      raise GolfDBException('{} is not a snapshot file'.format(filename))
+
+  @staticmethod
+  def _drop_collections(collections):
+    for collection in collections.values():
+      collection.drop()
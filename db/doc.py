@@ -1,10 +1,14 @@
 """doc.py - wrapper classes for mongoengine Documents."""
 
 class Doc(object):
+  # fields not copied from the document, the subclass sets them.
+  skip_fields = ()
+
   def __init__(self, doc):
     self.doc = doc
     for name in doc._fields.keys():
-      setattr(self, name, getattr(doc, name))
+      if name not in self.skip_fields:
+        setattr(self, name, getattr(doc, name))
   
   def save(self):
     self.doc.save()
\ No newline at end of file
@@ -8,8 +8,12 @@ class GolfDBException(GolfException):
   """Golf database exception."""
   pass
 
+class GolfConflictException(GolfDBException):
+  """Raised when another scorer saved a different score for the same player and hole."""
+  pass
+
 class GolfGameException(GolfException):
-  """Raised when a golf game need more information to resolve score."""
+  """Golf game needs more information to resolve score, games now report this with GolfGame.ask()."""
   def __init__(self, dct):
     self.dct = dct
 
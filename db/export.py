@@ -0,0 +1,120 @@
+"""export.py - columnar export of round history for analytics.
+
+One row for each player and hole played, with the round, course, tee and
+handicap columns repeated on each row. Rounds are read from the storage a
+batch at a time and each batch is written as a block of columns, so the
+whole history is never held in memory.
+
+Parquet and Arrow files need pyarrow, CSV files do not.
+"""
+import csv
+from .exceptions import GolfException
+
+try:
+  import pyarrow
+  import pyarrow.ipc
+  import pyarrow.parquet
+except ImportError:
+  pyarrow = None
+
+COLUMNS = ('round_id', 'date_played', 'course', 'tee', 'email', 'nick_name', 'handicap', 'course_handicap',
+           'hole', 'gross', 'putts', 'par', 'hole_handicap')
+
+EXPORT_FORMATS = ('parquet', 'arrow', 'csv')
+
+def _schema():
+  return pyarrow.schema([
+    ('round_id', pyarrow.string()),
+    ('date_played', pyarrow.timestamp('s')),
+    ('course', pyarrow.string()),
+    ('tee', pyarrow.string()),
+    ('email', pyarrow.string()),
+    ('nick_name', pyarrow.string()),
+    ('handicap', pyarrow.float64()),
+    ('course_handicap', pyarrow.int16()),
+    ('hole', pyarrow.int8()),
+    ('gross', pyarrow.int16()),
+    ('putts', pyarrow.int8()),
+    ('par', pyarrow.int8()),
+    ('hole_handicap', pyarrow.int8()),
+  ])
+
+def round_columns(rounds):
+  """Return {column: list of values} with a row for each player and hole of rounds."""
+  columns = {name: [] for name in COLUMNS}
+  holes = {}
+  for doc in rounds:
+    course = doc.course
+    if course.id not in holes:
+      holes[course.id] = {hole.num: hole for hole in course.holes}
+    course_holes = holes[course.id]
+    for result in doc.results:
+      for sc in result.scores:
+        hole = course_holes[sc.num]
+        for name, value in (('round_id', str(doc.id)), ('date_played', doc.date_played), ('course', course.name),
+                            ('tee', result.tee), ('email', result.player.email), ('nick_name', result.player.nick_name),
+                            ('handicap', result.handicap), ('course_handicap', result.course_handicap),
+                            ('hole', sc.num), ('gross', sc.gross), ('putts', sc.putts),
+                            ('par', hole.par), ('hole_handicap', hole.handicap)):
+          columns[name].append(value)
+  return columns
+
+def _batches(storage, since, batch_size):
+  """Yield lists of rounds, batch_size rounds each."""
+  batch_size = batch_size or storage.batch_size
+  batch = []
+  for doc in storage.iter_rounds(since=since, batch_size=batch_size):
+    batch.append(doc)
+    if len(batch) == batch_size:
+      yield batch
+      batch = []
+  if batch:
+    yield batch
+
+def export_format(filename):
+  """Return export format from the file name extension."""
+  ext = filename.rsplit('.', 1)[-1].lower()
+  fmt = {'pq': 'parquet', 'feather': 'arrow'}.get(ext, ext)
+  if fmt not in EXPORT_FORMATS:
+    raise GolfException('export file {} must be one of {}'.format(filename, EXPORT_FORMATS))
+  return fmt
+
+def export_rounds(storage, filename, since=None, batch_size=None):
+  """Write the rounds in storage to a columnar file.
+
+  Args:
+    storage: GolfStorage to read.
+    filename: .parquet, .arrow or .csv file to write.
+    since: only rounds played on or after this datetime.
+    batch_size: rounds read and written at a time, default storage.batch_size.
+  Returns:
+    number of rows written.
+  Raises:
+    GolfException - unknown format or pyarrow is not installed.
+  """
+  fmt = export_format(filename)
+  if fmt != 'csv' and pyarrow is None:
+    raise GolfException('{} export needs pyarrow, pip install pyarrow'.format(fmt))
+  count = 0
+  if fmt == 'csv':
+    with open(filename, 'w', newline='') as fp:
+      writer = csv.writer(fp)
+      writer.writerow(COLUMNS)
+      for batch in _batches(storage, since, batch_size):
+        columns = round_columns(batch)
+        writer.writerows(zip(*[columns[name] for name in COLUMNS]))
+        count += len(columns['hole'])
+    return count
+  schema = _schema()
+  if fmt == 'parquet':
+    writer = pyarrow.parquet.ParquetWriter(filename, schema)
+  else:
+    writer = pyarrow.ipc.new_file(filename, schema)
+  try:
+    for batch in _batches(storage, since, batch_size):
+      columns = round_columns(batch)
+      writer.write_table(pyarrow.table(columns, schema=schema))
+      count += len(columns['hole'])
+  finally:
+    writer.close()
+  return count
@@ -1,12 +1,19 @@
 """ game.py - GolfGame class."""
 import ast
+import hashlib
+import json
 from .exceptions import GolfException
 from .doc import Doc
 from .dplayer import DPlayer
+from .score_matrix import ScoreMatrix
 from util.tl_logger import TLLog
 
 log = TLLog.getLogger('game')
 
+def digest(value):
+  """Return digest of game inputs or output, the same in every process. Players are digested by id."""
+  return hashlib.sha1(json.dumps(value, sort_keys=True, default=lambda obj: str(getattr(obj, 'pk', obj))).encode()).hexdigest()
+
 class GolfGame(Doc):
   """Class for all golf games."""
   description = '<Description not set>'
@@ -21,12 +28,44 @@ class GolfGame(Doc):
   #    },
   game_options = {}
 
+  # True when apply_hole() is implemented. A game that overloads update()
+  # must overload apply_hole() too or set this False.
+  incremental = False
+
+  # Inputs read by update() and apply_hole(), DRound.update_games() skips a
+  # game when none of them changed since it was last updated.
+  #   gross, putts: score rows of the round.
+  #   handicaps:    course handicaps of the players.
+  #   hole_data:    answers in the hole_data of this game.
+  inputs = ('gross', 'putts', 'handicaps', 'hole_data')
+
+  # column titles of the leaderboard, see leaderboard_header()
+  leaderboard_columns = 'Pos Name  Points Thru'
+
   def __init__(self, doc, golf_round):
     super().__init__(doc)
     self.golf_round = golf_round
-    self.dctScorecard = {}
+    # game name and options only, the text is made when the game is shown
+    self.dctScorecard = {'game': doc.game_type, 'options': dict(doc.options)}
     self.dctLeaderboard = {}
     self.dctStatus = {}
+    # game output, from update() or a stored GameState
+    self.leaderboard = {}
+    self.scorecard = {}
+    self.status = {}
+    self.hole_version = None
+    # scores the game state was built from, set by DRound.update_games()
+    self.scores_applied = None
+    self.stale = False
+    # digest of each input when last updated, see DRound.input_versions,
+    # stored in the GameState with the output
+    self.inputs_applied = {}
+    # digest of the output, output_changed is set by an update that changes
+    # it and cleared when the GameState is taken to save
+    self.output_digest = None
+    self.output_changed = False
+    # questions for the scorer from update(), see ask()
+    self.questions = []
     # set game options
     self.load_game_options()
     # setup and validate
@@ -38,6 +77,30 @@ class GolfGame(Doc):
     """Overload to validate a game setup."""
     pass
 
+  def ask(self, hole_num, players, msg, key):
+    """Add a question the game needs answered to score a hole.
+
+    The answer is the nick name of one of players, set in
+    hole_data[str(hole_num)][key] before the game is updated again.
+    """
+    self.questions.append({
+      'hole_num': hole_num,
+      'players': players,
+      'msg': msg,
+      'key': key,
+      'hole_data': self.hole_data,
+      'game': self,
+    })
+
+  def set_state(self, state):
+    """Set game output from a GameState."""
+    self.leaderboard = state.leaderboard
+    self.scorecard = state.scorecard
+    self.status = state.status
+    self.hole_version = state.hole_version
+    self.inputs_applied = dict(state.inputs)
+    self.output_digest = digest([self.leaderboard, self.scorecard, self.status])
+
   def load_game_options(self):
     """setup game options from game_options dictionary."""
     def set_value(dct, value):
@@ -88,6 +151,17 @@ class GolfGame(Doc):
     """Overload to update the game."""
     pass
 
+  def apply_hole(self, hole_num, scores):
+    """Overload to add the next hole to the game state, for incremental games.
+
+    Called in hole order after update() or apply_hole() of the hole before.
+
+    Args:
+      hole_num: hole number.
+      scores: Score for this hole of each player.
+    """
+    raise GolfException('{} does not apply single holes'.format(self.__class__.__name__))
+
   def getScorecard(self, **kwargs):
     """Return scorecard dictionary for this game."""
     return self.dctScorecard
@@ -104,43 +178,98 @@ class GolfGame(Doc):
     """Return simple status for state of game."""
     return self.dctStatus
 
+  # Text of the output, made by a renderer when it is shown. The dictionaries
+  # are the stored leaderboard, scorecard and status.
+  def scorecard_line(self, n, dct):
+    """Overload to return the scorecard line of player or team n."""
+    return ''
+
+  @property
+  def scorecard_title(self):
+    """Overload for a title other than the short description."""
+    return self.short_description
+
+  def scorecard_header(self, dct):
+    """Return the scorecard header line."""
+    return '{0:*^98}'.format(' {} '.format(self.scorecard_title))
+
+  def leaderboard_header(self, dct):
+    """Return the leaderboard header line, output stored before it was made here has the text."""
+    return dct['hdr'] if 'hdr' in dct else self.leaderboard_columns
+
+  def leaderboard_line(self, n, dct, board):
+    """Overload to return the leaderboard line of position n, board is the leaderboard dct is in."""
+    return ''
+
+  def status_line(self, dct):
+    """Overload to return the status line."""
+    return ''
+
+  def bumps_text(self, bumps):
+    """Return nick names with bumps on a hole, the count is shown when more than 1."""
+    return ','.join('{}{}'.format(dct['player'].nick_name, '({})'.format(dct['bumps']) if dct['bumps'] > 1 else '')
+                    for dct in bumps)
+
   def __str__(self):
     return '{} options:{} leaderboard:{} scorecard:{} status:{}'.format(
       self.__class__.__name__, self.options, self.leaderboard, self.scorecard, self.status)
 
+class ScoreRow(object):
+  """Score of each hole for one player, out, in and total are kept as holes are set.
+
+  A hole not scored is None and is not added. thru is the number of holes scored.
+  """
+  __slots__ = ('holes', 'out', 'inn', 'total', 'thru')
+
+  def __init__(self, num_holes, score_type=int):
+    self.holes = [None]*num_holes
+    self.out = score_type(0)
+    self.inn = score_type(0)
+    self.total = score_type(0)
+    self.thru = 0
+
+  def set(self, n, value):
+    """Set score of hole index n, None clears it."""
+    old = self.holes[n]
+    self.holes[n] = value
+    if old is None:
+      old = 0
+      self.thru += 1
+    if value is None:
+      value = 0
+      self.thru -= 1
+    if n < 9:
+      self.out += value - old
+    else:
+      self.inn += value - old
+    self.total += value - old
+
+  def load(self, values):
+    """Set all holes from a list, the totals are summed once."""
+    self.holes = list(values)
+    self.out, self.inn, self.total = ScoreMatrix.sums(self.holes)
+    self.thru = sum(1 for value in self.holes if value is not None)
+
 class GamePlayer(DPlayer):
   def __init__(self, game, result):
     super().__init__(result.player)
     self.game = game
     self.result = result
+    # row in the round ScoreMatrix
+    self.index = next(n for n, res in enumerate(game.golf_round.results) if res is result)
 
-  def _init_dict(self, score_type=int):
-    """Create and initialize scoring dictionary.
-
-      add holes, in, out, total.
-    """
-    return {
-      'holes': [None for _ in range(len(self.game.golf_round.course.holes))],
-      'in' : score_type(0),
-      'out': score_type(0),
-      'total': score_type(0),
-    }
-
-  def update_totals(self, dct):
-    """Update totals in a dictionary. If a value is None it is not added.
-
-       dct must contain the following keys:
-         holes: list of number scores
-         in: total for holes 10..18
-         out: total for holes 1..9
-         total: in + out + overall (if set).
-    """
-    dct['out'] = sum([sc for sc in dct['holes'][:9] if sc is not None])
-    dct['in']  = sum([sc for sc in dct['holes'][9:] if sc is not None])
-    dct['total'] = dct['in'] + dct['out'] + dct.get('overall', 0)
+  def score_row(self, score_type=int):
+    """Return a new ScoreRow for the holes of the course."""
+    return ScoreRow(len(self.game.golf_round.course.holes), score_type)
 
   def calc_bumps(self, min_handicap):
-    return self.game.golf_round.course.calcBumps(self.result.course_handicap - min_handicap)
+    """Return the round's shared bumps playing off min_handicap, kept for net_row()."""
+    self.min_handicap = min_handicap
+    return self.game.golf_round.bumps(self.index, min_handicap)
+
+  def net_row(self):
+    """Return a copy of the round's net scores for calc_bumps() min_handicap."""
+    return list(self.game.golf_round.net_row(self.index, self.min_handicap))
 
 
 class GolfTeam(object):
@@ -23,12 +23,12 @@ class BestBallTeam(GolfTeam):
   def print_net_scores(self):
     print('team:{}'.format(self.name))
     for pl in self.players:
-      print('  {:<10}: {}'.format(pl.player.nick_name, pl.dct_net['holes'])) 
+      print('  {:<10}: {}'.format(pl.player.nick_name, pl.net.holes)) 
 
   
   def calculate_score(self, index):
     # net scores have already set.
-    self._net[index] = min([pl.dct_net['holes'][index] for pl in self.players])
+    self._net[index] = min([pl.net.holes[index] for pl in self.players])
 
   def update_points(self, index, other_team):
     if self._net[index] < other_team._net[index]:
@@ -68,32 +68,13 @@ class BestBallTeam(GolfTeam):
       self._status += ' {} to play'.format(to_play)
     return self._win
   
-  def get_scorecard(self, index):
+  def get_scorecard(self):
     """Scorecard for team."""
-    def score_string(index, score):
-      s = ''
-      if score is not None:
-        if score > 0:
-          s = '{:d}'.format(score)
-        elif index == 0 and score == 0:
-          s = 'AS'
-        else:
-          s = '-'
-      return s
-    #
     dct = {'team': self.name }
     dct['in'] = self._in
     dct['out'] = self._out
     dct['total'] = self._total
     dct['holes'] = self._score
-    line = '{:<6}'.format(self.name)
-    for i,score in enumerate(self._score[:9]):
-      line += ' {:>3}'.format(score_string(index, score))
-    line += ' {:>4}'.format(score_string(index, self._out))
-    for i,score in enumerate(self._score[9:]):
-      line += ' {:>3}'.format(score_string(index, score))
-    line += ' {:>4} {:>4}'.format(score_string(index, self._in), score_string(index, self._total))
-    dct['line'] = line
     return dct
 
   def __str__(self):
@@ -158,8 +139,9 @@ Four-Person Best Two Balls	 	 90%	 95%
       team.setup()
       
     self.to_play = len(self.golf_round.course.holes)
-    self.dctScorecard['header'] = '{0:*^98}'.format(' BestBall - Match Play')
-    self.dctLeaderboard['hdr'] = 'Pos Name   Points Thru'
+
+  def scorecard_header(self, dct):
+    return '{0:*^98}'.format(' BestBall - Match Play')
 
   def update(self):
     # call base class to update net scores
@@ -168,12 +150,33 @@ Four-Person Best Two Balls	 	 90%	 95%
     self.thru = self.golf_round.get_completed_holes()
     self.to_play = len(self.golf_round.course.holes) - self.thru
     for index in range(self.thru):
-      for team in self.team_list:
-        # print net scores
-        #team.print_net_scores()
-        team.calculate_score(index)
-      self.team_list[0].update_points(index, self.team_list[1])  
-      self.team_list[1].update_points(index, self.team_list[0])  
+      self._score_hole(index)
+    self._update_status()
+
+  def apply_hole(self, hole_num, scores):
+    super().apply_hole(hole_num, scores)
+    self.thru = hole_num
+    self.to_play = len(self.golf_round.course.holes) - self.thru
+    self._score_hole(hole_num-1)
+    # status is from the totals, as after a full update
+    for team in self.team_list:
+      team._status = 'All Square'
+      team._win = None
+    self.winner = None
+    self._update_status()
+
+  def _score_hole(self, index):
+    if any(pl.net.holes[index] is None for pl in self._players):
+      # hole not played by every player yet
+      return
+    for team in self.team_list:
+      # print net scores
+      #team.print_net_scores()
+      team.calculate_score(index)
+    self.team_list[0].update_points(index, self.team_list[1])  
+    self.team_list[1].update_points(index, self.team_list[0])  
+
+  def _update_status(self):
     # update match status
     for team in self.team_list:
       if team.update_status(self.to_play):
@@ -181,52 +184,67 @@ Four-Person Best Two Balls	 	 90%	 95%
       
   def getScorecard(self, **kwargs):
     """Scorecard with all players."""
-    self.dctScorecard['players'] = [team.get_scorecard(index) for index,team in enumerate(self.team_list)]
+    self.dctScorecard['players'] = [team.get_scorecard() for team in self.team_list]
     return self.dctScorecard
+
+  def scorecard_line(self, n, dct):
+    def score_string(score):
+      s = ''
+      if score is not None:
+        if score > 0:
+          s = '{:d}'.format(score)
+        elif n == 0 and score == 0:
+          s = 'AS'
+        else:
+          s = '-'
+      return s
+    #
+    line = '{:<6}'.format(dct['team'])
+    for score in dct['holes'][:9]:
+      line += ' {:>3}'.format(score_string(score))
+    line += ' {:>4}'.format(score_string(dct['out']))
+    for score in dct['holes'][9:]:
+      line += ' {:>3}'.format(score_string(score))
+    line += ' {:>4} {:>4}'.format(score_string(dct['in']), score_string(dct['total']))
+    return line
   
   def getLeaderboard(self, **kwargs):
     self.dctLeaderboard['thru'] = self.thru
     self.dctLeaderboard['to_play'] = self.to_play
     self.dctLeaderboard['final'] = self.final
-    board = []
-    for n,team in enumerate(self.team_list):
-      line = '{:<10}'.format(team.name)
-      if team._total > 0 or (team._total == 0 and n == 0):
-        line += team.status
-      dct = {
-        'team': team.name,
-        'line': line,
-        'status': team.status,
-      }
-      board.append(dct)
-    self.dctLeaderboard['leaderboard'] = board
-    self.dctLeaderboard['hdr'] = '{:<10}{}'.format('Match', 'Final' if self.final else 'Thru {}'.format(self.thru))
+    self.dctLeaderboard['leaderboard'] = [{'team': team.name, 'status': team.status, 'total': team._total}
+                                          for team in self.team_list]
     return self.dctLeaderboard
 
+  def leaderboard_header(self, dct):
+    return '{:<10}{}'.format('Match', 'Final' if dct['final'] else 'Thru {}'.format(dct['thru']))
+
+  def leaderboard_line(self, n, dct, board):
+    line = '{:<10}'.format(dct['team'])
+    if dct['total'] > 0 or (dct['total'] == 0 and n == 0):
+      line += dct['status']
+    return line
+
   def getStatus(self, **kwargs):
     n = self.golf_round.get_completed_holes()
     if n < len(self.golf_round.course.holes):
       self.dctStatus['next_hole'] = n+1
       self.dctStatus['par'] = self.golf_round.course.holes[n].par
       self.dctStatus['handicap'] = self.golf_round.course.holes[n].handicap
-      bumps = []
-      bump_line = []
-      for pl in self._players:
-        if pl._bumps[n] > 0:
-          dct = {'player': pl.doc, 'bumps': pl._bumps[n]}
-          bumps.append(dct)
-          bump_line.append('{}{}'.format(pl.nick_name, '({})'.format(dct['bumps']) if dct['bumps'] > 1 else ''))
-      self.dctStatus['bumps'] = bumps
-      self.dctStatus['line'] = 'Hole {} Par {} Hdcp {}'.format(
-        self.dctStatus['next_hole'], self.dctStatus['par'], self.dctStatus['handicap'])
-      if bumps:
-        self.dctStatus['line'] += ' Bumps:{}'.format(','.join(bump_line))
+      self.dctStatus['bumps'] = [{'player': pl.doc, 'bumps': pl._bumps[n]} for pl in self._players if pl._bumps[n] > 0]
     else:
       # round complete
       self.dctStatus['next_hole'] = None
       self.dctStatus['par'] = self.golf_round.course.total
       self.dctStatus['handicap'] = None
-      self.dctStatus['line'] = 'Round Complete'
     return self.dctStatus
 
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round Complete'
+    line = 'Hole {} Par {} Hdcp {}'.format(dct['next_hole'], dct['par'], dct['handicap'])
+    if dct['bumps']:
+      line += ' Bumps:{}'.format(self.bumps_text(dct['bumps']))
+    return line
+
 
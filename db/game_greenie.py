@@ -1,14 +1,13 @@
 """ game_greenie.py - GolfGame class."""
 from collections import OrderedDict
 from .game import GolfGame, GamePlayer
-from .exceptions import GolfGameException
 
 class GreeniePlayer(GamePlayer):
   def __init__(self, game, result):
     super().__init__(game, result)
     self.dct_greens = [None for _ in range(len(self.game.golf_round.course.holes))],
-    self.dct_points = self._init_dict()
-    self.dct_money = self._init_dict(score_type=float) if game.wager else None
+    self.points = self.score_row()
+    self.money = self.score_row(score_type=float) if game.wager else None
 
 class GameGreenie(GolfGame):
   """Basic Par 3 games."""
@@ -27,6 +26,7 @@ Options:
     'last_par_3_carry': { 'default': True,  'type': 'bool',  'desc': 'If nobody wins last par 3 then carry over to next hole and on green in regulation quailifies.'},    
     'wager':            { 'default': 0,     'type': 'float', 'desc': 'Wager per hole.'},    
   }
+  inputs = ('gross', 'putts', 'hole_data')
   
   def setup(self, **kwargs):
     """setup the game."""
@@ -42,8 +42,6 @@ Options:
     self._next_hole = 0
     self._use_green_in_regulation = False
     self._thru = 0
-    # add header to scorecard
-    self.dctScorecard['header'] = '{0:*^98}'.format(' '+ self.short_description + ' ')
   
   def update(self):
     """Update gross results for all scores so far."""
@@ -67,8 +65,8 @@ Options:
         lst_winners = dct_greens[hole_num]
         par = self.golf_round.course.holes[index].par
         #print('hole_num:{} par:{} lst_winners:{}'.format(hole_num, par, lst_winners)) 
-        # par 4 and 5 only valid if there is a carry
-        if par > 3 and self._carry == 0:
+        # par 4 and 5 only valid if there is a carry, not known until the questions are answered
+        if par > 3 and (self._carry == 0 or self.questions):
           break
         if len(lst_winners) > 1:
           key = str(hole_num)
@@ -76,116 +74,119 @@ Options:
             qualified = self.hole_data[key]['qualified']
             lst_winners = [w for w in lst_winners if str(w[0].nick_name) == qualified]
           else:
-            dct = {
-              'hole_num': hole_num,
-              'players': [w[0].doc for w in lst_winners],
-              'msg': 'Which player was closest to the pin on hole {}?'.format(hole_num),
-              'game' : self,
-              'key': 'qualified',
-              'hole_data' : self.hole_data,
-              'game': self,
-             }
-            raise GolfGameException(dct)
+            self.ask(hole_num, [w[0].doc for w in lst_winners],
+                     'Which player was closest to the pin on hole {}?'.format(hole_num), 'qualified')
+        if self.questions:
+          # who qualifies does not depend on the carry, keep asking on the par 3 holes after
+          continue
         if len(lst_winners) == 1:
           winner, score = lst_winners[0]
           # validate winner had 2 putts or less
           if score.putts < 3:
             # only get points on par 3
             value = 1 if par == 3 else 0
-            winner.dct_points['holes'][index] = value + self._carry
+            points = value + self._carry
             self._carry = 0
             if self.double_birdie and self.gross < par:
               # birdie or better
-              winner.dct_points['holes'][index] *= 2
+              points *= 2
+            winner.points.set(index, points)
             if self.wager:
-              winner.dct_money['holes'][index] = winner.dct_points['holes'][index]*len(self._players)
+              winner.money.set(index, points*len(self._players))
           else:
             lst_winners = []
         if not lst_winners:
           if self.carry_over and par == 3:
             self._carry += 1
-    for pl in self._players:
-      pl.update_totals(pl.dct_points)
-      #pl.update_totals(pl.dct_money)
       
   def getScorecard(self, **kwargs):
     """Scorecard with all players."""
     lstPlayers = []
     for n,score in enumerate(self._players):
       dct = {'player': score.doc }
-      dct['in'] = score.dct_points['in']
-      dct['out'] = score.dct_points['out']
-      dct['total'] = score.dct_points['total']
-      dct['holes'] = score.dct_points['holes']
-      # build line for stdout
-      line = '{:<6}'.format(score.nick_name)
-      for point in score.dct_points['holes'][:9]:
-        line += ' {:>3}'.format(point) if point is not None else '    '
-      line += ' {:>4}'.format(dct['out'])
-      for point in score.dct_points['holes'][9:]:
-        line += ' {:>3}'.format(point) if point is not None else '    '
-      line += ' {:>4} {:>4}'.format(dct['in'], dct['total'])
-      dct['line'] = line
+      dct['in'] = score.points.inn
+      dct['out'] = score.points.out
+      dct['total'] = score.points.total
+      dct['holes'] = score.points.holes
       lstPlayers.append(dct)
     self.dctScorecard['players'] = lstPlayers
     return self.dctScorecard
 
+  def scorecard_line(self, n, dct):
+    line = '{:<6}'.format(dct['player'].nick_name)
+    for point in dct['holes'][:9]:
+      line += ' {:>3}'.format(point) if point is not None else '    '
+    line += ' {:>4}'.format(dct['out'])
+    for point in dct['holes'][9:]:
+      line += ' {:>3}'.format(point) if point is not None else '    '
+    line += ' {:>4} {:>4}'.format(dct['in'], dct['total'])
+    return line
+
   def getLeaderboard(self, **kwargs):
     board = []
     sort_type = kwargs.get('sort_type', 'points')
     if sort_type == 'money' and self.wager:
-      self.dctLeaderboard['hdr'] = 'Pos Name  Money  Thru'
-      scores = sorted(self._players, key=lambda score: score.dct_money['total'], reverse=True)
+      scores = sorted(self._players, key=lambda score: score.money.total, reverse=True)
       sort_by = 'money'
     else:
-      self.dctLeaderboard['hdr'] = 'Pos Name  Points Thru'
-      scores = sorted(self._players, key=lambda score: score.dct_points['total'], reverse=True)
+      scores = sorted(self._players, key=lambda score: score.points.total, reverse=True)
       sort_by = 'total'
+    self.dctLeaderboard['sort_by'] = sort_by
     pos = 1
     prev_total = None
     for sc in scores:
       score_dct = {
         'player': sc.doc,
-        'total' : sc.dct_points['total'],
-        'money' : sc.dct_money['total'] if self.wager else None,
+        'total' : sc.points.total,
+        'money' : sc.money.total if self.wager else None,
       }
       if prev_total != None and score_dct[sort_by] != prev_total:
         pos += 1
       prev_total = score_dct[sort_by]
       score_dct['pos'] = pos
       score_dct['thru'] = self._thru
-      if sort_by == 'money':
-        money = '--' if score_dct['money'] == 0.0 else '${:<2g}'.format(score_dct['money'])
-        score_dct['line'] = '{:<3} {:<6} {:^5} {:>4}'.format(
-          score_dct['pos'], score_dct['player'].nick_name, money, score_dct['thru'])
-      else:
-        score_dct['line'] = '{:<3} {:<6} {:>5} {:>4}'.format(
-          score_dct['pos'], score_dct['player'].nick_name, score_dct['total'], score_dct['thru'])
       board.append(score_dct)
     self.dctLeaderboard['leaderboard'] = board
     return self.dctLeaderboard
 
+  def leaderboard_header(self, dct):
+    if 'hdr' in dct:
+      return dct['hdr']
+    return 'Pos Name  Money  Thru' if dct.get('sort_by') == 'money' else self.leaderboard_columns
+
+  def leaderboard_line(self, n, dct, board):
+    if board.get('sort_by') == 'money':
+      money = '--' if dct['money'] == 0.0 else '${:<2g}'.format(dct['money'])
+      return '{:<3} {:<6} {:^5} {:>4}'.format(dct['pos'], dct['player'].nick_name, money, dct['thru'])
+    return '{:<3} {:<6} {:>5} {:>4}'.format(dct['pos'], dct['player'].nick_name, dct['total'], dct['thru'])
+
   def getStatus(self, **kwargs):
     """Scorecard with all players."""
     if self._next_hole is None:
       self.dctStatus['next_hole'] = None
-      self.dctStatus['line'] = 'Round complete'
     else:
       self.dctStatus['next_hole'] = self._next_hole+1
-      line = ''
       if self._next_hole in self._holes:
         self.dctStatus['par'] = self.golf_round.course.holes[self._next_hole].par
         self.dctStatus['handicap'] = self.golf_round.course.holes[self._next_hole].handicap
-        line = 'Hole {} Par {} Hdcp {} '.format(
-            self.dctStatus['next_hole'], self.dctStatus['par'], self.dctStatus['handicap'])
-      line += 'Carry:{}'.format(self._carry)
-      if self.wager and self._carry:
-        line += ' ${:<6g}'.format(self._carry*self.wager*len(self._players))
-      if self._use_green_in_regulation:
-        line += ' All greens in play'
-      self.dctStatus['line'] = line
+      self.dctStatus['carry'] = self._carry
+      self.dctStatus['payout'] = self._carry*self.wager*len(self._players) if self.wager else 0
+      self.dctStatus['green_in_regulation'] = self._use_green_in_regulation
     return self.dctStatus
 
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round complete'
+    line = ''
+    if 'par' in dct:
+      line = 'Hole {} Par {} Hdcp {} '.format(dct['next_hole'], dct['par'], dct['handicap'])
+    line += 'Carry:{}'.format(dct['carry'])
+    if dct['payout']:
+      line += ' ${:<6g}'.format(dct['payout'])
+    if dct['green_in_regulation']:
+      line += ' All greens in play'
+    return line
+
   @property
   def total_payout(self):
     """Overload to only count Par 3 holes."""
@@ -1,26 +1,29 @@
 """ game_match.py - GolfGame class."""
 from .game_net import GameNet, NetPlayer
 from .exceptions import GolfException
+from .score_matrix import ScoreMatrix
 
 class MatchPlayer(NetPlayer):
   def __init__(self, game, result, min_handicap):
     super().__init__(game, result, min_handicap)
-    self.dct_score = self._init_dict()
-    self.dct_score['total'] = 0
+    # holes are the match standing after each hole, out and in the standing after 9 and 18
+    self.score = self.score_row()
     self.status = 'All Square'
     self.win = None
 
   @property
   def total(self):
-    return self.dct_score['total']
+    return self.score.total
   
   def update_score(self, index, score):
-    self.dct_score['total'] += score
-    self.dct_score['holes'][index] = self.dct_score['total']
+    row = self.score
+    row.total += score
+    row.holes[index] = row.total
+    row.thru = index+1
     if index == 8:
-      self.dct_score['out'] = self.dct_score['total']
+      row.out = row.total
     elif index == 17:
-      self.dct_score['in'] = self.dct_score['total']
+      row.inn = row.total
 
   def update_status(self, to_play):
     if self.total == 0:
@@ -32,7 +35,7 @@ class MatchPlayer(NetPlayer):
         self.win = True
         if to_play > 0:
           self.status = '{} & {}'.format(self.total, to_play)
-          self.dct_score['holes'][-to_play:] = to_play*[None]
+          self.score.holes[-to_play:] = to_play*[None]
     if self.total < 0:
       # losing
       self.status = '{} Down'.format(abs(self.total))
@@ -40,7 +43,7 @@ class MatchPlayer(NetPlayer):
         self.win = False
         self.status = ''
         if to_play > 0:
-          self.dct_score['holes'][-to_play:] = to_play*[None]
+          self.score.holes[-to_play:] = to_play*[None]
     if self.win is None and to_play > 0 and to_play < 5:
       self.status += ' {} to play'.format(to_play)
     return self.win
@@ -72,7 +75,10 @@ Handicaps are used in match play.
     self.winner = None
     self.to_play = len(self.golf_round.course.holes)
     self.thru = 0
-    self.dctScorecard['header'] = '{0:*^98}'.format(' Match ')
+
+  @property
+  def scorecard_title(self):
+    return self.short_description
 
   def update(self):
     """Start the match game."""
@@ -80,15 +86,31 @@ Handicaps are used in match play.
     self.thru = self.golf_round.get_completed_holes()
     self.to_play = len(self.golf_round.course.holes) - self.thru
     for index in range(self.thru):
-      players = sorted(self._players, key=lambda pl:pl.dct_net['holes'][index])
-      if players[0].dct_net['holes'][index] < players[1].dct_net['holes'][index]:
-        # we have a winner
-        players[0].update_score(index, 1)
-        players[1].update_score(index, -1)
-      else:
-        # a tie
-        players[0].update_score(index, 0)
-        players[1].update_score(index, 0)
+      self._score_hole(index)
+    self._update_status()
+
+  def apply_hole(self, hole_num, scores):
+    super().apply_hole(hole_num, scores)
+    self.thru = hole_num
+    self.to_play = len(self.golf_round.course.holes) - self.thru
+    self._score_hole(hole_num-1)
+    # status is from the totals, as after a full update
+    for pl in self._players:
+      pl.status = 'All Square'
+      pl.win = None
+    self.winner = None
+    self._update_status()
+
+  def _score_hole(self, index):
+    ranks = ScoreMatrix.ranks([pl.net.holes[index] for pl in self._players])
+    if None in ranks:
+      # hole not played by every player yet
+      return
+    for pl, rank, other in zip(self._players, ranks, reversed(ranks)):
+      # 1 for a win, -1 for a loss and 0 for a tie
+      pl.update_score(index, other - rank)
+
+  def _update_status(self):
     for pl in self._players:
       if pl.update_status(self.to_play):
         self.winner = pl
@@ -99,67 +121,63 @@ Handicaps are used in match play.
     lstPlayers = []
     for n,sc in enumerate(self._players):
       dct = {'player': sc.doc }
-      dct['in'] = sc.dct_score['in']
-      dct['out'] = sc.dct_score['out']
+      dct['in'] = sc.score.inn
+      dct['out'] = sc.score.out
       dct['total'] = sc.total
-      dct['holes'] = sc.dct_score['holes']
-      line = '{:<6}'.format(sc.nick_name)
-      for x,bump in zip(sc.dct_score['holes'][:9], sc._bumps[:9]):
-        xs = '{:d}'.format(x) if x is not None else ''
-        xs = '{}{}'.format('*' if bump > 0 else '',xs)
-        line += ' {:>3}'.format(xs)
-      line += ' {:>4d}'.format(dct['out'])
-      for x,bump in zip(sc.dct_score['holes'][9:], sc._bumps[9:]):
-        xs = '{:d}'.format(x) if x is not None else ''
-        xs = '{}{}'.format('*' if bump > 0 else '',xs)
-        line += ' {:>3}'.format(xs)
-      line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
-      dct['line'] = line
+      dct['holes'] = sc.score.holes
+      dct['bumps'] = sc._bumps
       lstPlayers.append(dct)
     self.dctScorecard['players'] = lstPlayers
     return self.dctScorecard
+
+  def scorecard_line(self, n, dct):
+    line = '{:<6}'.format(dct['player'].nick_name)
+    for x,bump in zip(dct['holes'][:9], dct['bumps'][:9]):
+      xs = '{:d}'.format(x) if x is not None else ''
+      xs = '{}{}'.format('*' if bump > 0 else '',xs)
+      line += ' {:>3}'.format(xs)
+    line += ' {:>4d}'.format(dct['out'])
+    for x,bump in zip(dct['holes'][9:], dct['bumps'][9:]):
+      xs = '{:d}'.format(x) if x is not None else ''
+      xs = '{}{}'.format('*' if bump > 0 else '',xs)
+      line += ' {:>3}'.format(xs)
+    line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
+    return line
   
   def getLeaderboard(self, **kwargs):
     self.dctLeaderboard['thru'] = self.thru
     self.dctLeaderboard['to_play'] = self.to_play
     self.dctLeaderboard['final'] = self.final
-    board = []
-    for n,pl in enumerate(self._players):
-      line = '{:<10}'.format(pl.nick_name)
-      if pl.total > 0 or (pl.total == 0 and n == 0):
-        line += pl.status
-      dct = {
-        'player': pl.doc,
-        'line': line,
-        'status': pl.status,
-      }
-      board.append(dct)
-    self.dctLeaderboard['leaderboard'] = board
-    self.dctLeaderboard['hdr'] = '{:<10}{}'.format('Match', 'Final' if self.final else 'Thru {}'.format(self.thru))
+    self.dctLeaderboard['leaderboard'] = [{'player': pl.doc, 'status': pl.status, 'total': pl.total} for pl in self._players]
     return self.dctLeaderboard
 
+  def leaderboard_header(self, dct):
+    return '{:<10}{}'.format('Match', 'Final' if dct['final'] else 'Thru {}'.format(dct['thru']))
+
+  def leaderboard_line(self, n, dct, board):
+    line = '{:<10}'.format(dct['player'].nick_name)
+    if dct['total'] > 0 or (dct['total'] == 0 and n == 0):
+      line += dct['status']
+    return line
+
   def getStatus(self, **kwargs):
     n = self.golf_round.get_completed_holes()
     if n < len(self.golf_round.course.holes):
       self.dctStatus['next_hole'] = n+1
       self.dctStatus['par'] = self.golf_round.course.holes[n].par
       self.dctStatus['handicap'] = self.golf_round.course.holes[n].handicap
-      bumps = []
-      bump_line = []
-      for sc in self._players:
-        if sc._bumps[n] > 0:
-          dct = {'player': sc.doc, 'bumps': sc._bumps[n]}
-          bumps.append(dct)
-          bump_line.append('{}{}'.format(sc.nick_name, '({})'.format(dct['bumps']) if dct['bumps'] > 1 else ''))
-      self.dctStatus['bumps'] = bumps
-      self.dctStatus['line'] = 'Hole {} Par {} Hdcp {}'.format(
-        self.dctStatus['next_hole'], self.dctStatus['par'], self.dctStatus['handicap'])
-      if bumps:
-        self.dctStatus['line'] += ' Bumps: {}'.format(','.join(bump_line))
+      self.dctStatus['bumps'] = [{'player': sc.doc, 'bumps': sc._bumps[n]} for sc in self._players if sc._bumps[n] > 0]
     else:
       # round complete
       self.dctStatus['next_hole'] = None
       self.dctStatus['par'] = self.golf_round.course.total
       self.dctStatus['handicap'] = None
-      self.dctStatus['line'] = 'Round Complete'
     return self.dctStatus
+
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round Complete'
+    line = 'Hole {} Par {} Hdcp {}'.format(dct['next_hole'], dct['par'], dct['handicap'])
+    if dct['bumps']:
+      line += ' Bumps: {}'.format(self.bumps_text(dct['bumps']))
+    return line
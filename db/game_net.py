@@ -7,7 +7,7 @@ from .game import GolfGame, GamePlayer
 class NetPlayer(GamePlayer):
   def __init__(self, game, result, min_handicap):
     super().__init__(game, result)
-    self.dct_net = self._init_dict()
+    self.net = self.score_row()
     self._bumps = self.calc_bumps(min_handicap)
 
 class GameNet(GolfGame):
@@ -21,6 +21,10 @@ The bumps will be added to the lowest handicap holes on the course being played.
   game_options = {
     'use_full_net':   { 'default': False, 'type': 'bool',  'desc': 'Use full net instead of relative to lowest handicap.' },
   }
+  incremental = True
+  inputs = ('gross', 'handicaps')
+  leaderboard_columns = 'Pos Name     Net Thru'
+
   def setup(self, **kwargs):
     """Start the game."""
     #self.use_full_net = kwargs.get('use_full_net', False)
@@ -32,18 +36,20 @@ The bumps will be added to the lowest handicap holes on the course being played.
       min_handicap = min([result.course_handicap for result in self.golf_round.results])
     #print('{} use_full_net:{} min_handicap:{}'.format(self.__class__.__name__, self.use_full_net, min_handicap))
     self._players = [player_class(self, result, min_handicap) for result in self.golf_round.results]
-    # add header to scorecard
-    self.dctScorecard['header'] = '{0:*^98}'.format(' {} Net '.format('Full' if self.use_full_net else 'Relative'))
-    self.dctLeaderboard['hdr'] = 'Pos Name     Net Thru'
+
+  @property
+  def scorecard_title(self):
+    return '{} Net'.format('Full' if self.use_full_net else 'Relative')
 
   def update(self):
     """Update gross results for all scores so far."""
-    for pl, result in zip(self._players, self.golf_round.doc.results):
-      for score in result.scores:
-        n = score.num-1
-        # update net 
-        pl.dct_net['holes'][n] = score.gross - pl._bumps[n]
-      pl.update_totals(pl.dct_net)
+    for pl in self._players:
+      pl.net.load(pl.net_row())
+
+  def apply_hole(self, hole_num, scores):
+    n = hole_num-1
+    for pl, score in zip(self._players, scores):
+      pl.net.set(n, score.gross - pl._bumps[n])
 
   def getScorecard(self, **kwargs):
     """Scorecard with all players."""
@@ -51,77 +57,74 @@ The bumps will be added to the lowest handicap holes on the course being played.
     for n,sc in enumerate(self._players):
       dct = {
         'player': sc.doc,
-        'in': sc.dct_net['in'],
-        'out': sc.dct_net['out'],
-        'total': sc.dct_net['total'],
-        'holes': sc.dct_net['holes'],
+        'in': sc.net.inn,
+        'out': sc.net.out,
+        'total': sc.net.total,
+        'holes': sc.net.holes,
         'bumps': sc._bumps,
+        'course_handicap': sc.result.course_handicap,
       }
-      line = '{:<3} {:>2}'.format(sc.getInitials(), sc.result.course_handicap)
-      for net,bump in zip(sc.dct_net['holes'][:9], sc._bumps[:9]):
-        nets = '{}{}'.format(bump*'*', net if net is not None else '')
-        line += ' {:>3}'.format(nets)
-      line += ' {:>4}'.format(dct['out'])
-      for net,bump in zip(sc.dct_net['holes'][9:], sc._bumps[9:]):
-        nets = '{}{}'.format(bump*'*', net if net is not None else '')
-        line += ' {:>3}'.format(nets)
-      line += ' {:>4} {:>4}'.format(dct['in'], dct['total'])
-      dct['line'] = line
       lstPlayers.append(dct)
     self.dctScorecard['players'] = lstPlayers
     return self.dctScorecard
 
+  def scorecard_line(self, n, dct):
+    player = dct['player']
+    line = '{:<3} {:>2}'.format(player.first_name[0] + player.last_name[0], dct['course_handicap'])
+    for net,bump in zip(dct['holes'][:9], dct['bumps'][:9]):
+      nets = '{}{}'.format(bump*'*', net if net is not None else '')
+      line += ' {:>3}'.format(nets)
+    line += ' {:>4}'.format(dct['out'])
+    for net,bump in zip(dct['holes'][9:], dct['bumps'][9:]):
+      nets = '{}{}'.format(bump*'*', net if net is not None else '')
+      line += ' {:>3}'.format(nets)
+    line += ' {:>4} {:>4}'.format(dct['in'], dct['total'])
+    return line
+
   def getLeaderboard(self, **kwargs):
     """Scorecard with all players."""
     board = []
-    scores = sorted(self._players, key=lambda score: score.dct_net['total'])
+    scores = sorted(self._players, key=lambda score: score.net.total)
     pos = 1
     prev_total = None
     for sc in scores:
       score_dct = {
         'player': sc.doc,
-        'total' : sc.dct_net['total'],
+        'total' : sc.net.total,
       }
       if prev_total != None and score_dct['total'] > prev_total:
         pos += 1
       prev_total = score_dct['total']
       score_dct['pos'] = pos
-      for n,net in enumerate(sc.dct_net['holes']):
-        if net == None:
-          break
-      else:
-        n += 1
-      score_dct['thru'] = n
-      score_dct['line'] = '{:<3} {:<6} {:>5} {:>4}'.format(
-        score_dct['pos'], score_dct['player'].nick_name, score_dct['total'], score_dct['thru'])
+      score_dct['thru'] = self.golf_round.matrix.thru(sc.index)
       board.append(score_dct)
     self.dctLeaderboard['leaderboard'] = board
     return self.dctLeaderboard
 
+  def leaderboard_line(self, n, dct, board):
+    return '{:<3} {:<6} {:>5} {:>4}'.format(dct['pos'], dct['player'].nick_name, dct['total'], dct['thru'])
+
   def getStatus(self, **kwargs):
     """."""
-    for n,net in enumerate(self._players[0].dct_net['holes']):
+    for n,net in enumerate(self._players[0].net.holes):
       if net is None:
         self.dctStatus['next_hole'] = n+1
         self.dctStatus['par'] = self.golf_round.course.holes[n].par
         self.dctStatus['handicap'] = self.golf_round.course.holes[n].handicap
-        bumps = []
-        bump_line = []
-        for sc in self._players:
-          if sc._bumps[n] > 0:
-            dct = {'player': sc.result.player, 'bumps': sc._bumps[n]}
-            bumps.append(dct)
-            bump_line.append('{}{}'.format(sc.nick_name, '({})'.format(dct['bumps']) if dct['bumps'] > 1 else ''))
-        self.dctStatus['bumps'] = bumps
-        self.dctStatus['line'] = 'Hole {} Par {} Hdcp {}'.format(
-          self.dctStatus['next_hole'], self.dctStatus['par'], self.dctStatus['handicap'])
-        if bumps:
-          self.dctStatus['line'] += ' bumps: ' + ','.join(bump_line)
+        self.dctStatus['bumps'] = [{'player': sc.result.player, 'bumps': sc._bumps[n]}
+                                   for sc in self._players if sc._bumps[n] > 0]
         break
     else:
       # round complete
       self.dctStatus['next_hole'] = None
       self.dctStatus['par'] = self.golf_round.course.total
       self.dctStatus['handicap'] = None
-      self.dctStatus['line'] = 'Round Complete'
     return self.dctStatus
+
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round Complete'
+    line = 'Hole {} Par {} Hdcp {}'.format(dct['next_hole'], dct['par'], dct['handicap'])
+    if dct['bumps']:
+      line += ' bumps: ' + self.bumps_text(dct['bumps'])
+    return line
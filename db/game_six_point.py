@@ -1,11 +1,12 @@
 """ game.py - GolfGame class."""
 from .game_net import GameNet, NetPlayer
 from .exceptions import GolfException
+from .score_matrix import ScoreMatrix
 
 class SixPointPlayer(NetPlayer):
   def __init__(self, game, result, min_handicap):
     super().__init__(game, result, min_handicap)
-    self.dct_points = self._init_dict()
+    self.points = self.score_row()
 
 
 class GameSixPoint(GameNet):
@@ -34,6 +35,7 @@ At the end of the match, all the points are totaled, with the low-point-total pl
   POINTS_3RD     = 0
   TITLE = 'Six Point'
   NAME = 'six_point'
+  leaderboard_columns = 'Pos Name  Points Thru'
 
   def validate(self):
     if len(self._players) != 3:
@@ -43,8 +45,10 @@ At the end of the match, all the points are totaled, with the low-point-total pl
     """Start the skins game."""
     min_handicap = min([result.course_handicap for result in self.golf_round.results])
     self._players = [SixPointPlayer(self, result, min_handicap) for result in self.golf_round.results]
-    self.dctScorecard['header'] = '{0:*^98}'.format(' {} '.format(self.TITLE))
-    self.dctLeaderboard['hdr'] = 'Pos Name  Points Thru'
+
+  @property
+  def scorecard_title(self):
+    return self.TITLE
 
   def update(self):
     """Update gross results for all scores so far."""
@@ -53,64 +57,68 @@ At the end of the match, all the points are totaled, with the low-point-total pl
     # now do score updates
     self.thru = self.golf_round.get_completed_holes()
     for index in range(self.thru):
-      players = sorted(self._players, key=lambda pl:pl.dct_net['holes'][index])
-      scores = [pl.dct_net['holes'][index] for pl in players]
-      if scores.count(scores[0]) == 3:
-        # 1,1,1
-        points = 3*[self.POINTS_ALL_TIE]
-      elif scores.count(scores[0]) == 2:
-        # 1,1,2
-        points = [self.POINTS_TIE_1ST, self.POINTS_TIE_1ST, self.POINTS_3RD]
-      elif scores.count(scores[1]) == 2:
-        # 1,2,2
-        points = [self.POINTS_WIN_1ST, self.POINTS_TIE_2ND, self.POINTS_TIE_2ND]
-      else:
-        # 1,2,3
-        points = [self.POINTS_WIN_1ST, self.POINTS_WIN_2ND, self.POINTS_3RD]
-      for pl,point in zip(players, points):
-        pl.dct_points['holes'][index] = point
-    for pl in self._players:
-      pl.update_totals(pl.dct_points)
+      self._score_hole(index)
+
+  def apply_hole(self, hole_num, scores):
+    super().apply_hole(hole_num, scores)
+    self.thru = hole_num
+    self._score_hole(hole_num-1)
+
+  def _score_hole(self, index):
+    ranks = ScoreMatrix.ranks([pl.net.holes[index] for pl in self._players])
+    if None in ranks:
+      # hole not played by every player yet
+      return
+    for pl, rank in zip(self._players, ranks):
+      pl.points.set(index, self._points(rank, ranks.count(rank)))
+
+  def _points(self, rank, ties):
+    """Points for a rank on a hole shared by ties players."""
+    if rank == 0:
+      return (self.POINTS_WIN_1ST, self.POINTS_TIE_1ST, self.POINTS_ALL_TIE)[ties-1]
+    if rank == 1:
+      return self.POINTS_WIN_2ND if ties == 1 else self.POINTS_TIE_2ND
+    return self.POINTS_3RD
 
   def getScorecard(self, **kwargs):
     """Scorecard with all players."""
     lstPlayers = []
     for n,sc in enumerate(self._players):
       dct = {'player': sc.doc }
-      dct['in'] = sc.dct_points['in']
-      dct['out'] = sc.dct_points['out']
-      dct['total'] = sc.dct_points['total']
-      dct['holes'] = sc.dct_points['holes']
-      line = '{:<6}'.format(sc.nick_name)
-      for point in sc.dct_points['holes'][:9]:
-        line += ' {:>3}'.format(point if point != None else '')
-      line += ' {:>4d}'.format(dct['out'])
-      for point in sc.dct_points['holes'][9:]:
-        line += ' {:>3}'.format(point if point != None else '')
-      line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
-      dct['line'] = line
+      dct['in'] = sc.points.inn
+      dct['out'] = sc.points.out
+      dct['total'] = sc.points.total
+      dct['holes'] = sc.points.holes
       lstPlayers.append(dct)
     self.dctScorecard['players'] = lstPlayers
     return self.dctScorecard
+
+  def scorecard_line(self, n, dct):
+    line = '{:<6}'.format(dct['player'].nick_name)
+    for point in dct['holes'][:9]:
+      line += ' {:>3}'.format(point if point != None else '')
+    line += ' {:>4d}'.format(dct['out'])
+    for point in dct['holes'][9:]:
+      line += ' {:>3}'.format(point if point != None else '')
+    line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
+    return line
   
   def getLeaderboard(self, **kwargs):
     board = []
-    scores = sorted(self._players, key=lambda pl: pl.dct_points['total'], reverse=True)
+    scores = sorted(self._players, key=lambda pl: pl.points.total, reverse=True)
     pos = 1
     thru = self.golf_round.get_completed_holes()
     prev_total = None
     for sc in scores:
       score_dct = {
         'player': sc.doc,
-        'total' : sc.dct_points['total'],
+        'total' : sc.points.total,
       }
       if prev_total != None and score_dct['total'] < prev_total:
         pos += 1
       prev_total = score_dct['total']
       score_dct['pos'] = pos
       score_dct['thru'] = thru
-      score_dct['line'] = '{:<3} {:<6} {:>5} {:>4}'.format(
-        score_dct['pos'], score_dct['player'].nick_name, score_dct['total'], score_dct['thru'])
       board.append(score_dct)
     self.dctLeaderboard['leaderboard'] = board
     return self.dctLeaderboard
@@ -121,24 +129,19 @@ At the end of the match, all the points are totaled, with the low-point-total pl
       self.dctStatus['next_hole'] = n+1
       self.dctStatus['par'] = self.golf_round.course.holes[n].par
       self.dctStatus['handicap'] = self.golf_round.course.holes[n].handicap
-      bumps = []
-      bump_line = []
-      for sc in self._players:
-        if sc._bumps[n] > 0:
-          dct = {'player': sc.doc, 'bumps': sc._bumps[n]}
-          bumps.append(dct)
-          bump_line.append('{}{}'.format(sc.nick_name, '({})'.format(dct['bumps']) if dct['bumps'] > 1 else ''))
-      self.dctStatus['bumps'] = bumps
-      self.dctStatus['line'] = 'Hole {} Par {} Hdcp {}'.format(
-        self.dctStatus['next_hole'], self.dctStatus['par'], self.dctStatus['handicap'])
-      if bumps:
-        self.dctStatus['line'] += ' Bumps:{}'.format(','.join(bump_line))
-      self.dctStatus['line'] += ' Points:{},{},{}'.format(
-        self.POINTS_WIN_1ST, self.POINTS_WIN_2ND, self.POINTS_3RD)
+      self.dctStatus['bumps'] = [{'player': sc.doc, 'bumps': sc._bumps[n]} for sc in self._players if sc._bumps[n] > 0]
     else:
       # round complete
       self.dctStatus['next_hole'] = None
       self.dctStatus['par'] = self.golf_round.course.total
       self.dctStatus['handicap'] = None
-      self.dctStatus['line'] = 'Round Complete'
     return self.dctStatus
+
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round Complete'
+    line = 'Hole {} Par {} Hdcp {}'.format(dct['next_hole'], dct['par'], dct['handicap'])
+    if dct['bumps']:
+      line += ' Bumps:{}'.format(self.bumps_text(dct['bumps']))
+    line += ' Points:{},{},{}'.format(self.POINTS_WIN_1ST, self.POINTS_WIN_2ND, self.POINTS_3RD)
+    return line
@@ -1,13 +1,14 @@
 """ game.py - GolfGame class."""
 from operator import itemgetter
 from .game import GolfGame,GamePlayer
+from .score_matrix import ScoreMatrix
 
 class SkinsPlayer(GamePlayer):
   def __init__(self, game, result, min_handicap):
     super().__init__(game, result)
-    self.dct_nets = self._init_dict()
+    self.nets = self.score_row()
     self._bumps = self.calc_bumps(min_handicap)
-    self.dct_skins = self._init_dict()
+    self.skins = self.score_row()
 
 
 class GameSkins(GolfGame):
@@ -34,6 +35,10 @@ In both cases the other players each lose a skin.
     'use_carryover': {'default': True, 'type': 'bool', 'desc': 'If use_carryover is set then skins not won will carry to the next hole'},
   }
   
+  incremental = True
+  inputs = ('gross', 'handicaps')
+  leaderboard_columns = 'Pos Name   Skins Thru'
+
   def setup(self, **kwargs):
     """Start the skins game."""
     # find min handicap in all players
@@ -41,111 +46,112 @@ In both cases the other players each lose a skin.
     self._players = [SkinsPlayer(self, result, min_handicap) for result in self.golf_round.results]
     # skins carryover set to 1
     self.carryover = 1
-    self.dctScorecard['header'] = '{0:*^98}'.format(' Skins ')
-    self.dctLeaderboard['hdr'] = 'Pos Name   Skins Thru'
 
   def update(self):
     """Update gross results for all scores so far."""
-    for pl, result in zip(self._players, self.golf_round.doc.results):
-      # calculate net
-      for score in result.scores:
-        n = score.num-1
-        pl.dct_nets['holes'][n] = score.gross - pl._bumps[n] 
+    for pl in self._players:
+      pl.nets.load(pl.net_row())
     for n in range(len(self.golf_round.course.holes)):
-      if pl.dct_nets['holes'][n] == None:
-        continue
-      net_scores = [pl.dct_nets['holes'][n] for pl in self._players]
-      net_scores.sort()
-      winner = net_scores[0] < net_scores[1]
-      for pl in self._players:
-        if winner and pl.dct_nets['holes'][n] == net_scores[0]:
-          win = self.carryover * (len(self._players)-1)
-          pl.dct_skins['holes'][n] = win
-          self.carryover = 1
-        pl.update_totals(pl.dct_skins)
-      if not winner and self.use_carryover:
-        self.carryover += 1
+      self._score_hole(n)
+
+  def apply_hole(self, hole_num, scores):
+    n = hole_num-1
+    for pl, score in zip(self._players, scores):
+      pl.nets.set(n, score.gross - pl._bumps[n])
+    self._score_hole(n)
+
+  def _score_hole(self, n):
+    """Award the skin for hole index n, nets are set."""
+    ranks = ScoreMatrix.ranks([pl.nets.holes[n] for pl in self._players])
+    if None in ranks:
+      # hole not played by every player yet
+      return
+    # a skin is won by a single low net
+    winner = ranks.count(0) == 1
+    for pl, rank in zip(self._players, ranks):
+      if winner and rank == 0:
+        win = self.carryover * (len(self._players)-1)
+        pl.skins.set(n, win)
+        self.carryover = 1
+    if not winner and self.use_carryover:
+      self.carryover += 1
 
   def getScorecard(self, **kwargs):
     """Scorecard with all players."""
     lstPlayers = []
     for n,sc in enumerate(self._players):
       dct = {'player': sc.doc }
-      dct['in'] = sc.dct_skins['in']
-      dct['out'] = sc.dct_skins['out']
-      dct['total'] = sc.dct_skins['total']
-      dct['holes'] = sc.dct_skins['holes']
-      line = '{:<6}'.format(sc.nick_name)
-      for skin,bumps in zip(sc.dct_skins['holes'][:9], sc._bumps[:9]):
-        # show bumps
-        sk = bumps*'*'
-        if skin and skin > 0:
-          sk += '{:d}'.format(skin)
-        line += ' {:>3}'.format(sk)
-      line += ' {:>4d}'.format(dct['out'])
-      for skin,bumps in zip(sc.dct_skins['holes'][9:], sc._bumps[9:]):
-        # show bumps
-        sk = bumps*'*'
-        if skin and skin > 0:
-          sk += '{:d}'.format(skin)
-        line += ' {:>3}'.format(sk)
-      line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
-      dct['line'] = line
+      dct['in'] = sc.skins.inn
+      dct['out'] = sc.skins.out
+      dct['total'] = sc.skins.total
+      dct['holes'] = sc.skins.holes
+      dct['bumps'] = sc._bumps
       lstPlayers.append(dct)
     self.dctScorecard['players'] = lstPlayers
     return self.dctScorecard
-  
+
+  def scorecard_line(self, n, dct):
+    line = '{:<6}'.format(dct['player'].nick_name)
+    for skin,bumps in zip(dct['holes'][:9], dct['bumps'][:9]):
+      # show bumps
+      sk = bumps*'*'
+      if skin and skin > 0:
+        sk += '{:d}'.format(skin)
+      line += ' {:>3}'.format(sk)
+    line += ' {:>4d}'.format(dct['out'])
+    for skin,bumps in zip(dct['holes'][9:], dct['bumps'][9:]):
+      # show bumps
+      sk = bumps*'*'
+      if skin and skin > 0:
+        sk += '{:d}'.format(skin)
+      line += ' {:>3}'.format(sk)
+    line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
+    return line
+
   def getLeaderboard(self, **kwargs):
     board = []
-    scores = sorted(self._players, key=lambda score: score.dct_skins['total'], reverse=True)
+    scores = sorted(self._players, key=lambda score: score.skins.total, reverse=True)
     pos = 1
     prev_total = None
     for sc in scores:
       score_dct = {
         'player': sc.doc,
-        'total' : sc.dct_skins['total'],
+        'total' : sc.skins.total,
       }
       if prev_total != None and score_dct['total'] < prev_total:
         pos += 1
 
       prev_total = score_dct['total']
       score_dct['pos'] = pos
-      for n,net in enumerate(sc.dct_nets['holes']):
-        if net is None:
-          break
-      else:
-        n += 1
-      score_dct['thru'] = n
-      score_dct['line'] = '{:<3} {:<6} {:>+5} {:>4}'.format(
-        score_dct['pos'], score_dct['player'].nick_name, score_dct['total'], score_dct['thru'])
+      score_dct['thru'] = self.golf_round.matrix.thru(sc.index)
       board.append(score_dct)
     self.dctLeaderboard['leaderboard'] = board
     return self.dctLeaderboard
 
+  def leaderboard_line(self, n, dct, board):
+    return '{:<3} {:<6} {:>+5} {:>4}'.format(dct['pos'], dct['player'].nick_name, dct['total'], dct['thru'])
+
   def getStatus(self, **kwargs):
-    for n,net in enumerate(self._players[0].dct_nets['holes']):
+    for n,net in enumerate(self._players[0].nets.holes):
       if net is None:
         self.dctStatus['next_hole'] = n+1
         self.dctStatus['par'] = self.golf_round.course.holes[n].par
         self.dctStatus['handicap'] = self.golf_round.course.holes[n].handicap
-        bumps = []
-        bump_line = []
-        for sc in self._players:
-          if sc._bumps[n] > 0:
-            dct = {'player': sc.doc, 'bumps': sc._bumps[n]}
-            bumps.append(dct)
-            bump_line.append('{}{}'.format(sc.nick_name, '({})'.format(dct['bumps']) if dct['bumps'] > 1 else ''))
-        self.dctStatus['bumps'] = bumps
-        self.dctStatus['line'] = 'Hole {} Par {} Hdcp {}'.format(
-          self.dctStatus['next_hole'], self.dctStatus['par'], self.dctStatus['handicap'])
-        if bumps:
-          self.dctStatus['line'] += ' Bumps:{}'.format(','.join(bump_line))
-        self.dctStatus['line'] += ' Skins:{}'.format(self.carryover)
+        self.dctStatus['bumps'] = [{'player': sc.doc, 'bumps': sc._bumps[n]} for sc in self._players if sc._bumps[n] > 0]
+        self.dctStatus['carryover'] = self.carryover
         break
     else:
       # round complete
       self.dctStatus['next_hole'] = None
       self.dctStatus['par'] = self.golf_round.course.total
       self.dctStatus['handicap'] = None
-      self.dctStatus['line'] = 'Round Complete'
     return self.dctStatus
+
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round Complete'
+    line = 'Hole {} Par {} Hdcp {}'.format(dct['next_hole'], dct['par'], dct['handicap'])
+    if dct['bumps']:
+      line += ' Bumps:{}'.format(self.bumps_text(dct['bumps']))
+    line += ' Skins:{}'.format(dct['carryover'])
+    return line
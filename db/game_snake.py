@@ -1,11 +1,10 @@
 """ game_snake.py - Implement."""
 from .game import GolfGame,GamePlayer
-from .exceptions import GolfGameException
 
 class SnakePlayer(GamePlayer):
   def __init__(self, game, result):
     super().__init__(game, result)
-    self.dct_points = self._init_dict()
+    self.points = self.score_row()
     self.dct_snake = [None for _ in range(len(self.game.golf_round.course.holes))]
 
 class GameSnake(GolfGame):
@@ -17,20 +16,21 @@ class GameSnake(GolfGame):
   game_options = {
     'snake_type': {'choices': ('Points', 'Hold'), 'default': 'Hold', 'type': 'choice', 'desc': 'Points will lose every 3 putt. Hold will only lose when you already have the snake, always pays on 9 and 18.'},
   }
+  inputs = ('putts', 'hole_data')
   
   def setup(self, **kwargs):
     """Start the game."""
     self._players = [SnakePlayer(self, result) for result in self.golf_round.results]
     self._has_snake = None
-    # update header to scorecard
-    title = ' Snake - {} '.format(self.snake_type)
-    self.dctScorecard['header'] = '{0:*^98}'.format(title)
     self._thru = ''
 
+  @property
+  def scorecard_title(self):
+    return 'Snake - {}'.format(self.snake_type)
+
   def _pay_snake(self, index, snake_winner):
     # immediate payout and release snake
-    snake_winner.dct_points['holes'][index] = -1
-    snake_winner.update_totals(snake_winner.dct_points)
+    snake_winner.points.set(index, -1)
     self._has_snake = None
     
   def _set_snake(self, index, snake_winner):
@@ -71,15 +71,10 @@ class GameSnake(GolfGame):
               loser = self.hole_data[str(hole_num)]['closest_3_putt']
               lst_losers = [tup for tup in lst_losers if tup[0].nick_name == loser]
             if len(lst_losers) > 1:
-              dct = {
-                'hole_num': hole_num,
-                'players': [w[0].doc for w in lst_losers],
-                'msg': 'Which 3 putt player had the closest 1st putt on hole {}?'.format(hole_num),
-                'hole_data' : self.hole_data,
-                'key' : 'closest_3_putt',
-                'game': self,
-              }
-              raise GolfGameException(dct)
+              # the questions of later holes do not depend on this answer
+              self.ask(hole_num, [w[0].doc for w in lst_losers],
+                       'Which 3 putt player had the closest 1st putt on hole {}?'.format(hole_num), 'closest_3_putt')
+              continue
         #
         if len(lst_losers) == 1:
           # we have a 3 putt winner (loser)
@@ -100,45 +95,45 @@ class GameSnake(GolfGame):
     lstPlayers = []
     for n,score in enumerate(self._players):
       dct = {'player': score.doc }
-      dct['in'] = score.dct_points['in']
-      dct['out'] = score.dct_points['out']
-      dct['total'] = score.dct_points['total']
-      dct['holes'] = score.dct_points['holes']
+      dct['in'] = score.points.inn
+      dct['out'] = score.points.out
+      dct['total'] = score.points.total
+      dct['holes'] = score.points.holes
       dct['snake'] = score.dct_snake
-      # build line for stdout
-      line = '{:<6}'.format(score.nick_name)
-      for putt,snake in zip(score.dct_points['holes'][:9], score.dct_snake[:9]):
-        s = ''
-        if putt:
-          s = putt
-        elif snake:
-          s = snake
-        line += ' {:>3}'.format(s)
-      line += ' {:>4}'.format(dct['out'])
-      for putt,snake in zip(score.dct_points['holes'][9:], score.dct_snake[9:]):
-        s = ''
-        if putt:
-          s = putt
-        elif snake:
-          s = snake
-        line += ' {:>3}'.format(s)
-      line += ' {:>4} {:>4}'.format(dct['in'], dct['total'])
-      dct['line'] = line
       lstPlayers.append(dct)
     self.dctScorecard['players'] = lstPlayers
     return self.dctScorecard
 
+  def scorecard_line(self, n, dct):
+    line = '{:<6}'.format(dct['player'].nick_name)
+    for putt,snake in zip(dct['holes'][:9], dct['snake'][:9]):
+      s = ''
+      if putt:
+        s = putt
+      elif snake:
+        s = snake
+      line += ' {:>3}'.format(s)
+    line += ' {:>4}'.format(dct['out'])
+    for putt,snake in zip(dct['holes'][9:], dct['snake'][9:]):
+      s = ''
+      if putt:
+        s = putt
+      elif snake:
+        s = snake
+      line += ' {:>3}'.format(s)
+    line += ' {:>4} {:>4}'.format(dct['in'], dct['total'])
+    return line
+
   def getLeaderboard(self, **kwargs):
     board = []
-    self.dctLeaderboard['hdr'] = 'Pos Name  Points Thru'
-    scores = sorted(self._players, key=lambda score: score.dct_points['total'], reverse=True)
+    scores = sorted(self._players, key=lambda score: score.points.total, reverse=True)
     sort_by = 'total'
     pos = 1
     prev_total = None
     for sc in scores:
       score_dct = {
         'player': sc.doc,
-        'total' : sc.dct_points['total'],
+        'total' : sc.points.total,
         'has_snake' : sc == self._has_snake,
       }
       if prev_total != None and score_dct[sort_by] != prev_total:
@@ -146,27 +141,31 @@ class GameSnake(GolfGame):
       prev_total = score_dct[sort_by]
       score_dct['pos'] = pos
       score_dct['thru'] = self._thru
-      score_dct['line'] = '{:<2} {}{:<6} {:>5} {:>4}'.format(
-        score_dct['pos'], '*' if score_dct['has_snake'] else ' ', score_dct['player'].nick_name, score_dct['total'], score_dct['thru'])
       board.append(score_dct)
     self.dctLeaderboard['leaderboard'] = board
     return self.dctLeaderboard
 
+  def leaderboard_line(self, n, dct, board):
+    return '{:<2} {}{:<6} {:>5} {:>4}'.format(
+      dct['pos'], '*' if dct['has_snake'] else ' ', dct['player'].nick_name, dct['total'], dct['thru'])
+
   def getStatus(self, **kwargs):
     """Scorecard with all players."""
-    for n,putt in enumerate(self._players[0].dct_points['holes']):
+    for n,putt in enumerate(self._players[0].points.holes):
       if putt is None:
         self.dctStatus['next_hole'] = n+1
-        line = ''
-        if self.snake_type == 'Hold':
-          if self._has_snake:
-            line = '{} has the snake.'.format(self._has_snake.nick_name)
-          else:
-            line = 'snake is free.'
-        self.dctStatus['line'] = line
+        self.dctStatus['has_snake'] = self._has_snake.doc if self._has_snake else None
         break
     else:
       # round complete
       self.dctStatus['next_hole'] = None
-      self.dctStatus['line'] = 'Round complete'
     return self.dctStatus
+
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round complete'
+    if self.snake_type == 'Hold':
+      if dct['has_snake']:
+        return '{} has the snake.'.format(dct['has_snake'].nick_name)
+      return 'snake is free.'
+    return ''
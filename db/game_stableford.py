@@ -7,7 +7,7 @@ class StablefordPlayer(GamePlayer):
   def __init__(self, game, result):
     super().__init__(game, result)
     self._bumps = self.calc_bumps(0)
-    self.dct_points = self._init_dict()
+    self.points = self.score_row()
     self._jokers = game.jokers[n] if game.stableford_type == 'Spanish' else None
 
 class GameStableford(GolfGame):
@@ -68,25 +68,35 @@ Since most people have a hard time shooting double eagles and eagles, golfers of
         if joker[1] not in (10,11,12,13,14,15,16,17,18):
           raise GolfException('stableford_type Spanish joker[1] must be in 10-18.')
 
+  incremental = True
+  inputs = ('gross', 'handicaps')
+  leaderboard_columns = 'Pos Name  Points  Thru'
+
   def setup(self, **kwargs):
     # TODO: Final games should be FINAL. Saved/restored from database.
     self.dct_stableford = self.dct_scoring[self.stableford_type]
     # use full handicap for all players
     self._players = [StablefordPlayer(self, result) for result in self.golf_round.results]
-    self.dctScorecard['header'] = '{0:*^98}'.format(' Stableford ')
     self._thru = 0
 
   def update(self):
     """Update gross results for all scores so far."""
-    for pl, result in zip(self._players, self.golf_round.doc.results):
-      # calculate net
-      for n, score in enumerate(result.scores):
-        net_score = score.gross - pl._bumps[n] 
-        pl.dct_points['holes'][n] = self._calc_score(net_score - self.golf_round.course.holes[n].par)
-        if pl._jokers:
-          if (n+1) in pl._jokers:
-            pl.dct_points['holes'][n] *= 2
-        pl.update_totals(pl.dct_points)
+    for pl in self._players:
+      for n, net_score in enumerate(self.golf_round.net_row(pl.index, pl.min_handicap)):
+        if net_score is not None:
+          self._set_points(pl, n, net_score)
+
+  def apply_hole(self, hole_num, scores):
+    n = hole_num-1
+    for pl, score in zip(self._players, scores):
+      self._set_points(pl, n, score.gross - pl._bumps[n])
+
+  def _set_points(self, pl, n, net_score):
+    points = self._calc_score(net_score - self.golf_round.course.holes[n].par)
+    if pl._jokers:
+      if (n+1) in pl._jokers:
+        points *= 2
+    pl.points.set(n, points)
 
   def _calc_score(self, net_score):
     if net_score in self.dct_stableford:
@@ -101,92 +111,101 @@ Since most people have a hard time shooting double eagles and eagles, golfers of
     lstPlayers = []
     for n,sc in enumerate(self._players):
       dct = {'player': sc.doc }
-      dct['in'] = sc.dct_points['in']
-      dct['out'] = sc.dct_points['out']
-      dct['total'] = sc.dct_points['total']
-      dct['holes'] = sc.dct_points['holes']
+      dct['in'] = sc.points.inn
+      dct['out'] = sc.points.out
+      dct['total'] = sc.points.total
+      dct['holes'] = sc.points.holes
       dct['bumps'] = sc._bumps
-      line = '{:<6}'.format(sc.nick_name)
-      for i,(point,bump) in enumerate(zip(sc.dct_points['holes'][:9], sc._bumps[:9])):
-        s = '{}'.format(bump*'*')
-        s += '' if point is None else '{:d}'.format(point)
-        s += 'j' if sc._jokers and (i+1) in sc._jokers else ''
-        line += ' {:>3}'.format(s)
-      line += ' {:>4d}'.format(dct['out'])
-      for i,(point,bump) in enumerate(zip(sc.dct_points['holes'][9:], sc._bumps[9:])):
-        s = '{}'.format(bump*'*')
-        s += '' if point is None else '{:d}'.format(point)
-        s += 'j' if sc._jokers and (i+1) in sc._jokers else ''
-        line += ' {:>3}'.format(s)
-      line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
-      dct['line'] = line
+      dct['jokers'] = sc._jokers
       lstPlayers.append(dct)
     self.dctScorecard['players'] = lstPlayers
     return self.dctScorecard
 
+  def scorecard_line(self, n, dct):
+    jokers = dct['jokers']
+    line = '{:<6}'.format(dct['player'].nick_name)
+    for i,(point,bump) in enumerate(zip(dct['holes'][:9], dct['bumps'][:9])):
+      s = '{}'.format(bump*'*')
+      s += '' if point is None else '{:d}'.format(point)
+      s += 'j' if jokers and (i+1) in jokers else ''
+      line += ' {:>3}'.format(s)
+    line += ' {:>4d}'.format(dct['out'])
+    for i,(point,bump) in enumerate(zip(dct['holes'][9:], dct['bumps'][9:])):
+      s = '{}'.format(bump*'*')
+      s += '' if point is None else '{:d}'.format(point)
+      s += 'j' if jokers and (i+1) in jokers else ''
+      line += ' {:>3}'.format(s)
+    line += ' {:>4d} {:>4d}'.format(dct['in'], dct['total'])
+    return line
+
   def getLeaderboard(self, **kwargs):
     board = []
     sort_type = kwargs.get('sort_type', 'points')
     if sort_type == 'money' and self.wager:
-      self.dctLeaderboard['hdr'] = 'Pos Name  Money  Thru'
-      scores = sorted(self.scores, key=lambda score: score.dct_money['total'], reverse=True)
+      scores = sorted(self._players, key=lambda score: self.money(score), reverse=True)
       sort_by = 'money'
     else:
-      self.dctLeaderboard['hdr'] = 'Pos Name  Points  Thru'
-      scores = sorted(self._players, key=lambda score: score.dct_points['total'], reverse=True)
+      scores = sorted(self._players, key=lambda score: score.points.total, reverse=True)
       sort_by = 'total'
+    self.dctLeaderboard['sort_by'] = sort_by
     pos = 1
     prev_total = None
     for sc in scores:
       score_dct = {
         'player': sc.doc,
-        'total' : sc.dct_points['total'],
+        'total' : sc.points.total,
+        'money' : self.money(sc) if self.wager else None,
       }
       if prev_total != None and score_dct[sort_by] != prev_total:
         pos += 1
       prev_total = score_dct[sort_by]
       score_dct['pos'] = pos
 
-      for n,point in enumerate(sc.dct_points['holes']):
+      for n,point in enumerate(sc.points.holes):
         if point is None:
           break
       else:
         n += 1
       score_dct['thru'] = n
-      if sort_by == 'money':
-        money = '---' if score_dct['money'] == 0.0 else '${:2g}'.format(score_dct['money'])
-        score_dct['line'] = '{:<3} {:<6} {:>5} {:>4}'.format(
-          score_dct['pos'], score_dct['player'].nick_name, money, score_dct['thru'])
-      else:
-        score_dct['line'] = '{:<3} {:<6} {:>5} {:>4}'.format(
-          score_dct['pos'], score_dct['player'].nick_name, score_dct['total'], score_dct['thru'])
       board.append(score_dct)
     self.dctLeaderboard['leaderboard'] = board
     return self.dctLeaderboard
 
+  def leaderboard_header(self, dct):
+    if 'hdr' in dct:
+      return dct['hdr']
+    return 'Pos Name  Money  Thru' if dct.get('sort_by') == 'money' else self.leaderboard_columns
+
+  def money(self, pl):
+    """Money won by a player, the wager for each point more than each other player."""
+    points = [other.points.total for other in self._players]
+    return self.wager*(len(points)*pl.points.total - sum(points))
+
+  def leaderboard_line(self, n, dct, board):
+    if board.get('sort_by') == 'money':
+      money = '---' if dct['money'] == 0.0 else '${:2g}'.format(dct['money'])
+      return '{:<3} {:<6} {:>5} {:>4}'.format(dct['pos'], dct['player'].nick_name, money, dct['thru'])
+    return '{:<3} {:<6} {:>5} {:>4}'.format(dct['pos'], dct['player'].nick_name, dct['total'], dct['thru'])
+
   def getStatus(self, **kwargs):
-    for n,points in enumerate(self._players[0].dct_points['holes']):
+    for n,points in enumerate(self._players[0].points.holes):
       if points is None:
         self.dctStatus['next_hole'] = n+1
         self.dctStatus['par'] = self.golf_round.course.holes[n].par
         self.dctStatus['handicap'] = self.golf_round.course.holes[n].handicap
-        bumps = []
-        bump_line = []
-        for sc in self._players:
-          if sc._bumps[n] > 0:
-            dct = {'player': sc.doc, 'bumps': sc._bumps[n]}
-            bumps.append(dct)
-            bump_line.append('{}{}'.format(sc.nick_name, '({})'.format(dct['bumps']) if dct['bumps'] > 1 else ''))
-        self.dctStatus['bumps'] = bumps
-        self.dctStatus['line'] = 'Hole {} Par {} Hdcp {}'.format(
-          self.dctStatus['next_hole'], self.dctStatus['par'], self.dctStatus['handicap'])
-        if bumps:
-          self.dctStatus['line'] += ' Bumps:{}'.format(','.join(bump_line))
+        self.dctStatus['bumps'] = [{'player': sc.doc, 'bumps': sc._bumps[n]} for sc in self._players if sc._bumps[n] > 0]
         break
     else:
       # round complete
       self.dctStatus['next_hole'] = None
       self.dctStatus['par'] = self.golf_round.course.total
       self.dctStatus['handicap'] = None
-      self.dctStatus['line'] = 'Round Complete'
     return self.dctStatus
+
+  def status_line(self, dct):
+    if dct['next_hole'] is None:
+      return 'Round Complete'
+    line = 'Hole {} Par {} Hdcp {}'.format(dct['next_hole'], dct['par'], dct['handicap'])
+    if dct['bumps']:
+      line += ' Bumps:{}'.format(self.bumps_text(dct['bumps']))
+    return line
@@ -0,0 +1,131 @@
+"""render.py - text, JSON and HTML display of game output.
+
+Games keep numbers only in their leaderboard, scorecard and status, the
+strings are made here when a game is shown. The text of each line comes
+from the game, see GolfGame.scorecard_line(), so a renderer works the same
+for games just updated and for games read from stored GameState.
+"""
+import html
+import json
+from mongoengine import Document
+from .exceptions import GolfException
+
+# shown for a game with no output, added since the round was last updated
+NO_OUTPUT = 'No scores yet'
+
+def _name(dct):
+  """Return name of the player or team of a scorecard or leaderboard entry."""
+  if 'team' in dct:
+    return dct['team']
+  return dct['player'].nick_name
+
+class TextRenderer(object):
+  """Text lines, as shown by dbmain."""
+  def course(self, golf_round):
+    """Return list of lines, the round title then the hole, par and handicap lines of the course."""
+    dct = golf_round.getScorecard(ESC=True)
+    return [dct['title'], dct['hdr'], dct['par'], dct['hdcp']]
+
+  def scorecard(self, game):
+    """Return list of lines, the header then a line for each player or team."""
+    dct = game.scorecard
+    lines = [dct['header'] if 'header' in dct else game.scorecard_header(dct)]
+    if 'players' not in dct:
+      return lines + [NO_OUTPUT]
+    for n, player in enumerate(dct['players']):
+      # output stored before lines were made by the game has the text
+      lines.append(player['line'] if 'line' in player else game.scorecard_line(n, player))
+    return lines
+
+  def leaderboard(self, game):
+    """Return list of lines, the header then a line for each position."""
+    dct = game.leaderboard
+    if 'leaderboard' not in dct:
+      return [NO_OUTPUT]
+    lines = [game.leaderboard_header(dct)]
+    for n, pos in enumerate(dct['leaderboard']):
+      lines.append(pos['line'] if 'line' in pos else game.leaderboard_line(n, pos, dct))
+    return lines
+
+  def status(self, game):
+    """Return status line."""
+    dct = game.status
+    if not dct:
+      return NO_OUTPUT
+    return dct['line'] if 'line' in dct else game.status_line(dct)
+
+class JsonRenderer(object):
+  """JSON documents of the structured output, players are shown by nick name."""
+  def __init__(self, indent=None):
+    self.indent = indent
+
+  def _default(self, value):
+    if isinstance(value, Document):
+      return value.nick_name if hasattr(value, 'nick_name') else str(value.pk)
+    return str(value)
+
+  def _dumps(self, game, what):
+    return json.dumps({'game': game.short_description, what: getattr(game, what)},
+                      default=self._default, indent=self.indent)
+
+  def scorecard(self, game):
+    return self._dumps(game, 'scorecard')
+
+  def leaderboard(self, game):
+    return self._dumps(game, 'leaderboard')
+
+  def status(self, game):
+    return self._dumps(game, 'status')
+
+class HtmlRenderer(object):
+  """HTML tables of the structured output."""
+  def scorecard(self, game):
+    rows = []
+    for player in game.scorecard.get('players', []):
+      cells = [_name(player)] + ['' if x is None else x for x in player['holes'][:9]] + [player['out']]
+      cells += ['' if x is None else x for x in player['holes'][9:]] + [player['in'], player['total']]
+      rows.append(cells)
+    return self._table('scorecard', game.short_description, rows)
+
+  def leaderboard(self, game):
+    rows = []
+    for pos in game.leaderboard.get('leaderboard', []):
+      cells = [pos[key] for key in ('pos',) if key in pos] + [_name(pos)]
+      cells += [pos[key] for key in ('total', 'status', 'thru') if key in pos]
+      rows.append(cells)
+    return self._table('leaderboard', game.short_description, rows)
+
+  def status(self, game):
+    return '<p class="status">{}: {}</p>'.format(html.escape(game.short_description),
+                                                 html.escape(TextRenderer().status(game)))
+
+  def _table(self, css_class, caption, rows):
+    lines = ['<table class="{}">'.format(css_class), '<caption>{}</caption>'.format(html.escape(caption))]
+    for cells in rows:
+      lines.append('<tr>{}</tr>'.format(''.join('<td>{}</td>'.format(html.escape(str(cell))) for cell in cells)))
+    lines.append('</table>')
+    return '\n'.join(lines)
+
+dctRenderers = {
+  'text': TextRenderer,
+  'json': JsonRenderer,
+  'html': HtmlRenderer,
+}
+
+def GolfRendererFactory(name):
+  """Return the renderer class.
+
+  Args:
+    name: text, json or html.
+  Returns:
+    renderer class
+  Raises:
+    GolfException - bad renderer name.
+  """
+  if name in dctRenderers:
+    return dctRenderers[name]
+  raise GolfException('Renderer "{}" not supported'.format(name))
+
+def GolfRendererList():
+  """Return list of available renderers."""
+  return list(dctRenderers.keys())
@@ -0,0 +1,166 @@
+"""score_buffer.py - ScoreBuffer class, write behind of hole scores.
+
+Scores and game inputs are set in the round in memory and appended to a local
+journal file, then written to the storage in one flush every few holes, after
+a time limit or at the turn. The journal is synced to disk for each entry and
+written to the storage by replay() at start up, with the game output of its
+rounds updated, so nothing entered is lost on a crash.
+"""
+import json
+import os
+import time
+from bson import ObjectId
+from util.tl_logger import TLLog
+from .exceptions import GolfDBException
+from .wrap import DRound
+
+log = TLLog.getLogger('buffer')
+
+DEF_FLUSH_HOLES = 3
+DEF_FLUSH_SECONDS = 300
+
+class ScoreBuffer(object):
+  """Write behind for scoring one round at a time.
+
+  Has the storage methods used to score a round: get_round, save_scores,
+  save_games and save_game_states. The round is kept in memory between holes.
+
+  Args:
+    storage: GolfStorage to write to.
+    journal: journal file name.
+    holes: flush after this many holes.
+    seconds: flush when the oldest entry is this old. There is no timer, the
+      age is checked by flush_if_due() after each command.
+  """
+  def __init__(self, storage, journal, holes=DEF_FLUSH_HOLES, seconds=DEF_FLUSH_SECONDS):
+    self.storage = storage
+    self.journal = journal
+    self.holes = holes
+    self.seconds = seconds
+    self.doc = None
+    self._entries = []
+    # latest GameState by (round id, game index)
+    self._states = {}
+    self._at_turn = False
+    self._first_time = None
+
+  def _append(self, entry):
+    with open(self.journal, 'a') as fp:
+      fp.write(json.dumps(entry) + '\n')
+      fp.flush()
+      os.fsync(fp.fileno())
+    self._entries.append(entry)
+    if self._first_time is None:
+      self._first_time = time.time()
+
+  def get_round(self, round_id):
+    """Return round being scored, it has the scores not written yet."""
+    if self.doc is None or self.doc.id != ObjectId(round_id):
+      self.close()
+      self.doc = self.storage.get_round(round_id)
+    return self.doc
+
+  def save_scores(self, golf_round, hole, lst_gross, lst_putts=None):
+    golf_round.set_scores(hole, lst_gross, lst_putts)
+    self._append({'round_id': str(golf_round.id), 'hole': hole, 'gross': lst_gross, 'putts': lst_putts})
+    # end of each nine
+    self._at_turn = hole % 9 == 0
+
+  def save_games(self, golf_round):
+    changed = [(n, field, getattr(golf_round.games[n], field)) for n, field in golf_round.pop_changed_games()]
+    if changed:
+      self._append({'round_id': str(golf_round.id), 'games': changed})
+    return len(changed)
+
+  def save_game_states(self, states):
+    # only the latest output of each game is written
+    for state in states:
+      self._states[(state.round_id, state.game_index)] = state
+    return len(states)
+
+  def pending_holes(self):
+    return len([entry for entry in self._entries if 'hole' in entry])
+
+  def flush_if_due(self):
+    """Flush after enough holes, at the turn or when the oldest entry is too old."""
+    if (self.pending_holes() >= self.holes or self._at_turn or
+        (self._first_time is not None and time.time() - self._first_time >= self.seconds)):
+      self.flush()
+
+  def _write(self, entries):
+    """Write journal entries, return {round id: Round} of the rounds written."""
+    rounds = {}
+    for entry in entries:
+      round_id = ObjectId(entry['round_id'])
+      if round_id not in rounds:
+        rounds[round_id] = self.storage.get_round(round_id)
+      doc = rounds[round_id]
+      if 'hole' in entry:
+        self.storage.save_scores(doc, entry['hole'], entry['gross'], entry['putts'])
+      else:
+        for n, field, value in entry['games']:
+          setattr(doc.games[n], field, value)
+    for doc in rounds.values():
+      self.storage.save_games(doc)
+    return rounds
+
+  def replay(self):
+    """Write the journal left by a crash, then update the game output of its rounds.
+
+    Call before scoring. The journal is kept when it cannot be written.
+
+    Returns:
+      number of journal entries written.
+    Raises:
+      GolfDBException - journal cannot be read or written to the storage.
+    """
+    if not os.path.exists(self.journal):
+      return 0
+    try:
+      with open(self.journal) as fp:
+        entries = [json.loads(line) for line in fp if line.strip()]
+      if not entries:
+        return 0
+      log.info('replay {} journal entries from {}'.format(len(entries), self.journal))
+      rounds = self._write(entries)
+    except (ValueError, KeyError, TypeError) as ex:
+      raise GolfDBException('journal {} cannot be replayed - {}'.format(self.journal, ex))
+    for doc in rounds.values():
+      # the game output held in memory was lost, the stored output is older than the scores
+      golf_round = DRound(doc, self.storage.get_game_states(doc.id))
+      questions = golf_round.update_games()
+      if questions:
+        log.warning('round {} has {} game questions, asked when it is scored again'.format(doc.id, len(questions)))
+      self.storage.save_game_states(golf_round.pop_game_states())
+    open(self.journal, 'w').close()
+    return len(entries)
+
+  def flush(self):
+    """Write the journal and game output to the storage."""
+    if not self._entries and not self._states:
+      return
+    rounds = self._write(self._entries)
+    if self.doc is not None and self.doc.id in rounds:
+      # saved version, the scores are the same
+      self.doc.hole_version = rounds[self.doc.id].hole_version
+      self.doc._changed_fields = [name for name in self.doc._changed_fields if name != 'hole_version']
+      for state in self._states.values():
+        if state.round_id == self.doc.id:
+          state.hole_version = self.doc.hole_version
+    if self._states:
+      self.storage.save_game_states(list(self._states.values()))
+    log.info('flush {} journal entries {} game states'.format(len(self._entries), len(self._states)))
+    self._entries = []
+    self._states = {}
+    self._at_turn = False
+    self._first_time = None
+    open(self.journal, 'w').close()
+
+  def close(self):
+    """Flush and stop keeping the round, other commands change it in the storage."""
+    self.flush()
+    self.doc = None
+
+  def __str__(self):
+    return 'ScoreBuffer journal:{} holes:{} seconds:{} pending:{}'.format(
+      self.journal, self.holes, self.seconds, len(self._entries))
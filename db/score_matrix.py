@@ -0,0 +1,74 @@
+"""score_matrix.py - ScoreMatrix class, players x holes scores of a round.
+
+Built once for a DRound and kept up to date as holes are scored, so games read
+rows of numbers by hole index instead of walking the Score documents of each
+result. A hole not played is None.
+"""
+from bisect import bisect_left
+
+class ScoreMatrix(object):
+  """Gross and putts rows for each player, par and hole handicap for each hole.
+
+  Args:
+    course: DCourse of the round.
+    results: Result documents of the round.
+  """
+  __slots__ = ('num_holes', 'par', 'hole_handicap', 'gross', 'putts', 'snapshot')
+
+  def __init__(self, course, results):
+    self.num_holes = len(course.holes)
+    self.par = course.pars
+    self.hole_handicap = course.hole_handicaps
+    self.snapshot = None
+    self.load(results)
+
+  def load(self, results):
+    """Set all rows from the scores of results, return set of the rows changed, 'gross' and 'putts'."""
+    before = (getattr(self, 'gross', None), getattr(self, 'putts', None))
+    self.gross = [[None]*self.num_holes for _ in results]
+    self.putts = [[None]*self.num_holes for _ in results]
+    for gross, putts, result in zip(self.gross, self.putts, results):
+      for sc in result.scores:
+        gross[sc.num-1] = sc.gross
+        putts[sc.num-1] = sc.putts
+    return {name for name, old, new in zip(('gross', 'putts'), before, (self.gross, self.putts)) if old != new}
+
+  def set_hole(self, hole_num, scores):
+    """Set one hole, scores is the Score of each player. Return set of the rows changed."""
+    n = hole_num-1
+    changed = set()
+    for gross, putts, sc in zip(self.gross, self.putts, scores):
+      if gross[n] != sc.gross:
+        gross[n] = sc.gross
+        changed.add('gross')
+      if putts[n] != sc.putts:
+        putts[n] = sc.putts
+        changed.add('putts')
+    return changed
+
+  def net_row(self, player, bumps):
+    """Return net score of each hole for player index, bumps is the strokes on each hole."""
+    return [None if gross is None else gross - bump for gross, bump in zip(self.gross[player], bumps)]
+
+  def thru(self, player):
+    """Number of holes played by player index from hole 1 without a gap."""
+    for n, gross in enumerate(self.gross[player]):
+      if gross is None:
+        return n
+    return self.num_holes
+
+  @staticmethod
+  def sums(row):
+    """Return (out, in, total) of a row, None values are not added."""
+    out = sum(value for value in row[:9] if value is not None)
+    inn = sum(value for value in row[9:] if value is not None)
+    return out, inn, out + inn
+
+  @staticmethod
+  def ranks(values):
+    """Rank of each value, the number of values lower, so ties have the same rank.
+
+    None values, holes not played, are not ranked and have rank None.
+    """
+    order = sorted(value for value in values if value is not None)
+    return [None if value is None else bisect_left(order, value) for value in values]
@@ -0,0 +1,242 @@
+"""storage.py - GolfStorage class.
+
+Interface for storing players, courses, rounds and games. All backends take
+and return the mongoengine documents (Player, Course, Round, ...) so the
+wrapper classes and the games work the same with any backend.
+"""
+from itertools import islice
+from mongoengine import ValidationError
+from .exceptions import GolfDBException
+
+# Lookup modes for find_players() and find_courses().
+#   contains: match anywhere, scans every document.
+#   prefix:   match at the start, can use the index.
+#   exact:    match the whole value, uses the index.
+MATCH_TYPES = ('contains', 'prefix', 'exact')
+
+# Rounds read per query by iter_rounds().
+DEF_BATCH_SIZE = 100
+
+# Documents written per request by insert_players() and insert_courses().
+DEF_INSERT_BATCH_SIZE = 1000
+
+def batched(iterable, size):
+  """Yield lists of size items from iterable, the last list may be shorter."""
+  iterator = iter(iterable)
+  while True:
+    batch = list(islice(iterator, size))
+    if not batch:
+      return
+    yield batch
+
+class InsertReport(object):
+  """Counts of a bulk insert, duplicates and errors list the keys not inserted."""
+  def __init__(self, what):
+    self.what = what
+    self.inserted = 0
+    self.duplicates = []
+    self.errors = []
+
+  def __str__(self):
+    s = '{} - {} inserted, {} duplicates, {} errors'.format(self.what, self.inserted, len(self.duplicates), len(self.errors))
+    for key, error in self.errors:
+      s += '\n  {} - {}'.format(key, error)
+    return s
+
+class GolfStorage(object):
+  """Base class for all storage backends."""
+  description = '<Description not set>'
+
+  def __init__(self, url, database, **options):
+    """options are connection options, a backend ignores the ones it does not use."""
+    self.url = url
+    self.database = database
+    self.options = options
+    self.batch_size = DEF_BATCH_SIZE
+
+  def _not_supported(self, name):
+    raise GolfDBException('{} not supported by {}'.format(name, self.__class__.__name__))
+
+  def remove(self, database=None):
+    """Delete a database."""
+    self._not_supported('remove')
+
+  def snapshot(self, filename):
+    """Write all players, courses, rounds and game states to one compressed file.
+
+    Returns:
+      {collection name: number of documents}.
+    """
+    self._not_supported('snapshot')
+
+  def restore(self, filename):
+    """Replace the database with a snapshot file.
+
+    Returns:
+      {collection name: number of documents}.
+    """
+    self._not_supported('restore')
+
+  # players
+  def list_players(self):
+    """Return list of all players."""
+    self._not_supported('list_players')
+
+  def find_players(self, email, match='contains'):
+    """Return list of players with email matching email argument."""
+    self._not_supported('find_players')
+
+  def save_player(self, player):
+    """Insert or update a player."""
+    self._not_supported('save_player')
+
+  def insert_players(self, players, batch_size=None):
+    """Insert new players in batches, a player with an email already stored is skipped.
+
+    Returns:
+      InsertReport
+    """
+    return self._insert_each(players, self.save_player, 'email', 'players')
+
+  # courses
+  def list_courses(self):
+    """Return list of all courses."""
+    self._not_supported('list_courses')
+
+  def find_courses(self, name, match='contains'):
+    """Return list of courses with name matching name argument."""
+    self._not_supported('find_courses')
+
+  def save_course(self, course):
+    """Insert or update a course."""
+    self._not_supported('save_course')
+
+  def list_course_summaries(self):
+    """Return list of CourseSummary for all courses."""
+    self._not_supported('list_course_summaries')
+
+  def insert_courses(self, courses, batch_size=None):
+    """Insert new courses in batches, a course with a name already stored is skipped.
+
+    Returns:
+      InsertReport
+    """
+    return self._insert_each(courses, self.save_course, 'name', 'courses')
+
+  def _insert_each(self, docs, save, key, what):
+    """Insert with one save for each document, for backends with no bulk insert."""
+    report = InsertReport(what)
+    for doc in docs:
+      try:
+        doc.validate()
+      except ValidationError as ex:
+        report.errors.append((getattr(doc, key), ex))
+        continue
+      try:
+        save(doc)
+        report.inserted += 1
+      except GolfDBException:
+        report.duplicates.append(getattr(doc, key))
+    return report
+
+  # rounds
+  def list_rounds(self):
+    """Return list of all rounds."""
+    self._not_supported('list_rounds')
+
+  def list_round_summaries(self):
+    """Return list of RoundSummary for all rounds, games and scores are not loaded."""
+    self._not_supported('list_round_summaries')
+
+  def find_rounds(self, since=None, player_id=None, after=None, limit=None, summary=False):
+    """Return one page of rounds sorted by date played and id.
+
+    Args:
+      since: only rounds played on or after this datetime.
+      player_id: only rounds with a result for this player.
+      after: (date_played, id) of the last round of the previous page.
+      limit: maximum number of rounds.
+      summary: return RoundSummary instead of Round.
+    """
+    self._not_supported('find_rounds')
+
+  def iter_rounds(self, since=None, player_id=None, limit=None, summary=False, batch_size=None):
+    """Yield rounds sorted by date played, reading batch_size rounds at a time.
+
+    Pages continue after the last round read (keyset paging), so only one
+    page is held at a time no matter how many rounds are stored.
+    """
+    batch_size = batch_size or self.batch_size
+    after = None
+    count = 0
+    while limit is None or count < limit:
+      size = batch_size if limit is None else min(batch_size, limit - count)
+      page = self.find_rounds(since=since, player_id=player_id, after=after, limit=size, summary=summary)
+      yield from page
+      count += len(page)
+      if len(page) < size:
+        break
+      after = (page[-1].date_played, page[-1].id)
+
+  def get_round(self, round_id):
+    """Return round with round_id or None."""
+    self._not_supported('get_round')
+
+  def save_round(self, golf_round):
+    """Insert or update a complete round."""
+    self._not_supported('save_round')
+
+  def add_result(self, golf_round, result):
+    """Add a player Result to a round."""
+    self._not_supported('add_result')
+
+  def save_scores(self, golf_round, hole, lst_gross, lst_putts=None):
+    """Set and write scores for one hole of all players in a round.
+
+    A None gross leaves that player unchanged. Scores saved by another copy
+    of the round are merged in, GolfConflictException is raised when the
+    same player and hole was saved with a different score.
+    """
+    self._not_supported('save_scores')
+
+  def archive_round(self, golf_round):
+    """Store a completed round in the packed archive format.
+
+    The scores of each result are written as bytes, see pack_scores(), and
+    are unpacked when the round is read, so the round reads the same. Scores
+    of an archived round cannot be set. GolfConflictException is raised when
+    another scorer saved the round since it was read.
+    """
+    self._not_supported('archive_round')
+
+  # games
+  def add_game(self, golf_round, game):
+    """Add a Game to a round."""
+    self._not_supported('add_game')
+
+  def save_games(self, golf_round):
+    """Write game fields changed since the last save.
+
+    Returns:
+      number of game fields written.
+    """
+    self._not_supported('save_games')
+
+  def get_game_states(self, round_id):
+    """Return list of GameState for a round sorted by game index."""
+    self._not_supported('get_game_states')
+
+  def save_game_states(self, states):
+    """Insert or replace GameState documents, one per (round, game index).
+
+    Returns:
+      number of states written.
+    """
+    self._not_supported('save_game_states')
+
+  def _check_match(self, match):
+    if match not in MATCH_TYPES:
+      raise GolfDBException('match type <{}> not in {}'.format(match, MATCH_TYPES))
+
+  def __str__(self):
+    return '{} url:{} database:{}'.format(self.__class__.__name__, self.url, self.database)
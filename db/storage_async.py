@@ -0,0 +1,153 @@
+"""storage_async.py - asyncio access to rounds for servers scoring many groups.
+
+AsyncMongoStorage uses an asyncio MongoDB client, pymongo AsyncMongoClient or
+motor, and reads and writes the same documents as MongoStorage. AsyncStorage
+wraps any GolfStorage and stands in for tests and for the other backends.
+Both have the same methods: get_round, get_game_states, save_scores and
+save_game_states.
+"""
+import asyncio
+from bson import ObjectId
+from .exceptions import GolfDBException, GolfConflictException
+from .db_mongoengine import Player, Course, Round, GameState, player_references, attach_players, SCORE_RETRIES
+
+try:
+  from pymongo import AsyncMongoClient
+except ImportError:
+  try:
+    from motor.motor_asyncio import AsyncIOMotorClient as AsyncMongoClient
+  except ImportError:
+    AsyncMongoClient = None
+
+STATE_FIELDS = ('leaderboard', 'scorecard', 'status')
+
+def _references(value, ids):
+  """Add ids of the players referenced in stored game output."""
+  if isinstance(value, dict):
+    if '_ref' in value:
+      ids.add(value['_ref'].id)
+    else:
+      for val in value.values():
+        _references(val, ids)
+  elif isinstance(value, list):
+    for val in value:
+      _references(val, ids)
+  return ids
+
+def _resolve(value, players):
+  """Copy of stored game output with references replaced by players."""
+  if isinstance(value, dict):
+    if '_ref' in value:
+      return players.get(value['_ref'].id, value['_ref'])
+    return {key: _resolve(val, players) for key,val in value.items()}
+  if isinstance(value, list):
+    return [_resolve(val, players) for val in value]
+  return value
+
+class AsyncStorage(object):
+  """Asyncio methods calling a GolfStorage.
+
+  With no executor the calls run in the event loop, fine for MemoryStorage.
+  Give an executor for a thread safe storage that blocks, MongoStorage.
+  """
+  def __init__(self, storage, executor=None):
+    self.storage = storage
+    self.executor = executor
+
+  async def _call(self, func, *args):
+    if self.executor is None:
+      return func(*args)
+    return await asyncio.get_running_loop().run_in_executor(self.executor, func, *args)
+
+  async def get_round(self, round_id):
+    return await self._call(self.storage.get_round, round_id)
+
+  async def get_game_states(self, round_id):
+    return await self._call(self.storage.get_game_states, round_id)
+
+  async def save_scores(self, golf_round, hole, lst_gross, lst_putts=None):
+    return await self._call(self.storage.save_scores, golf_round, hole, lst_gross, lst_putts)
+
+  async def save_game_states(self, states):
+    return await self._call(self.storage.save_game_states, states)
+
+class AsyncMongoStorage(object):
+  """Asyncio access to a MongoDB server.
+
+  Args:
+    url: host url, None for localhost.
+    database: database name.
+    client: asyncio client to use instead of connecting to url.
+    options: client options, maxPoolSize, readPreference, ...
+  """
+  def __init__(self, url, database, client=None, **options):
+    if client is None:
+      if AsyncMongoClient is None:
+        raise GolfDBException('AsyncMongoStorage needs pymongo 4.9 or later or motor')
+      client = AsyncMongoClient(url, **options)
+    self.url = url
+    self.database = database
+    self.client = client
+    self.db = client[database]
+
+  def _collection(self, document):
+    return self.db[document._get_collection_name()]
+
+  async def get_round(self, round_id):
+    """Return Round with its course and players read, or None.
+
+    Raises:
+      GolfDBException - the course of the round is not stored.
+    """
+    son = await self._collection(Round).find_one({'_id': ObjectId(round_id)})
+    if son is None:
+      return None
+    doc = Round._from_son(son)
+    dct_results = player_references([doc])
+    course, players = await asyncio.gather(
+      self._collection(Course).find_one({'_id': doc._data['course'].id}),
+      self._collection(Player).find({'_id': {'$in': list(dct_results.keys())}}).to_list(None))
+    if course is None:
+      raise GolfDBException('round {} course {} not found'.format(doc.id, doc._data['course'].id))
+    # set the documents read so nothing is dereferenced with the blocking client
+    doc._data['course'] = Course._from_son(course)
+    attach_players(dct_results, [Player._from_son(player) for player in players])
+    return doc
+
+  async def get_game_states(self, round_id):
+    cursor = self._collection(GameState).find({'round_id': ObjectId(round_id)}).sort('game_index', 1)
+    sons = await cursor.to_list(None)
+    ids = set()
+    for son in sons:
+      for field in STATE_FIELDS:
+        _references(son.get(field), ids)
+    players = {}
+    if ids:
+      players = {son['_id']: Player._from_son(son)
+                 for son in await self._collection(Player).find({'_id': {'$in': list(ids)}}).to_list(None)}
+    states = []
+    for son in sons:
+      output = [_resolve(son.pop(field, {}), players) for field in STATE_FIELDS]
+      states.append(GameState._from_son(son).set_output(*output))
+    return states
+
+  async def save_scores(self, golf_round, hole, lst_gross, lst_putts=None, retries=SCORE_RETRIES):
+    """Compare and swap write, the same as Round.save_scores()."""
+    collection = self._collection(Round)
+    before = golf_round.score_cells(hole)
+    for _ in range(retries+1):
+      query = golf_round.version_query()
+      result = await collection.update_one(query, golf_round.score_update(hole, lst_gross, lst_putts))
+      if result.matched_count:
+        return
+      son = await collection.find_one({'_id': golf_round.id}, {'results.scores': 1, 'hole_version': 1})
+      before = golf_round.merge_scores(son and Round._from_son(son), hole, before, lst_gross, lst_putts)
+    raise GolfConflictException('round {} hole {} not saved after {} tries'.format(golf_round.id, hole, retries+1))
+
+  async def save_game_states(self, states):
+    collection = self._collection(GameState)
+    await asyncio.gather(*[collection.update_one(*state.upsert(), upsert=True) for state in states])
+    return len(states)
+
+  def __str__(self):
+    return '{} url:{} database:{}'.format(self.__class__.__name__, self.url, self.database)
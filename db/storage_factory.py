@@ -0,0 +1,30 @@
+"""storage_factory.py -- factory for storage backends."""
+from .exceptions import GolfException
+from .storage_memory import MemoryStorage
+from .storage_mongo import MongoStorage
+from .storage_sqlite import SqliteStorage
+
+dctStorage = {
+  'memory': MemoryStorage,
+  'mongo': MongoStorage,
+  'sqlite': SqliteStorage,
+}
+
+def GolfStorageFactory(storage):
+  """Return the storage class.
+
+  Args:
+    storage: name of storage backend.
+  Returns:
+    storage class
+  Raises:
+    GolfException - bad storage name.
+  """
+  if storage in dctStorage:
+    return dctStorage[storage]
+  raise GolfException('Storage "{}" not supported'.format(storage))
+
+def GolfStorageList():
+  """Return list of available storage backends."""
+  lst = dctStorage.keys()
+  return sorted(lst)
@@ -0,0 +1,205 @@
+"""storage_memory.py - MemoryStorage class, in process storage for tests and benchmarks.
+
+Documents are kept in dictionaries keyed by id with unique secondary indexes
+on player email and course name. Documents are copied going in and out, so
+as with a database a change is only kept when it is saved.
+"""
+from bson import ObjectId
+from .storage import GolfStorage
+from .course_cache import course_cache
+from .exceptions import GolfDBException, GolfConflictException
+from .db_mongoengine import Player, Course, Hole, Tee, Round, Result, Score, Game, GameState, unpack_scores
+from .summary import RoundSummary, CourseSummary
+
+def _plain(value):
+  """Copy of dictionaries and lists in a document field, documents are not copied."""
+  if isinstance(value, dict):
+    return {key: _plain(val) for key,val in value.items()}
+  if isinstance(value, (list, tuple)):
+    return [_plain(val) for val in value]
+  return value
+
+def _clean(doc):
+  """Copies have nothing to save."""
+  doc._clear_changed_fields()
+  return doc
+
+def _copy_player(doc):
+  return _clean(Player(id=doc.id, email=doc.email, first_name=doc.first_name, last_name=doc.last_name,
+                       nick_name=doc.nick_name, handicap=doc.handicap, gender=doc.gender))
+
+def _copy_course(doc):
+  return _clean(Course(id=doc.id, name=doc.name,
+                       holes=[Hole(num=hole.num, par=hole.par, handicap=hole.handicap) for hole in doc.holes],
+                       tees=[Tee(gender=tee.gender, name=tee.name, rating=tee.rating, slope=tee.slope) for tee in doc.tees]))
+
+def _copy_result(doc):
+  if doc.packed:
+    scores = unpack_scores(doc.packed)
+  else:
+    scores = [Score(num=score.num, gross=score.gross, putts=score.putts) for score in doc.scores]
+  return Result(player=doc.player, tee=doc.tee, handicap=doc.handicap, course_handicap=doc.course_handicap,
+                scores=scores, packed=doc.packed)
+
+def _copy_game(doc):
+  return Game(game_type=doc.game_type, options=_plain(doc.options), hole_data=_plain(doc.hole_data))
+
+def _copy_round(doc):
+  return _clean(Round(id=doc.id, course=doc.course, date_played=doc.date_played, dict_options=_plain(doc.dict_options),
+                      results=[_copy_result(result) for result in doc.results],
+                      games=[_copy_game(game) for game in doc.games], hole_version=doc.hole_version))
+
+def _copy_game_state(doc):
+  return _clean(GameState(round_id=doc.round_id, game_index=doc.game_index, hole_version=doc.hole_version,
+                          inputs=_plain(doc.inputs)).set_output(
+                  _plain(doc.leaderboard), _plain(doc.scorecard), _plain(doc.status)))
+
+class MemoryStorage(GolfStorage):
+  """In process storage, nothing is kept after exit."""
+  description = 'In process dictionaries, for tests and benchmarks.'
+
+  def __init__(self, url, database, **options):
+    super().__init__(url, database, **options)
+    self.remove()
+
+  def remove(self, database=None):
+    self._players = {}
+    self._courses = {}
+    self._rounds = {}
+    # game states by round id and game index
+    self._game_states = {}
+    # secondary indexes
+    self._player_email = {}
+    self._course_name = {}
+    course_cache.invalidate()
+
+  def _index(self, index, key, old_key, doc_id, what):
+    """Add to a unique index, old_key is the key from the saved document."""
+    if index.get(key, doc_id) != doc_id:
+      raise GolfDBException('{} {} - {} <{}> already exists'.format(self.__class__.__name__, self.database, what, key))
+    if old_key is not None and old_key != key:
+      del index[old_key]
+    index[key] = doc_id
+
+  def _find(self, index, value, match):
+    """Return ids from an index matching value, exact is a single lookup."""
+    self._check_match(match)
+    if match == 'exact':
+      return [index[value]] if value in index else []
+    if match == 'prefix':
+      return [doc_id for key,doc_id in index.items() if key.startswith(value)]
+    return [doc_id for key,doc_id in index.items() if value in key]
+
+  # players
+  def list_players(self):
+    return [_copy_player(doc) for doc in self._players.values()]
+
+  def find_players(self, email, match='contains'):
+    return [_copy_player(self._players[doc_id]) for doc_id in self._find(self._player_email, email, match)]
+
+  def save_player(self, player):
+    player.validate()
+    if player.id is None:
+      player.id = ObjectId()
+    old = self._players.get(player.id)
+    self._index(self._player_email, player.email, old.email if old else None, player.id, 'email')
+    self._players[player.id] = _copy_player(player)
+    _clean(player)
+
+  # courses
+  def list_courses(self):
+    return [_copy_course(doc) for doc in self._courses.values()]
+
+  def find_courses(self, name, match='contains'):
+    return [_copy_course(self._courses[doc_id]) for doc_id in self._find(self._course_name, name, match)]
+
+  def save_course(self, course):
+    course.validate()
+    if course.id is None:
+      course.id = ObjectId()
+    old = self._courses.get(course.id)
+    self._index(self._course_name, course.name, old.name if old else None, course.id, 'course name')
+    self._courses[course.id] = _copy_course(course)
+    course_cache.invalidate(course.id)
+    _clean(course)
+
+  def list_course_summaries(self):
+    return [CourseSummary(doc.id, doc.name, len(doc.holes), len(doc.tees), sum(hole.par for hole in doc.holes))
+            for doc in self._courses.values()]
+
+  # rounds
+  def list_rounds(self):
+    return [_copy_round(doc) for doc in self._rounds.values()]
+
+  def list_round_summaries(self):
+    return [RoundSummary(doc.id, doc.date_played, doc.course.name, [result.player.nick_name for result in doc.results])
+            for doc in self._rounds.values()]
+
+  def find_rounds(self, since=None, player_id=None, after=None, limit=None, summary=False):
+    docs = [doc for doc in self._rounds.values()
+            if (since is None or doc.date_played >= since)
+            and (player_id is None or any(result.player.id == player_id for result in doc.results))
+            and (after is None or (doc.date_played, doc.id) > after)]
+    docs.sort(key=lambda doc: (doc.date_played, doc.id))
+    if limit:
+      docs = docs[:limit]
+    if summary:
+      return [RoundSummary(doc.id, doc.date_played, doc.course.name, [result.player.nick_name for result in doc.results])
+              for doc in docs]
+    return [_copy_round(doc) for doc in docs]
+
+  def get_round(self, round_id):
+    doc = self._rounds.get(ObjectId(round_id))
+    return _copy_round(doc) if doc else None
+
+  def save_round(self, golf_round):
+    golf_round.validate()
+    if golf_round.id is None:
+      golf_round.id = ObjectId()
+    self._rounds[golf_round.id] = _copy_round(golf_round)
+    _clean(golf_round)
+
+  def add_result(self, golf_round, result):
+    result.validate()
+    golf_round.results.append(result)
+    golf_round.clear_changed('results')
+    self._rounds[golf_round.id].results.append(_copy_result(result))
+
+  def save_scores(self, golf_round, hole, lst_gross, lst_putts=None):
+    stored = self._rounds[golf_round.id]
+    if golf_round.hole_version != stored.hole_version:
+      # another copy of the round saved scores first
+      golf_round.merge_scores(stored, hole, golf_round.score_cells(hole), lst_gross, lst_putts)
+    golf_round.set_scores(hole, lst_gross, lst_putts)
+    stored.set_scores(hole, lst_gross, lst_putts)
+
+  def archive_round(self, golf_round):
+    stored = self._rounds[golf_round.id]
+    if golf_round.hole_version != stored.hole_version:
+      raise GolfConflictException('round {} saved by another scorer, not archived'.format(golf_round.id))
+    golf_round.archive()
+    stored.archive()
+
+  # games
+  def add_game(self, golf_round, game):
+    game.validate()
+    golf_round.games.append(game)
+    golf_round.clear_changed('games')
+    self._rounds[golf_round.id].games.append(_copy_game(game))
+
+  def save_games(self, golf_round):
+    stored = self._rounds[golf_round.id]
+    changed = golf_round.pop_changed_games()
+    for n, field in changed:
+      setattr(stored.games[n], field, _plain(getattr(golf_round.games[n], field)))
+    stored.clear_changed('games')
+    return len(changed)
+
+  def get_game_states(self, round_id):
+    return [_copy_game_state(doc) for _,doc in sorted(self._game_states.get(ObjectId(round_id), {}).items())]
+
+  def save_game_states(self, states):
+    for state in states:
+      state.validate()
+      self._game_states.setdefault(state.round_id, {})[state.game_index] = _copy_game_state(state)
+    return len(states)
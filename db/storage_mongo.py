@@ -0,0 +1,191 @@
+"""storage_mongo.py - MongoStorage class, storage in a MongoDB server."""
+from mongoengine import Q, ValidationError
+from pymongo.errors import BulkWriteError
+from .storage import GolfStorage, InsertReport, DEF_INSERT_BATCH_SIZE, batched
+from .exceptions import GolfConflictException
+from .db_mongoengine import Player, Course, Round, GameState, DBAdmin, dereference_players
+from .summary import RoundSummary, CourseSummary
+
+# connection alias for reading round history
+HISTORY_ALIAS = 'history'
+
+# MongoDB error code of a unique index violation.
+DUPLICATE_KEY = 11000
+
+class MongoStorage(GolfStorage):
+  """Storage using the mongoengine documents in a MongoDB server.
+
+  options are MongoClient options for the connection pool. With
+  history_pool_size set, round listing and history reads use a second pool
+  of that size so they do not take connections from live scoring.
+  """
+  description = 'MongoDB server using mongoengine.'
+
+  def __init__(self, url, database, history_pool_size=None, **options):
+    super().__init__(url, database, **options)
+    self.admin = DBAdmin(url, database, **options)
+    self.history_alias = None
+    if history_pool_size:
+      self.history_alias = self.admin.add_alias(HISTORY_ALIAS, maxPoolSize=history_pool_size)
+
+  def _history(self, queryset):
+    """Queryset using the history pool when there is one."""
+    return queryset.using(self.history_alias) if self.history_alias else queryset
+
+  def remove(self, database=None):
+    self.admin.remove(database)
+
+  def snapshot(self, filename):
+    return self.admin.snapshot(filename)
+
+  def restore(self, filename):
+    return self.admin.restore(filename)
+
+  def _query(self, field, value, match):
+    """Query for a lookup, prefix is an anchored regex so the index is used."""
+    self._check_match(match)
+    if match == 'exact':
+      return {field: value}
+    if match == 'prefix':
+      return {field + '__startswith': value}
+    return {field + '__contains': value}
+
+  def _insert_many(self, document, docs, key, what, batch_size):
+    """Unordered insert_many() of each batch, duplicate key errors are reported not raised."""
+    report = InsertReport(what)
+    collection = document._get_collection()
+    for batch in batched(docs, batch_size or DEF_INSERT_BATCH_SIZE):
+      valid = []
+      for doc in batch:
+        try:
+          doc.validate()
+          valid.append(doc)
+        except ValidationError as ex:
+          report.errors.append((getattr(doc, key), ex))
+      if not valid:
+        continue
+      sons = [doc.to_mongo().to_dict() for doc in valid]
+      failed = set()
+      try:
+        collection.insert_many(sons, ordered=False)
+      except BulkWriteError as ex:
+        for error in ex.details['writeErrors']:
+          failed.add(error['index'])
+          doc = valid[error['index']]
+          if error['code'] == DUPLICATE_KEY:
+            report.duplicates.append(getattr(doc, key))
+          else:
+            report.errors.append((getattr(doc, key), error['errmsg']))
+      for n, (doc, son) in enumerate(zip(valid, sons)):
+        if n not in failed:
+          doc.id = son['_id']
+          doc._clear_changed_fields()
+          report.inserted += 1
+    return report
+
+  # players
+  def list_players(self):
+    return list(Player.objects)
+
+  def find_players(self, email, match='contains'):
+    return list(Player.objects(**self._query('email', email, match)))
+
+  def save_player(self, player):
+    player.save()
+
+  def insert_players(self, players, batch_size=None):
+    return self._insert_many(Player, players, 'email', 'players', batch_size)
+
+  # courses
+  def list_courses(self):
+    return list(Course.objects)
+
+  def find_courses(self, name, match='contains'):
+    return list(Course.objects(**self._query('name', name, match)))
+
+  def save_course(self, course):
+    course.save()
+
+  def list_course_summaries(self):
+    return [CourseSummary(row['_id'], row['name'], len(row['holes']), len(row['tees']), sum(hole['par'] for hole in row['holes']))
+            for row in Course.objects.only('name', 'holes.par', 'tees.name').as_pymongo()]
+
+  def insert_courses(self, courses, batch_size=None):
+    return self._insert_many(Course, courses, 'name', 'courses', batch_size)
+
+  # rounds
+  def list_rounds(self):
+    return dereference_players(list(Round.objects))
+
+  def list_round_summaries(self):
+    return self._round_summaries(Round.objects)
+
+  def _round_summaries(self, queryset):
+    # raw projection, course and player names are read with one query each
+    rows = list(self._history(queryset.only('date_played', 'course', 'results.player')).as_pymongo())
+    course_ids = list({row['course'] for row in rows})
+    player_ids = list({result['player'] for row in rows for result in row.get('results', [])})
+    course_names = {row['_id']: row['name'] for row in self._history(Course.objects(id__in=course_ids).only('name')).as_pymongo()}
+    nick_names = {row['_id']: row.get('nick_name')
+                  for row in self._history(Player.objects(id__in=player_ids).only('nick_name')).as_pymongo()}
+    return [RoundSummary(row['_id'], row['date_played'], course_names.get(row['course']),
+                         [nick_names.get(result['player']) for result in row.get('results', [])])
+            for row in rows]
+
+  def find_rounds(self, since=None, player_id=None, after=None, limit=None, summary=False):
+    query = Q()
+    if since:
+      query &= Q(date_played__gte=since)
+    if player_id:
+      query &= Q(results__player=player_id)
+    if after:
+      date_played, round_id = after
+      query &= Q(date_played__gt=date_played) | Q(date_played=date_played, id__gt=round_id)
+    queryset = Round.objects(query).order_by('date_played', 'id')
+    if limit:
+      queryset = queryset.limit(limit)
+    if summary:
+      return self._round_summaries(queryset)
+    return dereference_players(list(self._history(queryset)))
+
+  def get_round(self, round_id):
+    doc = Round.objects(id=round_id).first()
+    if doc:
+      dereference_players([doc])
+    return doc
+
+  def save_round(self, golf_round):
+    golf_round.save()
+
+  def add_result(self, golf_round, result):
+    golf_round.results.append(result)
+    golf_round.save()
+
+  def save_scores(self, golf_round, hole, lst_gross, lst_putts=None):
+    golf_round.save_scores(hole, lst_gross, lst_putts)
+
+  def archive_round(self, golf_round):
+    golf_round.archive()
+    # Result.to_mongo() leaves out the scores of a packed result
+    update = {'$set': {'results': [result.to_mongo() for result in golf_round.results]}}
+    if not Round._get_collection().update_one(golf_round.version_query(), update).matched_count:
+      for result in golf_round.results:
+        result.packed = None
+      golf_round.clear_changed('results')
+      raise GolfConflictException('round {} saved by another scorer, not archived'.format(golf_round.id))
+
+  # games
+  def add_game(self, golf_round, game):
+    golf_round.games.append(game)
+    golf_round.save()
+
+  def save_games(self, golf_round):
+    return golf_round.save_games()
+
+  def get_game_states(self, round_id):
+    return list(GameState.objects(round_id=round_id).order_by('game_index'))
+
+  def save_game_states(self, states):
+    for state in states:
+      GameState._get_collection().update_one(*state.upsert(), upsert=True)
+    return len(states)
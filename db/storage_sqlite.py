@@ -0,0 +1,494 @@
+"""storage_sqlite.py - SqliteStorage class, embedded storage in a SQLite file.
+
+Tables are normalized with one row per player, course hole, tee, round,
+result, hole score and game. Documents are rebuilt from the rows, so the
+wrapper classes and games see the same objects as with MongoDB. Document ids
+are ObjectIds stored as text so ids look the same in both backends.
+"""
+import datetime
+import json
+import os
+import sqlite3
+from bson import ObjectId
+from mongoengine import ValidationError
+from .storage import GolfStorage, InsertReport, DEF_INSERT_BATCH_SIZE, batched
+from .course_cache import course_cache
+from .exceptions import GolfDBException, GolfConflictException
+from .db_mongoengine import Player, Course, Hole, Tee, Round, Result, Score, Game, GameState, SCORE_RETRIES
+from .db_mongoengine import unpack_scores
+from .summary import RoundSummary, CourseSummary
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS players (
+  id          TEXT PRIMARY KEY,
+  email       TEXT NOT NULL UNIQUE,
+  first_name  TEXT,
+  last_name   TEXT,
+  nick_name   TEXT,
+  handicap    REAL,
+  gender      TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS courses (
+  id          TEXT PRIMARY KEY,
+  name        TEXT NOT NULL UNIQUE
+);
+CREATE TABLE IF NOT EXISTS holes (
+  course_id   TEXT NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+  num         INTEGER NOT NULL,
+  par         INTEGER NOT NULL,
+  handicap    INTEGER NOT NULL,
+  PRIMARY KEY (course_id, num)
+);
+CREATE TABLE IF NOT EXISTS tees (
+  course_id   TEXT NOT NULL REFERENCES courses(id) ON DELETE CASCADE,
+  seq         INTEGER NOT NULL,
+  gender      TEXT NOT NULL,
+  name        TEXT NOT NULL,
+  rating      REAL NOT NULL,
+  slope       INTEGER NOT NULL,
+  PRIMARY KEY (course_id, seq)
+);
+CREATE TABLE IF NOT EXISTS rounds (
+  id           TEXT PRIMARY KEY,
+  course_id    TEXT NOT NULL REFERENCES courses(id),
+  date_played  TEXT NOT NULL,
+  dict_options TEXT NOT NULL,
+  hole_version INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS rounds_date_played ON rounds(date_played);
+CREATE TABLE IF NOT EXISTS results (
+  round_id        TEXT NOT NULL REFERENCES rounds(id) ON DELETE CASCADE,
+  seq             INTEGER NOT NULL,
+  player_id       TEXT NOT NULL REFERENCES players(id),
+  tee             TEXT NOT NULL,
+  handicap        REAL NOT NULL,
+  course_handicap INTEGER NOT NULL,
+  packed          BLOB,
+  PRIMARY KEY (round_id, seq)
+);
+CREATE INDEX IF NOT EXISTS results_player ON results(player_id);
+CREATE TABLE IF NOT EXISTS scores (
+  round_id    TEXT NOT NULL,
+  seq         INTEGER NOT NULL,
+  idx         INTEGER NOT NULL,
+  num         INTEGER NOT NULL,
+  gross       INTEGER NOT NULL,
+  putts       INTEGER,
+  PRIMARY KEY (round_id, seq, idx),
+  FOREIGN KEY (round_id, seq) REFERENCES results(round_id, seq) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS scores_hole ON scores(round_id, num);
+CREATE TABLE IF NOT EXISTS games (
+  round_id    TEXT NOT NULL REFERENCES rounds(id) ON DELETE CASCADE,
+  seq         INTEGER NOT NULL,
+  game_type   TEXT NOT NULL,
+  options     TEXT NOT NULL,
+  hole_data   TEXT NOT NULL,
+  PRIMARY KEY (round_id, seq)
+);
+CREATE TABLE IF NOT EXISTS game_states (
+  round_id     TEXT NOT NULL REFERENCES rounds(id) ON DELETE CASCADE,
+  game_index   INTEGER NOT NULL,
+  hole_version INTEGER NOT NULL,
+  leaderboard  TEXT NOT NULL,
+  scorecard    TEXT NOT NULL,
+  status       TEXT NOT NULL,
+  inputs       TEXT NOT NULL,
+  PRIMARY KEY (round_id, game_index)
+);
+"""
+TABLES = ('game_states', 'scores', 'results', 'games', 'rounds', 'tees', 'holes', 'courses', 'players')
+GAME_FIELDS = ('game_type', 'options', 'hole_data')
+STATE_FIELDS = ('leaderboard', 'scorecard', 'status')
+
+def _json_default(obj):
+  """Players in game dictionaries are stored by id."""
+  if isinstance(obj, Player):
+    return {'_player': str(obj.id)}
+  if isinstance(obj, ObjectId):
+    return str(obj)
+  raise TypeError('{} is not JSON serializable'.format(obj.__class__.__name__))
+
+def _dumps(value):
+  return json.dumps(value, default=_json_default)
+
+def _clean(doc):
+  """Documents built from rows have nothing to save."""
+  doc._clear_changed_fields()
+  return doc
+
+class SqliteStorage(GolfStorage):
+  """Embedded storage in a SQLite database file."""
+  description = 'Embedded SQLite database file, no server needed.'
+
+  def __init__(self, url, database, **options):
+    super().__init__(url, database, **options)
+    self.conn = None
+    if self.database:
+      self.connect()
+
+  def _filename(self, database):
+    if database == ':memory:' or database.endswith('.db'):
+      return database
+    return os.path.join(self.url or '', database + '.db')
+
+  def connect(self, database=None):
+    if database:
+      self.database = database
+    if self.conn:
+      self.conn.close()
+    self.conn = sqlite3.connect(self._filename(self.database))
+    self.conn.execute('PRAGMA foreign_keys = ON')
+    self.conn.executescript(SCHEMA)
+
+  def remove(self, database=None):
+    if database and database != self.database:
+      filename = self._filename(database)
+      if os.path.exists(filename):
+        os.remove(filename)
+      return
+    with self.conn:
+      for table in TABLES:
+        self.conn.execute('DROP TABLE IF EXISTS {}'.format(table))
+    self.conn.executescript(SCHEMA)
+    course_cache.invalidate()
+
+  def _execute(self, sql, args=()):
+    try:
+      with self.conn:
+        return self.conn.execute(sql, args)
+    except sqlite3.IntegrityError as ex:
+      raise GolfDBException('{} - {}'.format(self.database, ex))
+
+  def _executemany(self, sql, rows):
+    try:
+      with self.conn:
+        return self.conn.executemany(sql, rows)
+    except sqlite3.IntegrityError as ex:
+      raise GolfDBException('{} - {}'.format(self.database, ex))
+
+  # players
+  def _load_players(self, where='', args=()):
+    sql = 'SELECT id, email, first_name, last_name, nick_name, handicap, gender FROM players {} ORDER BY rowid'
+    return [_clean(Player(id=ObjectId(row[0]), email=row[1], first_name=row[2], last_name=row[3],
+                          nick_name=row[4], handicap=row[5], gender=row[6]))
+            for row in self.conn.execute(sql.format(where), args)]
+
+  def list_players(self):
+    return self._load_players()
+
+  def _where(self, column, value, match):
+    """WHERE clause for a lookup, prefix is a range so the index is used."""
+    self._check_match(match)
+    if match == 'exact':
+      return 'WHERE {} = ?'.format(column), (value,)
+    if match == 'prefix':
+      return 'WHERE {0} >= ? AND {0} < ?'.format(column), (value, value + '\U0010ffff')
+    return 'WHERE instr({}, ?) > 0'.format(column), (value,)
+
+  def find_players(self, email, match='contains'):
+    return self._load_players(*self._where('email', email, match))
+
+  def save_player(self, player):
+    player.validate()
+    if player.id is None:
+      player.id = ObjectId()
+    self._execute(
+      'INSERT INTO players (id, email, first_name, last_name, nick_name, handicap, gender) VALUES (?,?,?,?,?,?,?) '
+      'ON CONFLICT(id) DO UPDATE SET email=excluded.email, first_name=excluded.first_name, last_name=excluded.last_name, '
+      'nick_name=excluded.nick_name, handicap=excluded.handicap, gender=excluded.gender',
+      self._player_row(player.id, player))
+    _clean(player)
+
+  def _player_row(self, player_id, player):
+    return (str(player_id), player.email, player.first_name, player.last_name, player.nick_name, player.handicap, player.gender)
+
+  def _insert_rows(self, docs, key, what, batch_size, insert):
+    """Insert each batch in one transaction, insert(doc, id) returns False for a duplicate."""
+    report = InsertReport(what)
+    for batch in batched(docs, batch_size or DEF_INSERT_BATCH_SIZE):
+      with self.conn:
+        for doc in batch:
+          try:
+            doc.validate()
+          except ValidationError as ex:
+            report.errors.append((getattr(doc, key), ex))
+            continue
+          doc_id = doc.id or ObjectId()
+          if insert(doc, str(doc_id)):
+            doc.id = doc_id
+            _clean(doc)
+            report.inserted += 1
+          else:
+            report.duplicates.append(getattr(doc, key))
+    return report
+
+  def _insert_player(self, player, player_id):
+    return self.conn.execute(
+      'INSERT INTO players (id, email, first_name, last_name, nick_name, handicap, gender) VALUES (?,?,?,?,?,?,?) '
+      'ON CONFLICT DO NOTHING', self._player_row(player_id, player)).rowcount
+
+  def insert_players(self, players, batch_size=None):
+    return self._insert_rows(players, 'email', 'players', batch_size, self._insert_player)
+
+  # courses
+  def _load_courses(self, where='', args=()):
+    courses = []
+    for course_id, name in self.conn.execute('SELECT id, name FROM courses {} ORDER BY rowid'.format(where), args).fetchall():
+      holes = [Hole(num=num, par=par, handicap=handicap) for num, par, handicap in self.conn.execute(
+        'SELECT num, par, handicap FROM holes WHERE course_id = ? ORDER BY num', (course_id,))]
+      tees = [Tee(gender=gender, name=tee, rating=rating, slope=slope) for gender, tee, rating, slope in self.conn.execute(
+        'SELECT gender, name, rating, slope FROM tees WHERE course_id = ? ORDER BY seq', (course_id,))]
+      courses.append(_clean(Course(id=ObjectId(course_id), name=name, holes=holes, tees=tees)))
+    return courses
+
+  def list_courses(self):
+    return self._load_courses()
+
+  def find_courses(self, name, match='contains'):
+    return self._load_courses(*self._where('name', name, match))
+
+  def save_course(self, course):
+    course.validate()
+    if course.id is None:
+      course.id = ObjectId()
+    course_id = str(course.id)
+    try:
+      with self.conn:
+        self.conn.execute('INSERT INTO courses (id, name) VALUES (?,?) ON CONFLICT(id) DO UPDATE SET name=excluded.name',
+                          (course_id, course.name))
+        self.conn.execute('DELETE FROM holes WHERE course_id = ?', (course_id,))
+        self.conn.execute('DELETE FROM tees WHERE course_id = ?', (course_id,))
+        self.conn.executemany('INSERT INTO holes (course_id, num, par, handicap) VALUES (?,?,?,?)',
+                              [(course_id, hole.num, hole.par, hole.handicap) for hole in course.holes])
+        self.conn.executemany('INSERT INTO tees (course_id, seq, gender, name, rating, slope) VALUES (?,?,?,?,?,?)',
+                              [(course_id, n, tee.gender, tee.name, tee.rating, tee.slope) for n,tee in enumerate(course.tees)])
+    except sqlite3.IntegrityError as ex:
+      raise GolfDBException('{} - {}'.format(self.database, ex))
+    course_cache.invalidate(course.id)
+    _clean(course)
+
+  def _insert_course(self, course, course_id):
+    if not self.conn.execute('INSERT INTO courses (id, name) VALUES (?,?) ON CONFLICT DO NOTHING',
+                             (course_id, course.name)).rowcount:
+      return False
+    self.conn.executemany('INSERT INTO holes (course_id, num, par, handicap) VALUES (?,?,?,?)',
+                          [(course_id, hole.num, hole.par, hole.handicap) for hole in course.holes])
+    self.conn.executemany('INSERT INTO tees (course_id, seq, gender, name, rating, slope) VALUES (?,?,?,?,?,?)',
+                          [(course_id, n, tee.gender, tee.name, tee.rating, tee.slope) for n,tee in enumerate(course.tees)])
+    return True
+
+  def insert_courses(self, courses, batch_size=None):
+    return self._insert_rows(courses, 'name', 'courses', batch_size, self._insert_course)
+
+  def list_course_summaries(self):
+    sql = ('SELECT id, name, (SELECT count(*) FROM holes WHERE course_id = courses.id), '
+           '(SELECT count(*) FROM tees WHERE course_id = courses.id), '
+           '(SELECT total(par) FROM holes WHERE course_id = courses.id) FROM courses ORDER BY rowid')
+    return [CourseSummary(ObjectId(course_id), name, num_holes, num_tees, int(par))
+            for course_id, name, num_holes, num_tees, par in self.conn.execute(sql)]
+
+  # rounds
+  def _loader(self, players):
+    """Return (loads, get_player), players is a dictionary of players already read by id."""
+    def get_player(player_id):
+      if player_id not in players:
+        players[player_id] = self._load_players('WHERE id = ?', (player_id,))[0]
+      return players[player_id]
+    def object_hook(dct):
+      if len(dct) == 1 and '_player' in dct:
+        return get_player(dct['_player'])
+      return dct
+    def loads(text):
+      return json.loads(text, object_hook=object_hook)
+    return loads, get_player
+
+  def _load_rounds(self, where='', args=(), order='ORDER BY rowid'):
+    rounds = []
+    courses = {}
+    # all players in the results of these rounds with one query
+    loads, get_player = self._loader({str(player.id): player for player in self._load_players(
+      'WHERE id IN (SELECT player_id FROM results WHERE round_id IN (SELECT id FROM rounds {} {}))'.format(where, order), args)})
+
+    sql = 'SELECT id, course_id, date_played, dict_options, hole_version FROM rounds {} {}'.format(where, order)
+    for round_id, course_id, date_played, dict_options, hole_version in self.conn.execute(sql, args).fetchall():
+      if course_id not in courses:
+        courses[course_id] = self._load_courses('WHERE id = ?', (course_id,))[0]
+      results = []
+      for seq, player_id, tee, handicap, course_handicap, packed in self.conn.execute(
+          'SELECT seq, player_id, tee, handicap, course_handicap, packed FROM results WHERE round_id = ? ORDER BY seq',
+          (round_id,)):
+        result = Result(player=get_player(player_id), tee=tee, handicap=handicap, course_handicap=course_handicap)
+        if packed:
+          # archived, there are no scores rows
+          result.packed = packed
+          result.scores = unpack_scores(packed)
+        results.append(result)
+      for seq, num, gross, putts in self.conn.execute(
+          'SELECT seq, num, gross, putts FROM scores WHERE round_id = ? ORDER BY seq, idx', (round_id,)):
+        results[seq].scores.append(Score(num=num, gross=gross, putts=putts))
+      games = []
+      for row in self.conn.execute(
+          'SELECT game_type, options, hole_data FROM games WHERE round_id = ? ORDER BY seq', (round_id,)).fetchall():
+        games.append(Game(game_type=row[0], options=loads(row[1]), hole_data=loads(row[2])))
+      rounds.append(_clean(Round(id=ObjectId(round_id), course=courses[course_id],
+                                 date_played=datetime.datetime.fromisoformat(date_played),
+                                 dict_options=loads(dict_options), results=results, games=games,
+                                 hole_version=hole_version)))
+    return rounds
+
+  def list_rounds(self):
+    return self._load_rounds()
+
+  def list_round_summaries(self):
+    return self._round_summaries()
+
+  def _round_summaries(self, where='', args=(), order='ORDER BY rowid'):
+    page = 'SELECT id FROM rounds {} {}'.format(where, order)
+    course_names = dict(self.conn.execute(
+      'SELECT id, name FROM courses WHERE id IN (SELECT course_id FROM rounds WHERE id IN ({}))'.format(page), args))
+    nick_names = {}
+    for round_id, nick_name in self.conn.execute(
+        'SELECT results.round_id, players.nick_name FROM results JOIN players ON players.id = results.player_id '
+        'WHERE results.round_id IN ({}) ORDER BY results.round_id, results.seq'.format(page), args):
+      nick_names.setdefault(round_id, []).append(nick_name)
+    sql = 'SELECT id, course_id, date_played FROM rounds {} {}'.format(where, order)
+    return [RoundSummary(ObjectId(round_id), datetime.datetime.fromisoformat(date_played), course_names[course_id],
+                         nick_names.get(round_id, []))
+            for round_id, course_id, date_played in self.conn.execute(sql, args)]
+
+  def find_rounds(self, since=None, player_id=None, after=None, limit=None, summary=False):
+    conditions = []
+    args = []
+    if since:
+      conditions.append('date_played >= ?')
+      args.append(since.isoformat())
+    if player_id:
+      conditions.append('id IN (SELECT round_id FROM results WHERE player_id = ?)')
+      args.append(str(player_id))
+    if after:
+      date_played, round_id = after
+      conditions.append('(date_played > ? OR (date_played = ? AND id > ?))')
+      args.extend((date_played.isoformat(), date_played.isoformat(), str(round_id)))
+    where = 'WHERE ' + ' AND '.join(conditions) if conditions else ''
+    # ObjectId hex strings sort in the same order as the ids
+    order = 'ORDER BY date_played, id'
+    if limit:
+      order += ' LIMIT {:d}'.format(limit)
+    if summary:
+      return self._round_summaries(where, args, order)
+    return self._load_rounds(where, args, order)
+
+  def get_round(self, round_id):
+    rounds = self._load_rounds('WHERE id = ?', (str(round_id),))
+    return rounds[0] if rounds else None
+
+  def _result_rows(self, round_id, seq, result):
+    if result.packed:
+      return (round_id, seq, str(result.player.id), result.tee, result.handicap, result.course_handicap, result.packed), []
+    return ((round_id, seq, str(result.player.id), result.tee, result.handicap, result.course_handicap, None),
+            [(round_id, seq, m, score.num, score.gross, score.putts) for m,score in enumerate(result.scores)])
+
+  def _game_row(self, round_id, seq, game):
+    return (round_id, seq) + tuple(game.game_type if field == 'game_type' else _dumps(getattr(game, field))
+                                   for field in GAME_FIELDS)
+
+  def _insert_results(self, round_id, start, results):
+    for n,result in enumerate(results):
+      result_row, score_rows = self._result_rows(round_id, start+n, result)
+      self.conn.execute('INSERT INTO results (round_id, seq, player_id, tee, handicap, course_handicap, packed) '
+                        'VALUES (?,?,?,?,?,?,?)', result_row)
+      self.conn.executemany('INSERT INTO scores (round_id, seq, idx, num, gross, putts) VALUES (?,?,?,?,?,?)', score_rows)
+
+  def _insert_games(self, round_id, start, games):
+    self.conn.executemany('INSERT INTO games (round_id, seq, {}) VALUES (?,?,?,?,?)'.format(', '.join(GAME_FIELDS)),
+                          [self._game_row(round_id, start+n, game) for n,game in enumerate(games)])
+
+  def save_round(self, golf_round):
+    golf_round.validate()
+    if golf_round.id is None:
+      golf_round.id = ObjectId()
+    round_id = str(golf_round.id)
+    try:
+      with self.conn:
+        self.conn.execute(
+          'INSERT INTO rounds (id, course_id, date_played, dict_options, hole_version) VALUES (?,?,?,?,?) '
+          'ON CONFLICT(id) DO UPDATE SET course_id=excluded.course_id, date_played=excluded.date_played, '
+          'dict_options=excluded.dict_options, hole_version=excluded.hole_version',
+          (round_id, str(golf_round.course.id), golf_round.date_played.isoformat(), _dumps(golf_round.dict_options),
+           golf_round.hole_version))
+        for table in ('scores', 'results', 'games'):
+          self.conn.execute('DELETE FROM {} WHERE round_id = ?'.format(table), (round_id,))
+        self._insert_results(round_id, 0, golf_round.results)
+        self._insert_games(round_id, 0, golf_round.games)
+    except sqlite3.IntegrityError as ex:
+      raise GolfDBException('{} - {}'.format(self.database, ex))
+    _clean(golf_round)
+
+  def add_result(self, golf_round, result):
+    result.validate()
+    golf_round.results.append(result)
+    with self.conn:
+      self._insert_results(str(golf_round.id), len(golf_round.results)-1, [result])
+    golf_round.clear_changed('results')
+
+  def save_scores(self, golf_round, hole, lst_gross, lst_putts=None, retries=SCORE_RETRIES):
+    """Compare and swap on rounds.hole_version, merge and try again when another scorer saved first."""
+    round_id = str(golf_round.id)
+    before = golf_round.score_cells(hole)
+    for _ in range(retries+1):
+      version = golf_round.hole_version
+      rows = [(round_id, n, m, score.num, score.gross, score.putts)
+              for n, m, score, added in golf_round.set_scores(hole, lst_gross, lst_putts)]
+      with self.conn:
+        if self.conn.execute('UPDATE rounds SET hole_version = ? WHERE id = ? AND hole_version = ?',
+                             (golf_round.hole_version, round_id, version)).rowcount:
+          self.conn.executemany('INSERT OR REPLACE INTO scores (round_id, seq, idx, num, gross, putts) VALUES (?,?,?,?,?,?)', rows)
+          return
+      fresh = self.get_round(round_id)
+      before = golf_round.merge_scores(fresh, hole, before, lst_gross, lst_putts)
+    raise GolfConflictException('round {} hole {} not saved after {} tries'.format(round_id, hole, retries+1))
+
+  def archive_round(self, golf_round):
+    round_id = str(golf_round.id)
+    with self.conn:
+      if not self.conn.execute('SELECT 1 FROM rounds WHERE id = ? AND hole_version = ?',
+                               (round_id, golf_round.hole_version)).fetchone():
+        raise GolfConflictException('round {} saved by another scorer, not archived'.format(round_id))
+      golf_round.archive()
+      self.conn.executemany('UPDATE results SET packed = ? WHERE round_id = ? AND seq = ?',
+                            [(result.packed, round_id, n) for n,result in enumerate(golf_round.results)])
+      self.conn.execute('DELETE FROM scores WHERE round_id = ?', (round_id,))
+
+  # games
+  def add_game(self, golf_round, game):
+    game.validate()
+    golf_round.games.append(game)
+    with self.conn:
+      self._insert_games(str(golf_round.id), len(golf_round.games)-1, [game])
+    golf_round.clear_changed('games')
+
+  def save_games(self, golf_round):
+    round_id = str(golf_round.id)
+    changed = [(n, field) for n, field in golf_round.pop_changed_games() if field in GAME_FIELDS]
+    with self.conn:
+      for n, field in changed:
+        value = getattr(golf_round.games[n], field)
+        self.conn.execute('UPDATE games SET {} = ? WHERE round_id = ? AND seq = ?'.format(field),
+                          (value if field == 'game_type' else _dumps(value), round_id, n))
+    return len(changed)
+
+  def get_game_states(self, round_id):
+    loads, _ = self._loader({})
+    sql = 'SELECT game_index, hole_version, inputs, {} FROM game_states WHERE round_id = ? ORDER BY game_index'.format(', '.join(STATE_FIELDS))
+    return [_clean(GameState(round_id=ObjectId(round_id), game_index=row[0], hole_version=row[1], inputs=json.loads(row[2])).set_output(
+                     loads(row[3]), loads(row[4]), loads(row[5])))
+            for row in self.conn.execute(sql, (str(round_id),))]
+
+  def save_game_states(self, states):
+    rows = [(str(state.round_id), state.game_index, state.hole_version, json.dumps(state.inputs)) +
+            tuple(_dumps(getattr(state, field)) for field in STATE_FIELDS)
+            for state in states]
+    self._executemany('INSERT OR REPLACE INTO game_states (round_id, game_index, hole_version, inputs, {}) VALUES (?,?,?,?,?,?,?)'.format(
+      ', '.join(STATE_FIELDS)), rows)
+    return len(rows)
@@ -0,0 +1,32 @@
+"""summary.py - lightweight summaries for listing rounds and courses.
+
+Listing only needs a few fields, so the storage backends build these from a
+projection instead of loading full documents and creating the games.
+"""
+
+class RoundSummary(object):
+  """Round date, course name and player nick names."""
+  __slots__ = ('id', 'date_played', 'course_name', 'nick_names')
+
+  def __init__(self, id, date_played, course_name, nick_names):
+    self.id = id
+    self.date_played = date_played
+    self.course_name = course_name
+    self.nick_names = nick_names
+
+  def __str__(self):
+    return '{} {:<30} - {}'.format(self.date_played, self.course_name, ','.join(self.nick_names))
+
+class CourseSummary(object):
+  """Course name, number of holes and tees and par."""
+  __slots__ = ('id', 'name', 'num_holes', 'num_tees', 'par')
+
+  def __init__(self, id, name, num_holes, num_tees, par):
+    self.id = id
+    self.name = name
+    self.num_holes = num_holes
+    self.num_tees = num_tees
+    self.par = par
+
+  def __str__(self):
+    return '{:<40} - {:>2} holes - {:>2} tees par:{}'.format(self.name, self.num_holes, self.num_tees, self.par)
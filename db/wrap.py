@@ -1,17 +1,47 @@
 """wrap.py - wrapper classes for mongoengine Documents."""
+from types import MappingProxyType
 from .doc import Doc
+from .course_cache import course_cache
 from .game_factory import GolfGameFactory
+from .game import digest
+from .db_mongoengine import GameState
+from .score_matrix import ScoreMatrix
+
+# Course handicaps with bumps computed when the course view is built, plus
+# handicaps are negative. Others are computed when asked for.
+BUMP_TABLE_RANGE = range(-18, 73)
 
 class DCourse(Doc):
+  """Course view, built once and shared by all rounds on the course. Do not modify."""
+  def __init__(self, doc):
+    super().__init__(doc)
+    self.pars = tuple(hole.par for hole in self.holes)
+    self.hole_handicaps = tuple(hole.handicap for hole in self.holes)
+    # hole index for each handicap rank, hardest hole first.
+    self.handicap_ranks = tuple(sorted(range(len(self.holes)), key=lambda n: self.hole_handicaps[n]))
+    # hole index a stroke is given on for each hole handicap, the first hole when repeated
+    self.stroke_holes = {}
+    for n in self.handicap_ranks:
+      self.stroke_holes.setdefault(self.hole_handicaps[n], n)
+    self.bump_table = MappingProxyType({handicap: self._make_bumps(handicap) for handicap in BUMP_TABLE_RANGE})
+    tees = {}
+    for tee in self.tees:
+      tees.setdefault((tee.gender, tee.name), tee)
+    self.tee_lookup = MappingProxyType(tees)
+    self.setStats()
+
   def setStats(self):
     """Par totals."""
-    self.out_tot = sum([hole.par for hole in self.holes[:9]])
-    self.in_tot  = sum([hole.par for hole in self.holes[9:]])
+    self.out_tot = sum(self.pars[:9])
+    self.in_tot  = sum(self.pars[9:])
     self.total   = self.in_tot + self.out_tot
 
+  def get_tee(self, name, gender):
+    """Return Tee matching name and gender ('mens' or 'womens') or None."""
+    return self.tee_lookup.get((gender, name))
+
   def getScorecard(self, **kwargs):
     """Return hdr, par and hdcp lines for scorecard."""
-    self.setStats()
     hdr  = 'Hole  '
     par  = 'Par   '
     hdcp = 'Hdcp  '
@@ -38,7 +68,7 @@ class DCourse(Doc):
            }
 
   def course_par(self):
-    return sum([hole.par for hole in self.holes])
+    return sum(self.pars)
 
   def calcESC(self, hole_index, gross, course_handicap):
     """Determine ESC post value for this gross score."""
@@ -62,26 +92,30 @@ class DCourse(Doc):
       esc = gross if gross < 10 else 10
     return esc
 
+  def _make_bumps(self, handicap):
+    # every hole for each 18 strokes, the rest on the hardest holes.
+    # A plus handicap gives strokes back, starting on the easiest hole.
+    full, strokes = divmod(abs(handicap), 18)
+    sign = 1 if handicap >= 0 else -1
+    bumps = [sign*full for _ in range(len(self.holes))]
+    for hdcp in (range(1, strokes+1) if handicap >= 0 else range(18, 18-strokes, -1)):
+      n = self.stroke_holes.get(hdcp)
+      if n is not None:
+        bumps[n] += sign
+    return tuple(bumps)
+
   def calcBumps(self, handicap):
     """Determine bumps basid in this handicap.
 
     Args:
-      handicap: course handicap.
+      handicap: course handicap, rounded when an allowance makes it a fraction.
     Returns:
-      list of bumps for each hole.
+      tuple of bumps for each hole, shared, do not modify.
     """
-    bumps = [0 for _ in range(len(self.holes))]
-    # handicap > 18 will bump all holes
-    while handicap > 17:
-      bumps = [x+1 for x in bumps]
-      handicap -= 18
-    # now handicaps < 18
-    if handicap > 0:
-      for bp in range(handicap % 18, 0, -1):
-        for n,hole in enumerate(self.holes):
-          if hole.handicap == bp:
-            bumps[n] += 1
-            break
+    handicap = int(round(handicap))
+    bumps = self.bump_table.get(handicap)
+    if bumps is None:
+      bumps = self._make_bumps(handicap)
     return bumps
 
   def get_holes_with_par(self, par):
@@ -105,23 +139,158 @@ class DRound(Doc):
   OPTIONS = {
     'handicap_type': {'type': 'enum', 'values': ('USGA', 'simple')},
   }
-  def __init__(self, doc):
+  skip_fields = ('course',)
+
+  def __init__(self, doc, game_states=()):
+    """game_states is the stored GameState list, leave empty when games are updated."""
     super().__init__(doc)
-    self.course = DCourse(doc.course)
+    # course reference is not dereferenced when the course is cached.
+    ref = doc._data['course']
+    self.course = course_cache.get(getattr(ref, 'id', ref), lambda: DCourse(doc.course))
+    # scores by player and hole index, the games read these
+    self.matrix = ScoreMatrix(self.course, self.doc.results)
+    self.matrix.snapshot = self.score_snapshot()
+    # bumps and net rows by (result index, min handicap), shared by the games
+    self._bumps = {}
+    self._nets = {}
+    self._handicaps = [result.course_handicap for result in self.doc.results]
+    # digest of each input, see GolfGame.inputs, a game with the same digests
+    # in its GameState is not updated again
+    self.input_versions = {name: digest(self._input(name)) for name in ('gross', 'putts', 'handicaps')}
     # create all games
-    self.games = []
-    for doc_game in self.doc.games:
-      game_class = GolfGameFactory(doc_game.game_type)
-      game = game_class(doc_game, self)
-      self.games.append(game)
+    self.games = [self._create_game(doc_game) for doc_game in self.doc.games]
+    for state in game_states:
+      self.games[state.game_index].set_state(state)
+
+  def _input(self, name):
+    return self._handicaps if name == 'handicaps' else getattr(self.matrix, name)
+
+  def _create_game(self, doc_game):
+    game_class = GolfGameFactory(doc_game.game_type)
+    return game_class(doc_game, self)
+
+  def score_snapshot(self):
+    """Return (num, gross, putts) of every score of each result, to compare with a later snapshot."""
+    return [tuple((sc.num, sc.gross, sc.putts) for sc in result.scores) for result in self.doc.results]
+
+  @staticmethod
+  def next_hole(before, now):
+    """Return the hole number when now only adds the next hole for every player to before, else None.
+
+    Holes must be played in order from hole 1.
+    """
+    if before is None or len(before) != len(now):
+      return None
+    hole = len(before[0]) + 1
+    for old, new in zip(before, now):
+      if len(new) != hole or new[:-1] != old or [sc[0] for sc in new] != list(range(1, hole+1)):
+        return None
+    return hole
+
+  def changed_inputs(self, game):
+    """Return set of the inputs of game changed since it was last updated."""
+    changed = {name for name in game.inputs
+               if name in self.input_versions and game.inputs_applied.get(name) != self.input_versions[name]}
+    if 'hole_data' in game.inputs and game.inputs_applied.get('hole_data') != digest(game.hole_data):
+      changed.add('hole_data')
+    return changed
 
   def update_games(self):
-    # create all games
-    for game in self.games:
-      game.update()
-      game.doc.leaderboard = game.getLeaderboard()
-      game.doc.scorecard = game.getScorecard()
-      game.doc.status = game.getStatus()
+    """Update the games with inputs changed since their last update.
+
+    An incremental game with only scores changed, and all scores except
+    the next hole applied, only applies that hole. Other games are created
+    again and updated from the first hole, so no state is left from an
+    earlier update. Games with no input changed are left as they are.
+
+    Returns:
+      list of the questions of all games, see GolfGame.ask(). A game with
+      questions keeps its last output and is updated again, after the
+      answers are set, by the next call.
+    """
+    scores = self.score_snapshot()
+    hole = self.next_hole(self.matrix.snapshot, scores)
+    if hole is not None:
+      changed = self.matrix.set_hole(hole, [result.scores[hole-1] for result in self.doc.results])
+    elif self.matrix.snapshot != scores:
+      changed = self.matrix.load(self.doc.results)
+    else:
+      changed = set()
+    handicaps = [result.course_handicap for result in self.doc.results]
+    if handicaps != self._handicaps:
+      self._handicaps = handicaps
+      self._bumps = {}
+      changed.add('handicaps')
+    if changed:
+      self._nets = {}
+    for name in changed:
+      self.input_versions[name] = digest(self._input(name))
+    self.matrix.snapshot = scores
+    questions = []
+    for n, game in enumerate(self.games):
+      changed = self.changed_inputs(game)
+      if changed:
+        last = game
+        hole = None
+        if game.incremental and changed <= {'gross', 'putts'}:
+          hole = self.next_hole(game.scores_applied, scores)
+        if hole is not None:
+          game.stale = True
+          game.apply_hole(hole, [result.scores[hole-1] for result in self.doc.results])
+        else:
+          if game.stale or game.scores_applied is not None:
+            game = self.games[n] = self._create_game(self.doc.games[n])
+          game.stale = True
+          game.update()
+          if game.questions:
+            questions += game.questions
+            if last is not game:
+              # keep the last update and its output, the next call starts from it
+              self.games[n] = last
+            continue
+        game.stale = False
+        game.inputs_applied = dict(self.input_versions, hole_data=digest(game.hole_data))
+        game.leaderboard = game.getLeaderboard()
+        game.scorecard = game.getScorecard()
+        game.status = game.getStatus()
+        game.hole_version = self.doc.hole_version
+        # saved only when the output differs from the last one, stored or updated
+        output = digest([game.leaderboard, game.scorecard, game.status])
+        game.output_changed = last.output_changed or output != last.output_digest
+        game.output_digest = output
+      game.scores_applied = scores
+    return questions
+
+  def bumps(self, index, min_handicap=0):
+    """Strokes on each hole for result index playing off min_handicap.
+
+    Computed once for the round and shared by all games, do not modify.
+    """
+    key = (index, min_handicap)
+    if key not in self._bumps:
+      self._bumps[key] = self.course.calcBumps(self.results[index].course_handicap - min_handicap)
+    return self._bumps[key]
+
+  def net_row(self, index, min_handicap=0):
+    """Net score on each hole for result index, None when not played. Shared, do not modify."""
+    key = (index, min_handicap)
+    if key not in self._nets:
+      self._nets[key] = tuple(self.matrix.net_row(index, self.bumps(index, min_handicap)))
+    return self._nets[key]
+
+  def _game_state(self, n, game):
+    game.output_changed = False
+    return GameState(round_id=self.doc.id, game_index=n, hole_version=game.hole_version,
+                     inputs=game.inputs_applied).set_output(
+      game.leaderboard, game.scorecard, game.status)
+
+  def game_states(self):
+    """Return GameState of each game to save after update_games()."""
+    return [self._game_state(n, game) for n,game in enumerate(self.games)]
+
+  def pop_game_states(self):
+    """Return GameState of only the games with output changed since the last call or the stored state."""
+    return [self._game_state(n, game) for n,game in enumerate(self.games) if game.output_changed]
 
   def calcCourseHandicap(self, player, tee_name):
     """Course Handicap = Handicap Index * Slope rating / 113."""
@@ -135,12 +304,10 @@ class DRound(Doc):
       # Course Handicap = Handicap Index * Slope rating / 113
       # need to get the tee slope rating from the course
       tee_gender = 'mens' if player.gender == 'man' else 'womens'
-      for tee in self.course.tees:
-        if tee.name == tee_name and tee.gender == tee_gender:
-          slope = tee.slope
-          break
-      else:
+      tee = self.course.get_tee(tee_name, tee_gender)
+      if tee is None:
         raise Exception('{} tee <{}> not found.'.format(tee_gender, tee_name))
+      slope = tee.slope
       course_handicap = int(round(player.handicap * slope / 113))
     else:
       raise Exception('handicap type <{}> not supported.'.format(handicap_type))
@@ -2,6 +2,7 @@
 """dbmain.py"""
 import datetime
 import logging
+import os
 import platform
 if platform.system() == 'Linux':
   import readline
@@ -15,12 +16,17 @@ from mongoengine import *
 from db.db_mongoengine import Player, Course, Tee, Hole, Round, Result, Game, Score
 from db.dplayer import DPlayer
 from db.wrap import DCourse, DRound, DResult
-from db.db_mongoengine import Database, DBAdmin
+from db.storage import DEF_BATCH_SIZE
+from db.storage_factory import GolfStorageFactory, GolfStorageList
+from db.score_buffer import ScoreBuffer, DEF_FLUSH_SECONDS
+from db.export import export_rounds
+from db.render import TextRenderer, GolfRendererFactory, GolfRendererList
 from db.data.test_players import DBGolfPlayers
 from db.data.test_courses import DBGolfCourses
 from db.game_factory import GolfGameFactory
-from db.exceptions import GolfGameException
+from db.exceptions import GolfException
 
+os.makedirs('logs', exist_ok=True)
 TLLog.config('logs/dbmain.log', defLogLevel=logging.INFO )
 
 log = TLLog.getLogger('dbmain')
@@ -30,7 +36,27 @@ class DBMenu(Menu):
     cmdFile = kwargs.get('cmdFile')
     url = kwargs.get('url')
     database = kwargs.get('database')
-    self.db = DBAdmin(url, database)
+    storage = kwargs.get('storage', 'mongo')
+    options = kwargs.get('options', {})
+    self.db = GolfStorageFactory(storage)(url, database, **options)
+    if kwargs.get('batch_size'):
+      self.db.batch_size = kwargs['batch_size']
+    # gas writes through the score buffer when buffering is on
+    self.buffer = None
+    if kwargs.get('buffer_holes'):
+      self.buffer = ScoreBuffer(self.db, kwargs['journal'], kwargs['buffer_holes'], kwargs.get('buffer_seconds', DEF_FLUSH_SECONDS))
+      try:
+        count = self.buffer.replay()
+        if count:
+          print('{} journal entries replayed from {}'.format(count, kwargs['journal']))
+      except GolfException as ex:
+        # scores would be appended after the entries not written, keep the journal as it is
+        log.error(str(ex))
+        print('{} - buffering disabled, journal kept'.format(ex))
+        self.buffer = None
+    self.writer = self.buffer or self.db
+    # DRound being scored, kept between gas commands
+    self._golf_round = None
     super().__init__(cmdFile)
     # add menu items
     self.addMenuItem( MenuItem( 'dbl', '<database>',        
@@ -49,19 +75,27 @@ class DBMenu(Menu):
                                 #'create a course.', self._courseCreate) )
     self.addMenuItem( MenuItem( 'cor', '',        
                                 'retrieve a course.', self._courseRetrieve) )
-    self.addMenuItem( MenuItem( 'cos', '<name>',        
+    self.addMenuItem( MenuItem( 'cos', '<[^|=]name>',        
                                 'return a course scorecard.', self._courseGetScorecard) )
     #self.addMenuItem( MenuItem( 'cou', 'email,first_name,last_name,nick_name,handicap,gender',        
                                 #'update a course.', self._courseUpdate) )
     self.addMenuItem( MenuItem( 'cod', 'email',        
                                 'detete a course.', self._courseDelete) )
-    self.addMenuItem( MenuItem( 'ror', '',        
+    self.addMenuItem( MenuItem( 'ror', '[--limit=N] [--since=YYYY-MM-DD] [--player=[^|=]email]',
                                 'retrieve rounds.', self._roundRetrieve) )
+    self.addMenuItem( MenuItem( 'roa', '[--since=YYYY-MM-DD]',
+                                'archive completed rounds.', self._roundArchive) )
+    self.addMenuItem( MenuItem( 'rox', '<file.parquet|file.arrow|file.csv> [--since=YYYY-MM-DD]',
+                                'export rounds, a row for each player hole.', self._roundExport) )
+    self.addMenuItem( MenuItem( 'snapshot', '<file>',
+                                'write database to a compressed file.', self._snapshot) )
+    self.addMenuItem( MenuItem( 'restore', '<file>',
+                                'replace database with a snapshot file.', self._restore) )
     self.addMenuItem( MenuItem( 'testdata', '<players|courses>',        
                                 'insert test data into database.', self._testData) )
-    self.addMenuItem( MenuItem( 'gcr', '<course> <YYYY-MM-DD> [option=value,...]',
+    self.addMenuItem( MenuItem( 'gcr', '<[^|=]course> <YYYY-MM-DD> [option=value,...]',
                                 'Create a Round of Golf',      self._roundCreate))
-    self.addMenuItem( MenuItem( 'gad', '<email> <tee>',
+    self.addMenuItem( MenuItem( 'gad', '<[^|=]email> <tee>',
                                 'Add player to Round of Golf', self._roundAddPlayer))
     self.addMenuItem( MenuItem( 'gag', '<game> <players>',
                                 'Add game to Round of Golf',   self._roundAddGame))
@@ -69,10 +103,35 @@ class DBMenu(Menu):
                                 'Start Round of Golf',         self._roundStart))
     self.addMenuItem( MenuItem( 'gas', '<hole> gross=<gross..> <pause=enable>',
                                 'Add Scores',                 self._roundScore))
+    self.addMenuItem( MenuItem( 'gsh', '[text|json|html]',
+                                'Show games of Round of Golf', self._roundShow))
     self.updateHeader()
 
   def updateHeader(self):
-    self.header = 'database url:{} database:{}'.format(self.db.url, self.db.database)
+    self.header = 'storage:{} database url:{} database:{}'.format(self.db.__class__.__name__, self.db.url, self.db.database)
+
+  def preCommand(self):
+    # other commands read and change the round in the storage
+    if self.lstCmd[0] != 'gas':
+      self._golf_round = None
+      if self.buffer:
+        self.buffer.close()
+
+  def postCommand(self):
+    if self.buffer:
+      self.buffer.flush_if_due()
+
+  def shutdown(self):
+    if self.buffer:
+      self.buffer.close()
+
+  def _matchArg(self, arg):
+    """Return value and lookup mode, ^value is a prefix match and =value an exact match."""
+    if arg.startswith('^'):
+      return arg[1:], 'prefix'
+    if arg.startswith('='):
+      return arg[1:], 'exact'
+    return arg, 'contains'
 
   def _dbConnect(self):
     self.database = self.lstCmd[1]
@@ -92,24 +151,35 @@ class DBMenu(Menu):
       if len(lst) == 2:
         dct[lst[0]] = lst[1]
     player = Player(**dct)
-    player.save()
+    self.db.save_player(player)
   
   def _testData(self):
     if self.lstCmd[1] == 'players':
-      for dct in DBGolfPlayers:
-        player = Player(**dct)
-        player.save()
+      print(self.db.insert_players([Player(**dct) for dct in DBGolfPlayers]))
     elif self.lstCmd[1] == 'courses':
+      courses = []
       for dct in DBGolfCourses:
         holes = [Hole(par=gh['par'], handicap=gh['handicap'], num=n+1) for n,gh in enumerate(dct['holes'])]
         tees = [Tee(gender=gt['gender'], name=gt['name'], rating=gt['rating'], slope=gt['slope']) for n,gt in enumerate(dct['tees'])]
-        course = Course(name=dct['name'], holes=holes, tees=tees)
-        course.save()
+        courses.append(Course(name=dct['name'], holes=holes, tees=tees))
+      print(self.db.insert_courses(courses))
     else:
       raise InputException('only players or courses supported.')
   
+  def _snapshot(self):
+    if len(self.lstCmd) < 2:
+      raise InputException('Snapshot file name required')
+    counts = self.db.snapshot(self.lstCmd[1])
+    print('{} written - {}'.format(self.lstCmd[1], ', '.join('{}:{}'.format(*item) for item in counts.items())))
+
+  def _restore(self):
+    if len(self.lstCmd) < 2:
+      raise InputException('Snapshot file name required')
+    counts = self.db.restore(self.lstCmd[1])
+    print('{} restored - {}'.format(self.lstCmd[1], ', '.join('{}:{}'.format(*item) for item in counts.items())))
+
   def _playerRetrieve(self):
-    for n,doc in enumerate(Player.objects):
+    for n,doc in enumerate(self.db.list_players()):
       player = DPlayer(doc)
       print('  {:>3} {}'.format(n,player))
 
@@ -120,8 +190,7 @@ class DBMenu(Menu):
     pass
 
   def _courseRetrieve(self):
-    for n,doc in enumerate(Course.objects):
-      course = DCourse(doc)
+    for n,course in enumerate(self.db.list_course_summaries()):
       print('  {:>3} {}'.format(n,course))
 
   def _courseDelete(self):
@@ -130,8 +199,8 @@ class DBMenu(Menu):
   def _courseGetScorecard(self):
     if len(self.lstCmd) < 2:
       raise InputException('Not enough arguments for {} command'.format(self.lstCmd[0]))
-    name = self.lstCmd[1]
-    courses = Course.objects(name__contains=name)
+    name, match = self._matchArg(self.lstCmd[1])
+    courses = self.db.find_courses(name, match)
     for doc in courses:
       course = DCourse(doc)
       dct = course.getScorecard()
@@ -144,7 +213,7 @@ class DBMenu(Menu):
     # gcr <course> <YYYY-MM-DD> [option=value,...]
     if len(self.lstCmd) < 3:
       raise InputException( 'Not enough arguments for %s command' % self.lstCmd[0] )
-    course_name = self.lstCmd[1]
+    course_name, match = self._matchArg(self.lstCmd[1])
     dtPlay = datetime.datetime.strptime(self.lstCmd[2], "%Y-%m-%d")
     # get options
     options = {}
@@ -152,7 +221,7 @@ class DBMenu(Menu):
       lst = option.split('=')
       options[lst[0]] = lst[1]
 
-    courses = Course.objects(name__contains=course_name)
+    courses = self.db.find_courses(course_name, match)
     if not courses:
       raise InputException('Course name <{}> not matched.'.format(course_name))
     elif len(courses) > 1:
@@ -160,7 +229,7 @@ class DBMenu(Menu):
     course = courses[0]
 
     golf_round = Round(course=course, date_played=dtPlay, dict_options=options)
-    golf_round.save()
+    self.db.save_round(golf_round)
     self._round_id = golf_round.id
     print('new round id = {}'.format(self._round_id))
 
@@ -170,14 +239,14 @@ class DBMenu(Menu):
       raise InputException( 'Golf round not created')
     if len(self.lstCmd) < 3:
       raise InputException( 'Not enough arguments for %s command' % self.lstCmd[0] )
-    email = self.lstCmd[1]
+    email, match = self._matchArg(self.lstCmd[1])
     tee_name = self.lstCmd[2]
 
     # get round
-    doc_round = Round.objects(id=self._round_id).first()
+    doc_round = self.db.get_round(self._round_id)
     golf_round = DRound(doc_round)
     # find player
-    players = Player.objects(email__contains=email)
+    players = self.db.find_players(email, match)
     if not players:
       raise InputException('Player email <{}> not matched.'.format(email))
     elif len(players) > 1:
@@ -187,8 +256,7 @@ class DBMenu(Menu):
     # Create Result
     course_handicap = golf_round.calcCourseHandicap(player, tee_name)
     doc_result = Result(player=doc_player, tee=tee_name, handicap=doc_player.handicap, course_handicap=course_handicap)
-    doc_round.results.append(doc_result)
-    doc_round.save()
+    self.db.add_result(doc_round, doc_result)
 
     result = DResult(doc_result)
     print('Round:{}'.format(golf_round))
@@ -209,44 +277,39 @@ class DBMenu(Menu):
         dct[lst[0]] = eval(lst[1])
 
     # get round
-    doc_round = Round.objects(id=self._round_id).first()
+    doc_round = self.db.get_round(self._round_id)
     golf_round = DRound(doc_round)
     doc_game = Game(game_type=game_type, options=dct)
-    doc_round.games.append(doc_game)
-    doc_round.save()
+    self.db.add_game(doc_round, doc_game)
 
   def _roundStart(self):
     if self._round_id is None:
       raise InputException( 'Golf round not created')
     # get round
-    doc_round = Round.objects(id=self._round_id).first()
+    doc_round = self.db.get_round(self._round_id)
     golf_round = DRound(doc_round)
-    golf_round.update_games()
+    self._updateGames(golf_round)
+    self.db.save_game_states(golf_round.game_states())
     self._roundDump(golf_round)
 
   def _roundDump(self, golf_round=None):
     """ dump scorecard, leaderboard, status."""
     # get round
     if not golf_round:
-      doc_round = Round.objects(id=self._round_id).first()
-      golf_round = DRound(doc_round)
+      doc_round = self.db.get_round(self._round_id)
+      golf_round = DRound(doc_round, self.db.get_game_states(doc_round.id))
     # dumps
     self._roundScorecard(golf_round)
     self._roundLeaderboard(golf_round)
     self._roundStatus(golf_round)
 
   def _roundScorecard(self, golf_round):
-    dct = golf_round.getScorecard(ESC=True)
-    print(dct['title'])
-    print(dct['hdr'])
-    print(dct['par'])
-    print(dct['hdcp'])
+    renderer = TextRenderer()
+    for line in renderer.course(golf_round):
+      print(line)
     for game in golf_round.games:
-      #dct = game.getScorecard()
-      dct = game.doc.scorecard
-      print(dct['header'])
-      for player in dct['players']:
-        print(player['line'])
+      for line in renderer.scorecard(game):
+        print(line)
 
   def _roundLeaderboard(self, golf_round, **kwargs):
     length = 22
@@ -258,19 +321,54 @@ class DBMenu(Menu):
         lstLines[index] += ' {:<22}'.format(msg)
 
     header = '{0:-^22}' if kwargs.get('sort_type') == 'money' else '{0:*^22}'
+    renderer = TextRenderer()
     for game in golf_round.games:
-      dctLeaderboard = game.doc.leaderboard
       update_line(0, header.format(' '+ game.short_description+ ' '))
-      update_line(1, dctLeaderboard['hdr'])
-      for i,dct in enumerate(dctLeaderboard['leaderboard']):
-        update_line(i+2, dct['line'])
+      for i,line in enumerate(renderer.leaderboard(game)):
+        update_line(i+1, line)
     for line in [line for line in lstLines if line is not None]:
       print(line)
 
   def _roundStatus(self, golf_round):
+    renderer = TextRenderer()
     for game in golf_round.games:
-      dctStatus = game.doc.status
-      print('{:<15} - {}'.format(game.short_description, dctStatus['line']))
+      print('{:<15} - {}'.format(game.short_description, renderer.status(game)))
+
+  def _roundShow(self):
+    """ gsh [text|json|html]"""
+    if self._round_id is None:
+      raise InputException( 'Golf round not created')
+    name = self.lstCmd[1] if len(self.lstCmd) > 1 else 'text'
+    if name not in GolfRendererList():
+      raise InputException('Format {} not in {}'.format(name, GolfRendererList()))
+    doc_round = self.db.get_round(self._round_id)
+    golf_round = DRound(doc_round, self.db.get_game_states(doc_round.id))
+    if name == 'text':
+      self._roundDump(golf_round)
+      return
+    renderer = GolfRendererFactory(name)()
+    for game in golf_round.games:
+      print(renderer.scorecard(game))
+      print(renderer.leaderboard(game))
+      print(renderer.status(game))
+
+  def _updateGames(self, golf_round):
+    """Update games, asking the questions of all games until none are left."""
+    questions = golf_round.update_games()
+    while questions:
+      for dct in questions:
+        print('{} Game - {} - {}'.format(dct['game'].short_description, dct['msg'], ','.join([pl.nick_name for pl in dct['players']])))
+        prompt = '{} Game - {} - {} : '.format(
+          dct['game'].short_description,
+          dct['msg'],
+          ','.join(['{} : {}'.format(n, pl.nick_name) for n,pl in enumerate(dct['players'])]))
+        i = input(prompt)
+        if i == 'x':
+          raise Exception('Abort by user')
+        i = int(i)
+        hole_data = dct['hole_data'].setdefault(str(dct['hole_num']), {})
+        hole_data[dct['key']] = dct['players'][i].nick_name
+      questions = golf_round.update_games()
 
   def _roundScore(self):
     """ gas <hole> gross=<list> [pause=enable]"""
@@ -283,14 +381,7 @@ class DBMenu(Menu):
       if lstPutts and len(lstPutts) != len(gr.results):
         raise GolfException('putts do not match number of players')
       # update scores
-      for n,result in enumerate(gr.results):
-        score = Score(num=hole, gross=lstGross[n])
-        if lstPutts:
-          score = Score(num=hole, gross=lstGross[n], putts=lstPutts[n])
-        else:
-          score = Score(num=hole, gross=lstGross[n])
-        result.scores.append(score)
-        result.save()
+      self.writer.save_scores(gr.doc, hole, lstGross, lstPutts)
       #print('dct_scores:{}'.format(dct_scores))
       if options:
         for game in gr.games:
@@ -322,49 +413,108 @@ class DBMenu(Menu):
       raise InputException('gross must be set with gas command.')
     #
     # get round
-    doc_round = Round.objects(id=self._round_id).first()
-    addScore(doc_round)
+    doc_round = self.writer.get_round(self._round_id)
+    # keep the games from the last hole when nothing else changed the round,
+    # update_games() then only applies the new hole
+    golf_round = self._golf_round
+    if (golf_round is None or golf_round.doc.id != doc_round.id or
+        golf_round.doc.hole_version != doc_round.hole_version):
+      golf_round = DRound(doc_round)
+    doc_round = golf_round.doc
+    self._golf_round = golf_round
+    addScore(golf_round)
 
-    golf_round = DRound(doc_round)
-    # Validate all games have enough information.
-    # TODO: This only resolves one at a time. Should return all at once.
-    while True:
-      try:
-        golf_round.update_games()
-        break
-      except GolfGameException as ex:
-        dct = ex.dct
-        print('{} Game - {} - {}'.format(dct['game'].short_description, dct['msg'], ','.join([pl.nick_name for pl in dct['players']])))
-        prompt = '{} Game - {} - {} : '.format(
-          dct['game'].short_description,
-          dct['msg'],
-          ','.join(['{} : {}'.format(n, pl.nick_name) for n,pl in enumerate(dct['players'])]))
-    
-        i = input(prompt)
-        if i == 'x':
-          raise Exception('Abort by user')
-        i = int(i)
-        dct['hole_data'].update({ str(dct['hole_num']) : {dct['key'] : dct['players'][i].nick_name }})
-        golf_round.save()
-    
-    golf_round.save()
+    # all questions of the games are answered before saving
+    self._updateGames(golf_round)
+    self.writer.save_games(doc_round)
+    # only the games with changed inputs were updated
+    self.writer.save_game_states(golf_round.pop_game_states())
 
     self._roundDump(golf_round)
     self.pushCommands([pause_command])
 
   def _roundRetrieve(self):
-    for n,doc in enumerate(Round.objects):
-      ro = DRound(doc)
+    """ ror [--limit=N] [--since=YYYY-MM-DD] [--player=[^|=]email]"""
+    kwargs = {}
+    for arg in self.lstCmd[1:]:
+      lst = arg.split('=', 1)
+      if len(lst) != 2:
+        raise InputException('Unknown argument {}'.format(arg))
+      if lst[0] == '--limit':
+        kwargs['limit'] = int(lst[1])
+      elif lst[0] == '--since':
+        kwargs['since'] = datetime.datetime.strptime(lst[1], "%Y-%m-%d")
+      elif lst[0] == '--player':
+        players = self.db.find_players(*self._matchArg(lst[1]))
+        if len(players) != 1:
+          raise InputException('{} players match {}'.format(len(players), lst[1]))
+        kwargs['player_id'] = players[0].id
+      else:
+        raise InputException('Unknown argument {}'.format(arg))
+    for n,ro in enumerate(self.db.iter_rounds(summary=True, **kwargs)):
       print('  {:>3} {}'.format(n,ro))
 
+  def _roundArchive(self):
+    """ roa [--since=YYYY-MM-DD]"""
+    kwargs = {}
+    for arg in self.lstCmd[1:]:
+      lst = arg.split('=', 1)
+      if len(lst) != 2 or lst[0] != '--since':
+        raise InputException('Unknown argument {}'.format(arg))
+      kwargs['since'] = datetime.datetime.strptime(lst[1], "%Y-%m-%d")
+    count = 0
+    for doc in self.db.iter_rounds(**kwargs):
+      if not doc.is_archived() and doc.is_complete(len(doc.course.holes)):
+        self.db.archive_round(doc)
+        count += 1
+    print('{} rounds archived'.format(count))
+
+  def _roundExport(self):
+    """ rox <file.parquet|file.arrow|file.csv> [--since=YYYY-MM-DD]"""
+    if len(self.lstCmd) < 2:
+      raise InputException('Export file name required')
+    kwargs = {}
+    for arg in self.lstCmd[2:]:
+      lst = arg.split('=', 1)
+      if len(lst) != 2 or lst[0] != '--since':
+        raise InputException('Unknown argument {}'.format(arg))
+      kwargs['since'] = datetime.datetime.strptime(lst[1], "%Y-%m-%d")
+    count = export_rounds(self.db, self.lstCmd[1], **kwargs)
+    print('{} rows written to {}'.format(count, self.lstCmd[1]))
+
 def main():
   DEF_LOG_ENABLE = 'dbmain'
   DEF_DATABASE = 'golfdata'
+  DEF_STORAGE = 'mongo'
+  DEF_JOURNAL = 'logs/scores.journal'
   # build the command line arguments
   from argparse import ArgumentParser
   parser = ArgumentParser()
   parser.add_argument('-d', '--database', default=DEF_DATABASE,
                      help='Set database to use. Default {}'.format(DEF_DATABASE))
+  parser.add_argument('-u', '--url', default=None,
+                     help='Database host url, mongodb://host:port/?options for mongo, directory for sqlite. Default localhost')
+  parser.add_argument('--pool_size', type=int, default=None,
+                     help='Maximum connections in the mongo connection pool.')
+  parser.add_argument('--history_pool_size', type=int, default=None,
+                     help='Use a separate mongo pool of this size for round listing and history.')
+  parser.add_argument('--timeout_ms', type=int, default=None,
+                     help='Mongo connect and server selection timeout in milliseconds.')
+  parser.add_argument('--read_preference', default=None,
+                     choices=('primary', 'primaryPreferred', 'secondary', 'secondaryPreferred', 'nearest'),
+                     help='Mongo read preference.')
+  parser.add_argument('--compressors', default=None,
+                     help='Comma separated mongo wire compressors, zstd,snappy,zlib.')
+  parser.add_argument('-s', '--storage', default=DEF_STORAGE, choices=GolfStorageList(),
+                     help='Set storage backend to use. Default {}'.format(DEF_STORAGE))
+  parser.add_argument('-b', '--batch_size', type=int, default=None,
+                     help='Rounds read per query when listing rounds. Default {}'.format(DEF_BATCH_SIZE))
+  parser.add_argument('--buffer_holes', type=int, default=None,
+                     help='Buffer gas scores and write them every N holes and at the turn.')
+  parser.add_argument('--buffer_seconds', type=int, default=DEF_FLUSH_SECONDS,
+                     help='Write buffered scores at most this many seconds after entry. Default {}'.format(DEF_FLUSH_SECONDS))
+  parser.add_argument('--journal', default=DEF_JOURNAL,
+                     help='Journal file for buffered scores. Default {}'.format(DEF_JOURNAL))
   parser.add_argument('--logenable', default=DEF_LOG_ENABLE,
                      help='Comma separated list of log modules to enable, * for all. Default is "%s"' % DEF_LOG_ENABLE)
   parser.add_argument('--showlogs', action="store_true",
@@ -386,7 +536,18 @@ def main():
     logOptions(args.logenable, args.showlogs, log=log)
 
     # create menu application 
-    menu = DBMenu(database=args.database,cmdFile=args.cmdFile)
+    options = {
+      'maxPoolSize': args.pool_size,
+      'connectTimeoutMS': args.timeout_ms,
+      'serverSelectionTimeoutMS': args.timeout_ms,
+      'readPreference': args.read_preference,
+      'compressors': args.compressors,
+      'history_pool_size': args.history_pool_size,
+    }
+    options = {key: value for key,value in options.items() if value is not None}
+    menu = DBMenu(url=args.url,database=args.database,storage=args.storage,options=options,
+                  batch_size=args.batch_size,buffer_holes=args.buffer_holes,buffer_seconds=args.buffer_seconds,
+                  journal=args.journal,cmdFile=args.cmdFile)
     menu.runMenu()
 
   except Exception as err:
@@ -0,0 +1,56 @@
+"""conftest.py - rounds in memory storage for the tests."""
+import datetime
+import pytest
+from db.db_mongoengine import Player, Course, Hole, Tee, Round, Result, Game
+from db.data.test_players import DBGolfPlayers
+from db.data.test_courses import DBGolfCourses
+from db.storage_memory import MemoryStorage
+from db.storage_sqlite import SqliteStorage
+
+def load_courses(db):
+  """Insert the test courses, as dbmain 'init courses'."""
+  courses = []
+  for dct in DBGolfCourses:
+    holes = [Hole(par=gh['par'], handicap=gh['handicap'], num=n+1) for n,gh in enumerate(dct['holes'])]
+    tees = [Tee(gender=gt['gender'], name=gt['name'], rating=gt['rating'], slope=gt['slope']) for gt in dct['tees']]
+    courses.append(Course(name=dct['name'], holes=holes, tees=tees))
+  db.insert_courses(courses)
+
+def create_round(db, emails, games, course_name='Canyon Lakes', tee='Blue'):
+  """Create a round of players with emails, games is list of (game_type, options)."""
+  course = db.find_courses(course_name, 'exact')[0]
+  doc_round = Round(course=course, date_played=datetime.datetime(2018, 6, 2), dict_options={'handicap_type': 'simple'})
+  db.save_round(doc_round)
+  for email in emails:
+    player = db.find_players(email, 'exact')[0]
+    db.add_result(doc_round, Result(player=player, tee=tee, handicap=player.handicap, course_handicap=round(player.handicap)))
+  for game_type, options in games:
+    db.add_game(doc_round, Game(game_type=game_type, options=options))
+  return doc_round
+
+@pytest.fixture
+def memory_db():
+  db = MemoryStorage(None, 'golftest')
+  db.insert_players(Player(**dct) for dct in DBGolfPlayers)
+  load_courses(db)
+  return db
+
+def _mongo_db():
+  mongomock = pytest.importorskip('mongomock')
+  from db.storage_mongo import MongoStorage
+  db = MongoStorage(None, 'golftest', mongo_client_class=mongomock.MongoClient)
+  db.remove()
+  return db
+
+@pytest.fixture(params=['memory', 'sqlite', 'mongo'])
+def each_db(request):
+  """Each storage backend with the test players and courses, mongo uses mongomock."""
+  if request.param == 'mongo':
+    db = _mongo_db()
+  elif request.param == 'sqlite':
+    db = SqliteStorage(None, ':memory:')
+  else:
+    db = MemoryStorage(None, 'golftest')
+  db.insert_players(Player(**dct) for dct in DBGolfPlayers)
+  load_courses(db)
+  return db
@@ -0,0 +1,49 @@
+"""test_apply_hole.py - games applied a hole at a time match a full update."""
+import pytest
+from db.wrap import DRound
+from db.render import TextRenderer
+from conftest import create_round
+
+PLAYERS = ('sjournea@tl.com', 'snake@tl.com', 'spanky@tl.com', 'reload@tl.com')
+
+# gross and putts of each player, hole 1-18
+GROSS = [[4 + (hole*(n+2)) % 4 for n in range(4)] for hole in range(18)]
+PUTTS = [[1 + (hole+n) % 3 for n in range(4)] for hole in range(18)]
+
+def output(golf_round):
+  renderer = TextRenderer()
+  return [(renderer.leaderboard(game), renderer.scorecard(game), renderer.status(game)) for game in golf_round.games]
+
+@pytest.mark.parametrize('game_type, players', [
+  ('gross', 4), ('net', 4), ('putts', 4), ('skins', 4), ('stableford', 4),
+  ('match', 2), ('six_point', 3), ('eighty_one', 3), ('bestball', 4),
+])
+def test_apply_hole_matches_update(memory_db, monkeypatch, game_type, players):
+  doc_round = create_round(memory_db, PLAYERS[:players], [(game_type, {})])
+  golf_round = DRound(doc_round)
+  golf_round.update_games()
+  assert golf_round.games[0].incremental
+  updates = []
+  cls = type(golf_round.games[0])
+  monkeypatch.setattr(cls, 'update', lambda self, update=cls.update: updates.append(self) or update(self))
+  for hole in range(1, 19):
+    memory_db.save_scores(doc_round, hole, GROSS[hole-1][:players], PUTTS[hole-1][:players])
+    golf_round.update_games()
+    full = DRound(doc_round)
+    full.update_games()
+    assert output(golf_round) == output(full), 'hole {}'.format(hole)
+  # one full update for each fresh DRound, none for the incremental one
+  assert len(updates) == 18
+
+def test_changed_hole_updates_again(memory_db):
+  doc_round = create_round(memory_db, PLAYERS, [('skins', {}), ('stableford', {})])
+  golf_round = DRound(doc_round)
+  for hole in range(1, 4):
+    memory_db.save_scores(doc_round, hole, GROSS[hole-1], PUTTS[hole-1])
+    golf_round.update_games()
+  # hole 1 corrected after hole 3, the games are updated from the first hole
+  memory_db.save_scores(doc_round, 1, [3, 8, 5, 5], PUTTS[0])
+  golf_round.update_games()
+  full = DRound(doc_round)
+  full.update_games()
+  assert output(golf_round) == output(full)
@@ -0,0 +1,46 @@
+"""test_archive.py - archived rounds read the same as before archiving."""
+import pytest
+from db.db_mongoengine import Score, pack_scores, unpack_scores
+from db.exceptions import GolfDBException, GolfConflictException
+from db.wrap import DRound
+from db.render import TextRenderer
+from conftest import create_round
+
+GAMES = [('gross', {}), ('net', {}), ('skins', {}), ('putts', {}), ('stableford', {})]
+
+def played_round(db):
+  doc_round = create_round(db, ('sjournea@tl.com', 'snake@tl.com'), GAMES)
+  for hole in range(1, 19):
+    db.save_scores(doc_round, hole, [4 + hole % 3, 5 + hole % 2], [2, 1 + hole % 2])
+  return db.get_round(doc_round.id)
+
+def output(doc_round):
+  golf_round = DRound(doc_round)
+  golf_round.update_games()
+  renderer = TextRenderer()
+  return [(renderer.leaderboard(game), renderer.scorecard(game), renderer.status(game)) for game in golf_round.games]
+
+def scores(doc_round):
+  return [[(score.num, score.gross, score.putts) for score in result.scores] for result in doc_round.results]
+
+def test_pack_scores():
+  lst = [Score(num=1, gross=5, putts=2), Score(num=2, gross=12, putts=None), Score(num=18, gross=3, putts=0)]
+  assert [(sc.num, sc.gross, sc.putts) for sc in unpack_scores(pack_scores(lst))] == [(1, 5, 2), (2, 12, None), (18, 3, 0)]
+
+def test_archive_round_reads_the_same(each_db):
+  doc_round = played_round(each_db)
+  before = (scores(doc_round), output(doc_round))
+  each_db.archive_round(doc_round)
+  archived = each_db.get_round(doc_round.id)
+  assert archived.is_archived()
+  assert (scores(archived), output(archived)) == before
+  with pytest.raises(GolfDBException):
+    each_db.save_scores(archived, 1, [3, 3])
+
+def test_archive_stale_copy(each_db):
+  doc_round = played_round(each_db)
+  stale = each_db.get_round(doc_round.id)
+  each_db.save_scores(doc_round, 18, [3, 3], [1, 1])
+  with pytest.raises(GolfConflictException):
+    each_db.archive_round(stale)
+  assert not each_db.get_round(doc_round.id).is_archived()
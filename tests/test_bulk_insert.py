@@ -0,0 +1,26 @@
+"""test_bulk_insert.py - bulk insert reports duplicates and invalid documents."""
+from db.db_mongoengine import Player, Course
+from db.data.test_players import DBGolfPlayers
+
+def new_player(email, gender='man'):
+  return Player(email=email, first_name='New', last_name='Player', nick_name=email.split('@')[0], handicap=10.0, gender=gender)
+
+def test_insert_players_report(each_db):
+  players = [Player(**DBGolfPlayers[0]), new_player('first@tl.com'), new_player('bad@tl.com', gender='other'),
+             new_player('second@tl.com'), Player(**DBGolfPlayers[1])]
+  report = each_db.insert_players(players, batch_size=2)
+  assert report.inserted == 2
+  assert sorted(report.duplicates) == ['sjournea@tl.com', 'snake@tl.com']
+  assert [key for key, _ in report.errors] == ['bad@tl.com']
+  assert len(each_db.list_players()) == len(DBGolfPlayers) + 2
+  # inserted players have their id
+  assert each_db.find_players('second@tl.com', 'exact')[0].id == players[3].id
+
+def test_insert_courses_duplicates(each_db):
+  courses = each_db.list_courses()
+  copies = [Course(name=course.name, holes=course.holes, tees=course.tees) for course in courses]
+  report = each_db.insert_courses(copies)
+  assert report.inserted == 0
+  assert sorted(report.duplicates) == sorted(course.name for course in courses)
+  assert len(each_db.list_courses()) == len(courses)
+  assert str(report).startswith('courses - 0 inserted, {} duplicates, 0 errors'.format(len(courses)))
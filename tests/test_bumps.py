@@ -0,0 +1,43 @@
+"""test_bumps.py - DCourse bump tables, plus handicaps give strokes back."""
+import pytest
+from db.wrap import DCourse, DRound, BUMP_TABLE_RANGE
+from conftest import create_round
+
+@pytest.fixture
+def course(memory_db):
+  return DCourse(memory_db.find_courses('Canyon Lakes', 'exact')[0])
+
+def holes_with(course, bumps, value):
+  """Hole handicaps of the holes with value bumps."""
+  return sorted(course.hole_handicaps[n] for n, bump in enumerate(bumps) if bump == value)
+
+@pytest.mark.parametrize('handicap', [BUMP_TABLE_RANGE.start - 5, BUMP_TABLE_RANGE.start, -1, 0, 1, 17, 18,
+                                      BUMP_TABLE_RANGE.stop - 1, BUMP_TABLE_RANGE.stop, 99])
+def test_bumps_add_up(course, handicap):
+  bumps = course.calcBumps(handicap)
+  assert sum(bumps) == handicap
+  assert max(bumps) - min(bumps) <= 1
+  assert bumps == course._make_bumps(handicap)
+
+def test_plus_handicap(course):
+  assert holes_with(course, course.calcBumps(-1), -1) == [18]
+  assert holes_with(course, course.calcBumps(-3), -1) == [16, 17, 18]
+  assert holes_with(course, course.calcBumps(-18), -1) == list(range(1, 19))
+  assert holes_with(course, course.calcBumps(-20), -2) == [17, 18]
+  assert holes_with(course, course.calcBumps(3), 1) == [1, 2, 3]
+
+def test_bump_table_shared(course):
+  assert course.calcBumps(-5) is course.bump_table[-5]
+  assert course.calcBumps(9.6) is course.calcBumps(10)
+  with pytest.raises(TypeError):
+    course.bump_table[0] = ()
+
+def test_plus_handicap_net(memory_db):
+  doc_round = create_round(memory_db, ('sjournea@tl.com',), [])
+  doc_round.results[0].course_handicap = -2
+  for hole in range(1, 19):
+    memory_db.save_scores(doc_round, hole, [4])
+  golf_round = DRound(doc_round)
+  net = golf_round.net_row(0)
+  assert sorted(golf_round.course.hole_handicaps[n] for n, score in enumerate(net) if score == 5) == [17, 18]
+  assert sum(net) == 18*4 + 2
@@ -0,0 +1,44 @@
+"""test_course_cache.py - cached course views are dropped when courses change."""
+import pytest
+from db.db_mongoengine import Player, Course
+from db.data.test_players import DBGolfPlayers
+from db.course_cache import course_cache
+from db.wrap import DRound
+from conftest import load_courses, create_round
+
+mongomock = pytest.importorskip('mongomock')
+from db.storage_mongo import MongoStorage
+
+@pytest.fixture
+def storage():
+  db = MongoStorage(None, 'golftest', mongo_client_class=mongomock.MongoClient)
+  db.remove()
+  db.insert_players(Player(**dct) for dct in DBGolfPlayers)
+  load_courses(db)
+  return db
+
+@pytest.fixture
+def cached(storage):
+  doc = create_round(storage, ['sjournea@tl.com'], [])
+  DRound(doc)
+  assert doc.course.id in course_cache._courses
+  return doc.course
+
+def test_update_invalidates(storage, cached):
+  Course.objects(id=cached.id).update(set__name='Canyon Lakes Renamed')
+  assert cached.id not in course_cache._courses
+
+def test_modify_invalidates(storage, cached):
+  Course.objects(id=cached.id).modify(set__name='Canyon Lakes Renamed')
+  assert cached.id not in course_cache._courses
+
+def test_delete_invalidates(storage, cached):
+  cached.delete()
+  assert cached.id not in course_cache._courses
+
+def test_restore_invalidates(storage, cached, tmp_path):
+  filename = str(tmp_path / 'golf.gz')
+  storage.snapshot(filename)
+  DRound(create_round(storage, ['sjournea@tl.com'], []))
+  storage.restore(filename)
+  assert len(course_cache) == 0
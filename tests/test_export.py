@@ -0,0 +1,52 @@
+"""test_export.py - CSV export of round history."""
+import csv
+import datetime
+import pytest
+from db.exceptions import GolfException
+from db.export import COLUMNS, export_rounds, export_format
+from conftest import create_round
+
+def scored_round(db, date_played, holes):
+  doc_round = create_round(db, ('sjournea@tl.com', 'snake@tl.com'), [])
+  doc_round.date_played = date_played
+  db.save_round(doc_round)
+  for hole in range(1, holes+1):
+    db.save_scores(doc_round, hole, [4, 5], [2, None])
+  return doc_round
+
+def read_csv(filename):
+  with open(filename, newline='') as fp:
+    return list(csv.reader(fp))
+
+def test_export_csv_rows(memory_db, tmp_path):
+  doc_round = scored_round(memory_db, datetime.datetime(2018, 6, 2), 3)
+  filename = str(tmp_path / 'rounds.csv')
+  assert export_rounds(memory_db, filename) == 6
+  rows = read_csv(filename)
+  assert tuple(rows[0]) == COLUMNS
+  row = dict(zip(COLUMNS, rows[1]))
+  hole = doc_round.course.holes[0]
+  assert row == {'round_id': str(doc_round.id), 'date_played': '2018-06-02 00:00:00', 'course': 'Canyon Lakes',
+                 'tee': 'Blue', 'email': 'sjournea@tl.com', 'nick_name': 'Hammy',
+                 'handicap': str(doc_round.results[0].handicap), 'course_handicap': str(doc_round.results[0].course_handicap),
+                 'hole': '1', 'gross': '4', 'putts': '2', 'par': str(hole.par), 'hole_handicap': str(hole.handicap)}
+  # putts not entered are empty
+  assert [dict(zip(COLUMNS, r))['putts'] for r in rows[1:]] == ['2', '2', '2', '', '', '']
+
+def test_export_since_and_batches(memory_db, tmp_path):
+  scored_round(memory_db, datetime.datetime(2018, 5, 1), 2)
+  later = [scored_round(memory_db, datetime.datetime(2018, 6, day), 1) for day in (1, 2, 3)]
+  filename = str(tmp_path / 'rounds.csv')
+  assert export_rounds(memory_db, filename, since=datetime.datetime(2018, 6, 1), batch_size=2) == 6
+  assert [row[0] for row in read_csv(filename)[1::2]] == [str(doc.id) for doc in later]
+
+def test_export_format():
+  assert export_format('x.PQ') == 'parquet'
+  assert export_format('x.feather') == 'arrow'
+  with pytest.raises(GolfException):
+    export_format('x.xlsx')
+
+def test_export_parquet_without_pyarrow(memory_db, tmp_path, monkeypatch):
+  monkeypatch.setattr('db.export.pyarrow', None)
+  with pytest.raises(GolfException):
+    export_rounds(memory_db, str(tmp_path / 'rounds.parquet'))
@@ -0,0 +1,52 @@
+"""test_game_questions.py - questions of the games from DRound.update_games()."""
+from db.wrap import DRound
+from conftest import create_round
+
+PLAYERS = ('sjournea@tl.com', 'snake@tl.com', 'spanky@tl.com')
+# Canyon Lakes par 3 holes are 3 and 5, gross 3 with 2 putts is on the green
+SCORES = {
+  1: ([5, 5, 5], [2, 2, 2]),
+  2: ([6, 6, 6], [2, 2, 2]),
+  3: ([3, 3, 4], [2, 2, 2]),
+  4: ([5, 5, 5], [2, 2, 2]),
+  5: ([3, 3, 4], [2, 2, 2]),
+}
+
+def play(db, doc_round, holes):
+  for hole in holes:
+    db.save_scores(doc_round, hole, *SCORES[hole])
+
+def test_greenie_asks_every_tied_par_3(memory_db):
+  doc_round = create_round(memory_db, PLAYERS, [('greenie', {})])
+  play(memory_db, doc_round, range(1, 6))
+  golf_round = DRound(doc_round)
+  questions = golf_round.update_games()
+  assert [(q['hole_num'], q['key']) for q in questions] == [(3, 'qualified'), (5, 'qualified')]
+  assert [pl.nick_name for pl in questions[0]['players']] == ['Hammy', 'Snake']
+  for q in questions:
+    q['hole_data'][str(q['hole_num'])] = {q['key']: 'Snake'}
+  assert golf_round.update_games() == []
+  points = {dct['player'].nick_name: dct['total'] for dct in golf_round.games[0].leaderboard['leaderboard']}
+  assert points == {'Snake': 2, 'Hammy': 0, 'Spanky': 0}
+
+def test_game_with_questions_keeps_last_output(memory_db):
+  doc_round = create_round(memory_db, PLAYERS, [('greenie', {}), ('gross', {})])
+  play(memory_db, doc_round, range(1, 3))
+  golf_round = DRound(doc_round)
+  assert golf_round.update_games() == []
+  greenie = golf_round.games[0]
+  leaderboard, scorecard, status = greenie.leaderboard, greenie.scorecard, greenie.status
+  assert leaderboard['leaderboard']
+  golf_round.pop_game_states()
+
+  play(memory_db, doc_round, [3])
+  questions = golf_round.update_games()
+  assert [q['hole_num'] for q in questions] == [3]
+  assert golf_round.games[0] is greenie
+  assert (greenie.leaderboard, greenie.scorecard, greenie.status) == (leaderboard, scorecard, status)
+  # only the gross game has new output to save
+  assert [state.game_index for state in golf_round.pop_game_states()] == [1]
+
+  questions[0]['hole_data']['3'] = {'qualified': 'Hammy'}
+  assert golf_round.update_games() == []
+  assert [state.game_index for state in golf_round.pop_game_states()] == [0]
@@ -0,0 +1,50 @@
+"""test_game_states.py - games updated from stored GameState only when their inputs changed."""
+from db.wrap import DRound
+from db.game_putts import GamePutts
+from db.game_greenie import GameGreenie
+from conftest import create_round
+
+GAMES = [('gross', {}), ('putts', {}), ('greenie', {})]
+
+def scored_round(db):
+  doc_round = create_round(db, ('sjournea@tl.com', 'snake@tl.com'), GAMES)
+  for hole, gross, putts in [(1, [5, 4], [2, 1]), (2, [6, 5], [2, 2]), (3, [3, 4], [2, 2])]:
+    db.save_scores(doc_round, hole, gross, putts)
+  golf_round = DRound(doc_round)
+  golf_round.update_games()
+  db.save_game_states(golf_round.game_states())
+  return doc_round
+
+def updated(monkeypatch):
+  """Record the class of each game updated."""
+  lst = []
+  for cls in (GamePutts, GameGreenie):
+    update = cls.update
+    monkeypatch.setattr(cls, 'update', lambda self, update=update: lst.append(self.__class__) or update(self))
+  return lst
+
+def reload(db, doc_round):
+  return DRound(db.get_round(doc_round.id), db.get_game_states(doc_round.id))
+
+def test_stored_states_not_updated_again(memory_db, monkeypatch):
+  doc_round = scored_round(memory_db)
+  lst = updated(monkeypatch)
+  golf_round = reload(memory_db, doc_round)
+  assert golf_round.update_games() == []
+  assert lst == []
+  assert golf_round.pop_game_states() == []
+
+def test_only_changed_input_updated(memory_db, monkeypatch):
+  doc_round = scored_round(memory_db)
+  # putts of a par 4, greenie reads putts but only on par 3 holes
+  memory_db.save_scores(doc_round, 1, [5, 4], [1, 1])
+  lst = updated(monkeypatch)
+  golf_round = reload(memory_db, doc_round)
+  golf_round.update_games()
+  assert sorted(cls.__name__ for cls in lst) == ['GameGreenie', 'GamePutts']
+  # greenie output is the same, only putts is saved
+  assert [state.game_index for state in golf_round.pop_game_states()] == [1]
+  memory_db.save_game_states(golf_round.game_states())
+  del lst[:]
+  reload(memory_db, doc_round).update_games()
+  assert lst == []
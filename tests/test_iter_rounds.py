@@ -0,0 +1,30 @@
+"""test_iter_rounds.py - keyset paged rounds with equal dates played."""
+import datetime
+import pytest
+from conftest import create_round
+
+SAME_DAY = datetime.datetime(2018, 6, 2)
+
+@pytest.fixture
+def rounds(each_db):
+  """Seven rounds, five played the same day, returned in (date_played, id) order."""
+  lst = []
+  for n, date_played in enumerate([SAME_DAY]*5 + [SAME_DAY - datetime.timedelta(days=1), SAME_DAY + datetime.timedelta(days=1)]):
+    emails = ['sjournea@tl.com', 'snake@tl.com'] if n % 2 else ['spanky@tl.com']
+    doc_round = create_round(each_db, emails, [])
+    doc_round.date_played = date_played
+    each_db.save_round(doc_round)
+    lst.append(doc_round)
+  return sorted(lst, key=lambda doc: (doc.date_played, doc.id))
+
+@pytest.mark.parametrize('batch_size', [1, 2, 3, 7, 100])
+def test_iter_rounds_every_round_once(each_db, rounds, batch_size):
+  assert [doc.id for doc in each_db.iter_rounds(batch_size=batch_size)] == [doc.id for doc in rounds]
+
+def test_iter_rounds_filters(each_db, rounds):
+  assert [doc.id for doc in each_db.iter_rounds(since=SAME_DAY, batch_size=2)] == [doc.id for doc in rounds[1:]]
+  assert [doc.id for doc in each_db.iter_rounds(limit=4, batch_size=3)] == [doc.id for doc in rounds[:4]]
+  player = each_db.find_players('snake@tl.com', 'exact')[0]
+  expected = [doc.id for doc in rounds if any(result.player.id == player.id for result in doc.results)]
+  assert [doc.id for doc in each_db.iter_rounds(player_id=player.id, batch_size=1)] == expected
+  assert [summary.id for summary in each_db.iter_rounds(summary=True, batch_size=2)] == [doc.id for doc in rounds]
@@ -0,0 +1,38 @@
+"""test_render.py - text, JSON and HTML renderers."""
+import pytest
+from db.wrap import DRound
+from db.render import GolfRendererFactory, GolfRendererList, NO_OUTPUT
+from conftest import create_round
+
+GAMES = [('gross', {}), ('net', {}), ('match', {}), ('skins', {}), ('greenie', {}), ('stableford', {})]
+
+@pytest.mark.parametrize('name', GolfRendererList())
+def test_render_games_not_updated(memory_db, name):
+  doc_round = create_round(memory_db, ('sjournea@tl.com', 'snake@tl.com'), GAMES)
+  renderer = GolfRendererFactory(name)()
+  for game in DRound(doc_round, memory_db.get_game_states(doc_round.id)).games:
+    renderer.scorecard(game)
+    renderer.leaderboard(game)
+    renderer.status(game)
+
+def test_text_no_output(memory_db):
+  doc_round = create_round(memory_db, ('sjournea@tl.com', 'snake@tl.com'), GAMES)
+  renderer = GolfRendererFactory('text')()
+  game = DRound(doc_round).games[0]
+  assert renderer.scorecard(game)[1:] == [NO_OUTPUT]
+  assert renderer.leaderboard(game) == [NO_OUTPUT]
+  assert renderer.status(game) == NO_OUTPUT
+
+@pytest.mark.parametrize('game_type', ['stableford', 'greenie'])
+def test_text_money_leaderboard(memory_db, game_type):
+  doc_round = create_round(memory_db, ('sjournea@tl.com', 'snake@tl.com'), [(game_type, {'wager': 1.0})])
+  # Canyon Lakes hole 3 is a par 3, only Hammy is on the green
+  for hole, gross in [(1, [5, 6]), (2, [6, 7]), (3, [3, 4])]:
+    memory_db.save_scores(doc_round, hole, gross, [2, 2])
+  golf_round = DRound(doc_round)
+  golf_round.update_games()
+  game = golf_round.games[0]
+  game.leaderboard = game.getLeaderboard(sort_type='money')
+  lines = GolfRendererFactory('text')().leaderboard(game)
+  assert 'Money' in lines[0]
+  assert '$' in lines[1] and lines[1].split()[1] == 'Hammy'
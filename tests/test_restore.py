@@ -0,0 +1,37 @@
+"""test_restore.py - DBAdmin snapshot and restore."""
+import gzip
+import pytest
+from db.db_mongoengine import Player
+from db.data.test_players import DBGolfPlayers
+from db.exceptions import GolfDBException
+
+mongomock = pytest.importorskip('mongomock')
+from db.storage_mongo import MongoStorage
+
+@pytest.fixture
+def storage():
+  db = MongoStorage(None, 'golftest', mongo_client_class=mongomock.MongoClient)
+  db.remove()
+  db.insert_players(Player(**dct) for dct in DBGolfPlayers)
+  return db
+
+def test_restore_snapshot(storage, tmp_path):
+  db = storage
+  filename = str(tmp_path / 'golf.gz')
+  db.snapshot(filename)
+  db.remove()
+  counts = db.restore(filename)
+  assert counts['player'] == len(DBGolfPlayers)
+  assert len(db.list_players()) == len(DBGolfPlayers)
+
+@pytest.mark.parametrize('content', [None, b'not gzip', gzip.compress(b''), gzip.compress(b'\x05\x00\x00')],
+                         ids=['missing', 'not-gzip', 'empty', 'bad-bson'])
+def test_restore_bad_file_leaves_database(storage, tmp_path, content):
+  db = storage
+  filename = tmp_path / 'bad.gz'
+  if content is not None:
+    filename.write_bytes(content)
+  with pytest.raises(GolfDBException):
+    db.restore(str(filename))
+  assert len(db.list_players()) == len(DBGolfPlayers)
+  assert not [name for name in Player._get_db().list_collection_names() if name.endswith('_restore')]
@@ -0,0 +1,48 @@
+"""test_save_scores.py - compare and swap score writes from two scorers."""
+import pytest
+from db.exceptions import GolfConflictException
+from conftest import create_round
+
+EMAILS = ('sjournea@tl.com', 'snake@tl.com', 'spanky@tl.com')
+
+def scores(db, doc_round):
+  """{hole: [gross of each player]} as stored."""
+  stored = db.get_round(doc_round.id)
+  holes = sorted({score.num for result in stored.results for score in result.scores})
+  return {hole: [cell and cell[0] for cell in stored.score_cells(hole)] for hole in holes}
+
+@pytest.fixture
+def two_copies(each_db):
+  doc_round = create_round(each_db, EMAILS, [('gross', {})])
+  return each_db.get_round(doc_round.id), each_db.get_round(doc_round.id)
+
+def test_disjoint_players_merged(each_db, two_copies):
+  first, second = two_copies
+  each_db.save_scores(first, 1, [5, None, None], [2, None, None])
+  each_db.save_scores(second, 1, [None, 4, 6], [None, 1, 2])
+  assert scores(each_db, first) == {1: [5, 4, 6]}
+  # the late scorer has both writes
+  assert second.score_cells(1) == [(5, 2), (4, 1), (6, 2)]
+
+def test_disjoint_holes_merged(each_db, two_copies):
+  first, second = two_copies
+  each_db.save_scores(first, 1, [5, 4, 6])
+  each_db.save_scores(second, 2, [3, 3, 4])
+  each_db.save_scores(first, 3, [4, 5, 5])
+  assert scores(each_db, first) == {1: [5, 4, 6], 2: [3, 3, 4], 3: [4, 5, 5]}
+
+def test_same_score_not_a_conflict(each_db, two_copies):
+  first, second = two_copies
+  each_db.save_scores(first, 1, [5, 4, 6], [2, 1, 2])
+  each_db.save_scores(second, 1, [5, 4, 6], [2, 1, 2])
+  assert scores(each_db, first) == {1: [5, 4, 6]}
+
+def test_same_cell_conflict(each_db, two_copies):
+  first, second = two_copies
+  each_db.save_scores(first, 1, [5, 4, None])
+  with pytest.raises(GolfConflictException):
+    each_db.save_scores(second, 1, [None, 5, 6])
+  assert scores(each_db, first) == {1: [5, 4, None]}
+  # after the conflict the copy has the saved scores and can write again
+  each_db.save_scores(second, 1, [None, 5, 6])
+  assert scores(each_db, first) == {1: [5, 5, 6]}
@@ -0,0 +1,76 @@
+"""test_score_buffer.py - ScoreBuffer journal replay after a crash."""
+import os
+import subprocess
+import sys
+import pytest
+from db.exceptions import GolfDBException
+from db.storage_sqlite import SqliteStorage
+from db.score_buffer import ScoreBuffer
+from db.wrap import DRound
+from db.render import TextRenderer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# scores holes 1-4 through the buffer, flushed every 9 holes, then is killed
+SCORER = """
+import os, signal, sys
+sys.path.insert(0, 'tests')
+from conftest import create_round, load_courses
+from db.db_mongoengine import Player
+from db.data.test_players import DBGolfPlayers
+from db.storage_sqlite import SqliteStorage
+from db.score_buffer import ScoreBuffer
+from db.wrap import DRound
+
+db = SqliteStorage(None, sys.argv[1])
+db.insert_players(Player(**dct) for dct in DBGolfPlayers)
+load_courses(db)
+doc = create_round(db, ('sjournea@tl.com', 'snake@tl.com'), [('gross', {}), ('putts', {}), ('skins', {})])
+golf_round = DRound(doc)
+golf_round.update_games()
+db.save_game_states(golf_round.game_states())
+
+buffer = ScoreBuffer(db, sys.argv[2], holes=9)
+golf_round = DRound(buffer.get_round(doc.id))
+for hole, gross, putts in [(1, [5, 4], [2, 1]), (2, [6, 5], [2, 2]), (3, [3, 4], [1, 2]), (4, [5, 6], [2, 3])]:
+  buffer.save_scores(golf_round.doc, hole, gross, putts)
+  golf_round.update_games()
+  buffer.save_games(golf_round.doc)
+  buffer.save_game_states(golf_round.pop_game_states())
+  buffer.flush_if_due()
+print(doc.id)
+sys.stdout.flush()
+os.kill(os.getpid(), signal.SIGKILL)
+"""
+
+def game_text(games):
+  renderer = TextRenderer()
+  return [(renderer.scorecard(game), renderer.leaderboard(game), renderer.status(game)) for game in games]
+
+def test_replay_updates_game_states(tmp_path):
+  database = str(tmp_path / 'golf.db')
+  journal = str(tmp_path / 'scores.journal')
+  proc = subprocess.run([sys.executable, '-c', SCORER, database, journal], cwd=ROOT, stdout=subprocess.PIPE)
+  assert proc.returncode == -9
+  round_id = proc.stdout.decode().split()[-1]
+
+  db = SqliteStorage(None, database)
+  # killed mid nine, nothing but the first game output was written
+  assert db.get_round(round_id).hole_version == 0
+  assert ScoreBuffer(db, journal, holes=9).replay() == 4
+  doc = db.get_round(round_id)
+  assert len(doc.results[0].scores) == 4
+  states = db.get_game_states(doc.id)
+  assert [state.hole_version for state in states] == [doc.hole_version]*3
+  golf_round = DRound(doc)
+  golf_round.update_games()
+  assert game_text(DRound(doc, states).games) == game_text(golf_round.games)
+  assert os.path.getsize(journal) == 0
+
+def test_bad_journal_is_kept(memory_db, tmp_path):
+  journal = tmp_path / 'scores.journal'
+  journal.write_text('{"round_id": "5a0000000000000000000000", "hole": 1\n')
+  buffer = ScoreBuffer(memory_db, str(journal))
+  with pytest.raises(GolfDBException):
+    buffer.replay()
+  assert journal.read_text().startswith('{"round_id"')
@@ -0,0 +1,27 @@
+"""test_score_matrix.py - ScoreMatrix and games scoring a hole not played by every player."""
+import pytest
+from db.score_matrix import ScoreMatrix
+from db.wrap import DRound
+from conftest import create_round
+
+def test_ranks():
+  assert ScoreMatrix.ranks([4, 3, 5, 3]) == [2, 0, 3, 0]
+  assert ScoreMatrix.ranks([4, None, 3]) == [1, None, 0]
+  assert ScoreMatrix.ranks([None, None]) == [None, None]
+
+PLAYERS = ('sjournea@tl.com', 'snake@tl.com', 'spanky@tl.com', 'reload@tl.com')
+
+@pytest.mark.parametrize('game_type, players', [
+  ('match', 2), ('six_point', 3), ('skins', 4), ('bestball', 4),
+])
+def test_partial_hole_not_scored(memory_db, game_type, players):
+  doc_round = create_round(memory_db, PLAYERS[:players], [(game_type, {})])
+  memory_db.save_scores(doc_round, 1, [5, 4, 6, 5][:players], [2, 2, 2, 2][:players])
+  golf_round = DRound(doc_round)
+  golf_round.update_games()
+  before = golf_round.games[0].scorecard['players']
+  # merge mode, the last player has no score on hole 2 yet
+  memory_db.save_scores(doc_round, 2, [4, 3, 5, None][:players-1] + [None], [2, 2, 2, 2][:players])
+  golf_round.update_games()
+  after = golf_round.games[0].scorecard['players']
+  assert [dct['total'] for dct in after] == [dct['total'] for dct in before]
@@ -0,0 +1,90 @@
+"""test_storage_async.py - AsyncMongoStorage and AsyncStorage."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+from db.db_mongoengine import Player, Course
+from db.data.test_players import DBGolfPlayers
+from db.exceptions import GolfDBException
+from db.storage_async import AsyncMongoStorage, AsyncStorage
+from db.wrap import DRound
+from conftest import create_round, load_courses
+
+mongomock = pytest.importorskip('mongomock')
+from db.storage_mongo import MongoStorage
+
+class AsyncCursor(object):
+  def __init__(self, cursor):
+    self.cursor = cursor
+
+  def sort(self, *args):
+    self.cursor = self.cursor.sort(*args)
+    return self
+
+  async def to_list(self, length):
+    return list(self.cursor)
+
+class AsyncCollection(object):
+  """asyncio collection methods used by AsyncMongoStorage over a mongomock collection."""
+  def __init__(self, collection):
+    self.collection = collection
+
+  async def find_one(self, *args):
+    return self.collection.find_one(*args)
+
+  def find(self, *args):
+    return AsyncCursor(self.collection.find(*args))
+
+  async def update_one(self, *args, **kwargs):
+    return self.collection.update_one(*args, **kwargs)
+
+class AsyncClient(object):
+  def __init__(self, client):
+    self.client = client
+
+  def __getitem__(self, database):
+    db = self.client[database]
+    return type('AsyncDatabase', (), {'__getitem__': lambda self, name: AsyncCollection(db[name])})()
+
+@pytest.fixture
+def mongo_round():
+  db = MongoStorage(None, 'golftest', mongo_client_class=mongomock.MongoClient)
+  db.remove()
+  db.insert_players(Player(**dct) for dct in DBGolfPlayers)
+  load_courses(db)
+  doc_round = create_round(db, ('sjournea@tl.com', 'snake@tl.com'), [('gross', {})])
+  return AsyncMongoStorage(None, 'golftest', client=AsyncClient(Player._get_db().client)), doc_round
+
+def test_async_mongo_get_round(mongo_round):
+  storage, doc_round = mongo_round
+  doc = asyncio.run(storage.get_round(doc_round.id))
+  assert doc.course.name == 'Canyon Lakes'
+  assert [result.player.nick_name for result in doc.results] == ['Hammy', 'Snake']
+
+def test_async_mongo_get_round_course_deleted(mongo_round):
+  storage, doc_round = mongo_round
+  Course._get_collection().delete_one({'_id': doc_round.course.id})
+  with pytest.raises(GolfDBException):
+    asyncio.run(storage.get_round(doc_round.id))
+
+@pytest.mark.parametrize('threads', [0, 2], ids=['event-loop', 'executor'])
+def test_async_storage_memory(memory_db, threads):
+  doc_round = create_round(memory_db, ('sjournea@tl.com', 'snake@tl.com'), [('gross', {}), ('putts', {})])
+
+  async def play(storage):
+    doc = await storage.get_round(doc_round.id)
+    for hole, gross, putts in [(1, [5, 4], [2, 1]), (2, [6, 5], [2, 2])]:
+      await storage.save_scores(doc, hole, gross, putts)
+    golf_round = DRound(doc)
+    golf_round.update_games()
+    await storage.save_game_states(golf_round.game_states())
+    return await storage.get_round(doc_round.id), await storage.get_game_states(doc_round.id)
+
+  executor = ThreadPoolExecutor(threads) if threads else None
+  try:
+    doc, states = asyncio.run(play(AsyncStorage(memory_db, executor)))
+  finally:
+    if executor:
+      executor.shutdown()
+  assert [[score.gross for score in result.scores] for result in doc.results] == [[5, 6], [4, 5]]
+  assert [state.game_index for state in states] == [0, 1]
+  assert all(state.hole_version == doc.hole_version for state in states)
@@ -0,0 +1,41 @@
+"""test_storage_memory.py - MemoryStorage copies documents and keeps unique indexes."""
+import pytest
+from db.db_mongoengine import Player
+from db.data.test_players import DBGolfPlayers
+from db.exceptions import GolfDBException
+from conftest import create_round
+
+def test_unsaved_changes_not_kept(memory_db):
+  player = memory_db.find_players('sjournea@tl.com', 'exact')[0]
+  player.handicap = 0.0
+  assert memory_db.find_players('sjournea@tl.com', 'exact')[0].handicap != 0.0
+  memory_db.save_player(player)
+  assert memory_db.find_players('sjournea@tl.com', 'exact')[0].handicap == 0.0
+
+def test_round_copied(memory_db):
+  doc_round = create_round(memory_db, ('sjournea@tl.com', 'snake@tl.com'), [('gross', {})])
+  doc_round.games[0].options['wager'] = 5
+  assert memory_db.get_round(doc_round.id).games[0].options == {}
+  memory_db.save_scores(doc_round, 1, [5, 4], [2, 1])
+  stored = memory_db.get_round(doc_round.id)
+  assert [result.scores[0].gross for result in stored.results] == [5, 4]
+  assert stored.hole_version == doc_round.hole_version
+
+def test_unique_email(memory_db):
+  with pytest.raises(GolfDBException):
+    memory_db.save_player(Player(**DBGolfPlayers[0]))
+  # changing the email frees the old one
+  player = memory_db.find_players('sjournea@tl.com', 'exact')[0]
+  player.email = 'moved@tl.com'
+  memory_db.save_player(player)
+  assert memory_db.find_players('sjournea@tl.com', 'exact') == []
+  assert memory_db.find_players('moved@tl.com', 'exact')[0].id == player.id
+  memory_db.save_player(Player(**DBGolfPlayers[0]))
+
+def test_find_match(memory_db):
+  assert [p.email for p in memory_db.find_players('sjournea@tl.com', 'exact')] == ['sjournea@tl.com']
+  assert memory_db.find_players('sjournea', 'exact') == []
+  assert [p.email for p in memory_db.find_players('sjou', 'prefix')] == ['sjournea@tl.com']
+  assert len(memory_db.find_players('@tl.com')) == len(DBGolfPlayers)
+  with pytest.raises(GolfDBException):
+    memory_db.find_players('sjournea', 'regex')
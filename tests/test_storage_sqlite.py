@@ -0,0 +1,53 @@
+"""test_storage_sqlite.py - documents read back from SqliteStorage as they were saved."""
+import pytest
+from db.db_mongoengine import Player
+from db.data.test_players import DBGolfPlayers
+from db.exceptions import GolfDBException
+from db.storage_sqlite import SqliteStorage
+from db.wrap import DRound
+from db.render import TextRenderer
+from conftest import load_courses, create_round
+
+GAMES = [('gross', {}), ('net', {}), ('skins', {}), ('greenie', {})]
+
+@pytest.fixture
+def sqlite_db():
+  db = SqliteStorage(None, ':memory:')
+  db.insert_players(Player(**dct) for dct in DBGolfPlayers)
+  load_courses(db)
+  return db
+
+def rendered(golf_round):
+  renderer = TextRenderer()
+  return [(renderer.leaderboard(game), renderer.scorecard(game), renderer.status(game)) for game in golf_round.games]
+
+def scores(doc_round):
+  return [[(score.num, score.gross, score.putts) for score in result.scores] for result in doc_round.results]
+
+def test_players_and_courses(sqlite_db):
+  assert sorted(player.email for player in sqlite_db.list_players()) == sorted(dct['email'] for dct in DBGolfPlayers)
+  course = sqlite_db.find_courses('Canyon Lakes', 'exact')[0]
+  assert len(course.holes) == 18 and course.tees
+  with pytest.raises(GolfDBException):
+    sqlite_db.save_player(Player(**DBGolfPlayers[0]))
+
+def test_round_round_trip(sqlite_db):
+  doc_round = create_round(sqlite_db, ('sjournea@tl.com', 'snake@tl.com'), GAMES)
+  for hole, gross, putts in [(1, [5, 4], [2, 1]), (2, [6, 5], [2, 2]), (3, [3, 4], [2, 2])]:
+    sqlite_db.save_scores(doc_round, hole, gross, putts)
+  golf_round = DRound(doc_round)
+  golf_round.update_games()
+  sqlite_db.save_games(doc_round)
+  sqlite_db.save_game_states(golf_round.game_states())
+
+  stored = sqlite_db.get_round(doc_round.id)
+  assert stored.date_played == doc_round.date_played
+  assert stored.course.id == doc_round.course.id
+  assert [result.player.email for result in stored.results] == ['sjournea@tl.com', 'snake@tl.com']
+  assert scores(stored) == scores(doc_round)
+  assert [(game.game_type, game.options) for game in stored.games] == [(game.game_type, game.options) for game in doc_round.games]
+  assert stored.hole_version == doc_round.hole_version
+
+  states = sqlite_db.get_game_states(doc_round.id)
+  assert [state.game_index for state in states] == list(range(len(GAMES)))
+  assert rendered(DRound(stored, states)) == rendered(golf_round)